@@ -0,0 +1,72 @@
+"""
+Benchmark batched translation against one API round-trip per segment.
+
+Uses the offline ``StubBackend`` with a fixed round-trip time per call, so no
+network access or credentials are needed.
+
+Usage:
+    python benchmarks/bench_batching.py [--paragraphs 300] [--elements 600] [--rtt 0.02]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from backends import StubBackend
+from translation_memory import TranslationMemory
+from translator import translate_batch, translate_content
+
+
+def make_page(paragraphs, elements):
+    """Build a scraped page shaped like the output of ``scrape_website``."""
+    sentence = "ދިވެހިރާއްޖެއަކީ ރީތި ޤައުމެކެވެ. "
+    html_elements = [
+        {'id': f"translate-{i}", 'text': f"{sentence}{i}", 'tag': 'span'}
+        for i in range(elements)
+    ]
+    body = ''.join(f'<span data-translate-id="{e["id"]}">{e["text"]}</span>' for e in html_elements)
+    return {
+        'title': "ދިވެހި ވިކިޕީޑިއާ",
+        'paragraphs': [sentence * 5 + str(i) for i in range(paragraphs)],
+        'url': 'https://dv.wikipedia.org/wiki/benchmark',
+        'html': f"<html><body>{body}</body></html>",
+        'html_elements': html_elements,
+    }
+
+
+def run_per_segment(page, backend, memory):
+    """Translate the page the old way: one call per segment."""
+    segments = [page['title']] + page['paragraphs'] + [e['text'] for e in page['html_elements']]
+    for segment in segments:
+        translate_batch([segment], 'dv', 'en', backend=backend, memory=memory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paragraphs', type=int, default=300)
+    parser.add_argument('--elements', type=int, default=600)
+    parser.add_argument('--rtt', type=float, default=0.02, help="Simulated round-trip time in seconds")
+    args = parser.parse_args()
+
+    page = make_page(args.paragraphs, args.elements)
+
+    # Memory-only translation memories keep the benchmark off the shared cache
+    warm_memory = TranslationMemory(path=None)
+    for name, memory, run in [
+        ('per-segment', TranslationMemory(path=None), lambda backend, memory: run_per_segment(page, backend, memory)),
+        ('batched', warm_memory, lambda backend, memory: translate_content(page, 'dv', 'en', backend=backend,
+                                                                           memory=memory, page_cache=False)),
+        ('cached', warm_memory, lambda backend, memory: translate_content(page, 'dv', 'en', backend=backend,
+                                                                          memory=memory, page_cache=False)),
+    ]:
+        backend = StubBackend(latency=args.rtt)
+        start = time.perf_counter()
+        run(backend, memory)
+        elapsed = time.perf_counter() - start
+        print(f"{name:12} round-trips={backend.calls:5d} wall={elapsed:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
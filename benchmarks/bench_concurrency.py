@@ -0,0 +1,65 @@
+"""
+Benchmark concurrent batch translation against a latency-injecting backend.
+
+The offline ``StubBackend`` sleeps for a random latency on every call and
+fails a share of calls with HTTP 429, so the run exercises the concurrency
+limit, the retry backoff and the ordering of results. With ``--http`` the
+same stub is served by ``stub_server`` and reached through ``HttpBackend``.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--segments 4000] [--latency 0.05] [--error-rate 0.1] [--http]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from backends import HttpBackend, StubBackend
+from concurrency import TokenBucket
+from stub_server import make_server
+from translation_memory import TranslationMemory
+from translator import translate_batch
+
+
+def upper(text, source_lang, target_lang):
+    return text.upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segments', type=int, default=4000)
+    parser.add_argument('--latency', type=float, default=0.05, help="Mean call latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.1, help="Share of calls failing with 429")
+    parser.add_argument('--chars-per-second', type=float, default=None, help="Token-bucket quota (default: unlimited)")
+    parser.add_argument('--http', action='store_true', help="Go through a local stub server and HttpBackend")
+    args = parser.parse_args()
+
+    texts = [f"segment {i} ދިވެހި ބަސް" for i in range(args.segments)]
+    expected = [text.upper() for text in texts]
+
+    for workers in (1, 2, 4, 8, 16):
+        stub = StubBackend(args.latency, jitter=0.5, error_rate=args.error_rate, transform=upper, seed=0)
+        backend = stub
+        server = None
+        if args.http:
+            server = make_server(port=0, backend=stub)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            backend = HttpBackend(f"http://127.0.0.1:{server.server_port}/translate")
+        limiter = TokenBucket(args.chars_per_second) if args.chars_per_second else None
+        start = time.perf_counter()
+        results = translate_batch(texts, 'dv', 'en', backend=backend, memory=TranslationMemory(path=None),
+                                  max_workers=workers, rate_limiter=limiter)
+        elapsed = time.perf_counter() - start
+        if server:
+            server.shutdown()
+            server.server_close()
+        ordered = results == expected
+        print(f"workers={workers:2d} calls={stub.calls:4d} 429s={stub.errors:3d} "
+              f"max_in_flight={stub.max_in_flight:2d} wall={elapsed:.3f}s in_order={ordered}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Regression benchmark for paragraph de-duplication in the scraper fallback path.
+
+Builds a synthetic page with no <p> or heading tags and thousands of nested
+divs, so extraction has to go through the div fallback, and compares the
+indexed de-duplication with the previous substring scan.
+
+Usage:
+    python benchmarks/bench_dedup.py [--blocks 50 100 200] [--depth 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from bs4 import BeautifulSoup
+
+from bench_extraction import legacy_extract
+from scraper import extract_content
+
+
+def make_nested_page(blocks, depth):
+    """Build a page of ``blocks`` div chains, each ``depth`` levels deep."""
+    parts = []
+    for b in range(blocks):
+        chain = ''
+        for d in range(depth):
+            chain = f'<div class="lvl">ދިވެހި ބަހުގެ ލިޔުން ނަންބަރު {b}-{d}{chain}</div>'
+        parts.append(f'<div class="block">{chain}</div>')
+    return f"<html><head><title>nested</title></head><body><div id='app'>{''.join(parts)}</div></body></html>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--skip-legacy', action='store_true', help="Only time the indexed extractor")
+    args = parser.parse_args()
+
+    for blocks in args.blocks:
+        html = make_nested_page(blocks, args.depth)
+
+        start = time.perf_counter()
+        new = extract_content(BeautifulSoup(html, 'html.parser'))
+        new_time = time.perf_counter() - start
+        line = f"divs={blocks * (args.depth + 1) + 1:6d} indexed={new_time:8.3f}s paragraphs={len(new['paragraphs']):6d}"
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            old = legacy_extract(BeautifulSoup(html, 'html.parser'))
+            old_time = time.perf_counter() - start
+            line += f" legacy={old_time:8.3f}s same={new['paragraphs'] == old['paragraphs']}"
+
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
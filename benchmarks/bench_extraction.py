@@ -0,0 +1,126 @@
+"""
+Benchmark page extraction over the HTML pages of the corpus (see ``make_corpus``).
+
+Reports parse time per parser backend and extract time per page for the
+single-pass extractor (``scraper.extract_content``) next to the previous
+multi-scan implementation, and checks that both pick the same paragraphs.
+
+Usage:
+    python benchmarks/bench_extraction.py [--repeat 5] [--preserve-html] [corpus files...]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from bs4 import BeautifulSoup
+
+from html_utils import available_parsers, parse_html
+from scraper import extract_content
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+
+def legacy_extract(soup, preserve_html=False):
+    """The extraction logic scrape_website used before the single-pass extractor."""
+    title = soup.title.text.strip() if soup.title else "No title found"
+    content_containers = [
+        soup.find('div', {'id': 'mw-content-text'}),
+        soup.find('main'),
+        soup.find('article'),
+        soup.find('div', {'id': 'content'}),
+        soup.find('div', {'class': re.compile('content|main|article|body', re.I)}),
+        soup.find('div', {'class': re.compile('post|entry|text|blog', re.I)}),
+        soup.body
+    ]
+    content_div = next((container for container in content_containers if container), soup.body)
+    skip = ['nav', 'menu', 'footer', 'header', 'sidebar']
+
+    paragraphs = []
+    for element in content_div.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        if element.parent and element.parent.name in ['nav', 'footer', 'header', 'aside']:
+            continue
+        if element.get('class') and any(c in str(element.get('class')).lower() for c in skip):
+            continue
+        text = element.get_text().strip()
+        if text and len(text) > 10:
+            paragraphs.append(text)
+
+    if len(paragraphs) <= 1:
+        for div in content_div.find_all('div'):
+            if div.parent and div.parent.name in ['nav', 'footer', 'header', 'aside']:
+                continue
+            if div.get('class') and any(c in str(div.get('class')).lower() for c in skip):
+                continue
+            text = div.get_text().strip()
+            if text and len(text) > 20 and not any(p in text for p in paragraphs):
+                paragraphs.append(text)
+
+    if len(paragraphs) <= 1:
+        for element in content_div.find_all(string=True):
+            if element.parent.name not in ['script', 'style', 'meta', 'link', 'noscript']:
+                text = element.strip()
+                if text and len(text) > 20 and not any(p in text for p in paragraphs):
+                    paragraphs.append(text)
+
+    result = {'title': title, 'paragraphs': paragraphs}
+    if preserve_html:
+        html_elements = []
+        for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'div', 'a', 'button', 'li']):
+            if element.string and element.string.strip():
+                html_elements.append({'text': element.string.strip(), 'tag': element.name})
+        result['html'] = str(soup)
+        result['html_elements'] = html_elements
+    return result
+
+
+def timed(func, repeat):
+    """Return the best wall time of ``repeat`` runs and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help="HTML files (default: benchmarks/corpus/*.html)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--preserve-html', action='store_true')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+
+        parse_times = ' '.join(
+            f"parse[{backend}]={timed(lambda: parse_html(html, backend), args.repeat)[0] * 1000:8.2f}ms"
+            for backend in available_parsers()
+        )
+
+        # Extraction mutates the tree when preserving HTML, so parse outside the timer
+        soups = [BeautifulSoup(html, 'html.parser') for _ in range(args.repeat)]
+        new_time, new = timed(lambda: extract_content(soups.pop(), preserve_html=args.preserve_html), args.repeat)
+        soups = [BeautifulSoup(html, 'html.parser') for _ in range(args.repeat)]
+        old_time, old = timed(lambda: legacy_extract(soups.pop(), preserve_html=args.preserve_html), args.repeat)
+
+        same = new['paragraphs'] == old['paragraphs']
+        if args.preserve_html:
+            same = same and [(e['text'], e['tag']) for e in new['html_elements']] == \
+                [(e['text'], e['tag']) for e in old['html_elements']]
+
+        print(f"{os.path.basename(path):28} {len(html) / 1024:7.1f} KiB {parse_times} "
+              f"extract={new_time * 1000:8.2f}ms legacy={old_time * 1000:8.2f}ms "
+              f"paragraphs={len(new['paragraphs']):4d} same={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark sequential against process-pool PDF page extraction.
+
+Generates multi-page text PDFs, extracts them with different worker counts
+and reports wall time, pages per second and the slowest page.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--pages 50 200] [--workers 1 2 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from documents import iter_pdf_page_results
+
+
+def make_pdf(path, pages, lines_per_page=50):
+    """Write a minimal text PDF with ``pages`` pages using the Helvetica base font."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} line {line}: The Maldives is an archipelago of 26 atolls "
+                 f"in the Indian Ocean, and Dhivehi is its official language." for line in range(lines_per_page)]
+        text = ' T* '.join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 36 800 Td {text} ET".encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode())
+        page_ids.append(len(objects))
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = os.path.join(directory, f"bench_{pages}.pdf")
+            make_pdf(path, pages)
+            baseline = None
+            for workers in args.workers:
+                start = time.perf_counter()
+                results = list(iter_pdf_page_results(path, workers=workers))
+                elapsed = time.perf_counter() - start
+
+                texts = [text for _, text, _ in results]
+                in_order = [number for number, _, _ in results] == list(range(pages))
+                baseline = baseline or texts
+                slowest = max(results, key=lambda result: result[2])
+                print(f"pages={pages:4d} workers={workers:2d} wall={elapsed:7.3f}s pages/s={pages / elapsed:8.1f} "
+                      f"slowest=page {slowest[0] + 1} ({slowest[2] * 1000:.1f}ms) "
+                      f"in_order={in_order} same_text={texts == baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark startup: module import time and time to the first translation.
+
+Each measurement runs in a fresh interpreter, so nothing is already
+imported. For every module, reports the median import time and which of the
+heavy libraries (PDF, DOCX, translation client, HTML parser) the import
+loaded. Then times a cold start up to the first translated page with the
+stub backend, with and without ``warmup.warm_up`` run beforehand; with
+warm-up, ``first_translation`` is the wait left after the warm-up has
+finished.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [-o startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator')
+
+MODULES = ['translator', 'scraper', 'documents', 'jobs', 'app']
+HEAVY_MODULES = ['PyPDF2', 'docx', 'google.cloud.translate_v2', 'bs4', 'lxml']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+FIRST_TRANSLATION_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from scraper import extract_content
+from html_utils import parse_html
+from translator import translate_content
+from warmup import warm_up
+imported = time.perf_counter()
+warm = {warm}
+if warm:
+    warm_up(extractors=True)
+ready = time.perf_counter()
+content = extract_content(parse_html("<html><head><title>T</title></head><body><p>ދިވެހި</p></body></html>"))
+translate_content(content, 'dv', 'en')
+done = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'warm_up': ready - imported, 'first_translation': done - ready}}))
+"""
+
+
+def run(script):
+    """Run ``script`` in a fresh interpreter in the package directory and parse its JSON output."""
+    env = dict(os.environ, DHIVEHI_TRANSLATION_BACKEND='stub', DHIVEHI_TM_PATH='', DHIVEHI_JOB_WORKERS='0',
+               STREAMLIT_GLOBAL_SHOW_WARNING_ON_DIRECT_EXECUTION='false')
+    output = subprocess.run([sys.executable, '-c', script], cwd=PACKAGE_DIR, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_of(runs, key):
+    return statistics.median(result[key] for result in runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Interpreters started per measurement")
+    parser.add_argument('-o', '--output', help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = {'imports': {}, 'first_translation': {}}
+    for module in MODULES:
+        runs = [run(IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)) for _ in range(args.repeat)]
+        results['imports'][module] = {'seconds': median_of(runs, 'seconds'), 'loaded': runs[0]['loaded']}
+        print(f"import {module:<12} {median_of(runs, 'seconds') * 1000:8.1f}ms  "
+              f"loaded: {', '.join(runs[0]['loaded']) or '-'}")
+
+    for warm in (False, True):
+        runs = [run(FIRST_TRANSLATION_SCRIPT.format(warm=warm)) for _ in range(args.repeat)]
+        name = 'warm' if warm else 'cold'
+        results['first_translation'][name] = {key: median_of(runs, key)
+                                              for key in ('import', 'warm_up', 'first_translation')}
+        timings = results['first_translation'][name]
+        print(f"{name}: import {timings['import'] * 1000:7.1f}ms  warm-up {timings['warm_up'] * 1000:7.1f}ms  "
+              f"first translation {timings['first_translation'] * 1000:7.1f}ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+Reproducible benchmark suite over the checked-in corpus.
+
+Measures three stages without network access or credentials:
+
+* ``scrape``: ``scrape_website`` over the corpus HTML pages and generated
+  huge pages, served from a local HTTP server (HTTP cache disabled)
+* ``translate``: ``translate_content`` end-to-end on each scraped page with
+  a deterministic ``StubBackend`` and empty in-memory caches
+* ``extract``: the PDF, DOCX and TXT document extractors
+
+Each case reports the median wall time over ``--repeat`` runs, throughput,
+peak traced Python memory (from a separate ``tracemalloc`` run, so tracing
+does not skew the timings) and, for translation, API calls and billed
+characters. Results are written as JSON; ``--compare`` checks them against
+an earlier run and exits with status 1 on regressions.
+
+Usage:
+    python benchmarks/bench_suite.py [--repeat 3] [--quick] [-o results.json]
+    python benchmarks/bench_suite.py -o new.json --compare baseline.json [--threshold 0.2]
+"""
+import argparse
+import functools
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from backends import StubBackend
+from bench_dedup import make_nested_page
+from documents import iter_document
+from scraper import scrape_website
+from translation_memory import TranslationMemory
+from translator import content_segments, translate_content
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+
+# Metrics where a higher value is a regression; throughput metrics are the inverse
+LOWER_IS_BETTER = ('seconds', 'peak_kb', 'api_calls', 'api_characters')
+HIGHER_IS_BETTER = ('pages_per_second', 'segments_per_second', 'mb_per_second', 'chunks_per_second')
+
+
+def fake_translation(text, source_lang, target_lang):
+    """Deterministic stand-in translation: the reversed text tagged with the target language."""
+    return f"[{target_lang}] {text[::-1]}"
+
+
+def make_large_page(paragraphs):
+    """Build a long article page with ``paragraphs`` paragraphs under regular headings."""
+    sentence = "ދިވެހިރާއްޖެއަކީ ހިންދު ކަނޑުގައި އޮތް ޖަޒީރާ ޤައުމެކެވެ. "
+    parts = []
+    for i in range(paragraphs):
+        if i % 25 == 0:
+            parts.append(f"<h2>ބައި {i // 25 + 1}</h2>")
+        parts.append(f"<p>{sentence * 3}<a href='/wiki/{i}'>{i}</a> <span>ޞަފްޙާ {i}</span></p>")
+    return (f"<html><head><title>ބޮޑު ޞަފްޙާ</title></head><body><nav><a href='/'>ފުރަތަމަ</a></nav>"
+            f"<div id='mw-content-text'>{''.join(parts)}</div><footer>ފޫޓަރ</footer></body></html>")
+
+
+def write_synthetic_pages(directory, quick=False):
+    """Write the generated huge pages next to copies of the corpus pages."""
+    scale = 0.2 if quick else 1
+    pages = {
+        'synthetic_large_article.html': make_large_page(int(5000 * scale)),
+        'synthetic_nested_divs.html': make_nested_page(int(200 * scale), 20),
+    }
+    for name, markup in pages.items():
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(markup)
+    for path in glob.glob(os.path.join(CORPUS_DIR, '*.html')):
+        with open(path, 'rb') as source, open(os.path.join(directory, os.path.basename(path)), 'wb') as target:
+            target.write(source.read())
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory, '*.html')))
+
+
+def serve_directory(directory):
+    """Serve ``directory`` over HTTP on a free local port from a background thread."""
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(func, repeat):
+    """
+    Run ``func`` ``repeat`` times, then once more under ``tracemalloc``.
+
+    Returns:
+        tuple: (median seconds, peak traced memory in KB, result of the last timed run)
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak / 1024, result
+
+
+def bench_scrape(base_url, directory, pages, repeat):
+    results = []
+    for page in pages:
+        size = os.path.getsize(os.path.join(directory, page))
+        for preserve_html in (False, True):
+            url = f"{base_url}/{page}"
+            seconds, peak_kb, content = measure(
+                lambda: scrape_website(url, preserve_html=preserve_html, cache=False), repeat
+            )
+            if 'error' in content:
+                raise RuntimeError(f"Scraping {page} failed: {content['error']}")
+            results.append({
+                'benchmark': 'scrape',
+                'case': f"{page}{' (preserve_html)' if preserve_html else ''}",
+                'seconds': seconds,
+                'pages_per_second': 1 / seconds,
+                'mb_per_second': size / seconds / 1e6,
+                'peak_kb': peak_kb,
+                'paragraphs': len(content['paragraphs']),
+                'html_elements': len(content.get('html_elements', [])),
+                'bytes': size
+            })
+    return results
+
+
+def bench_translate(base_url, pages, repeat):
+    results = []
+    for page in pages:
+        for preserve_html in (False, True):
+            content = scrape_website(f"{base_url}/{page}", preserve_html=preserve_html, cache=False)
+            segments = len(content_segments(content))
+            backends = []
+
+            def run():
+                # Fresh backend and caches, so every run translates the page cold
+                backend = StubBackend(transform=fake_translation, seed=0)
+                backends.append(backend)
+                return translate_content(content, 'dv', 'en', backend=backend,
+                                         memory=TranslationMemory(None), page_cache=False)
+
+            seconds, peak_kb, translated = measure(run, repeat)
+            usage = translated['usage']
+            results.append({
+                'benchmark': 'translate',
+                'case': f"{page}{' (preserve_html)' if preserve_html else ''}",
+                'seconds': seconds,
+                'segments_per_second': segments / seconds,
+                'peak_kb': peak_kb,
+                'api_calls': backends[-1].calls,
+                'api_characters': usage['api_characters'],
+                'segments': segments,
+                'characters': usage['characters'],
+                'failed_segments': translated['failed_segments']
+            })
+    return results
+
+
+def bench_extract(documents, repeat):
+    results = []
+    for path in documents:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        def run():
+            return list(iter_document(io.BytesIO(data), os.path.basename(path)))
+
+        seconds, peak_kb, chunks = measure(run, repeat)
+        results.append({
+            'benchmark': 'extract',
+            'case': os.path.basename(path),
+            'seconds': seconds,
+            'chunks_per_second': len(chunks) / seconds,
+            'mb_per_second': len(data) / seconds / 1e6,
+            'peak_kb': peak_kb,
+            'chunks': len(chunks),
+            'characters': sum(len(chunk) for chunk in chunks)
+        })
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each metric's change against a baseline run.
+
+    Returns:
+        list: Descriptions of the metrics that regressed by more than ``threshold``
+    """
+    previous = {(r['benchmark'], r['case']): r for r in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        old = previous.get((result['benchmark'], result['case']))
+        if old is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if metric not in result or not old.get(metric):
+                continue
+            change = result[metric] / old[metric] - 1
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            # Counts are exact, so any increase in API usage is a regression
+            if metric in ('api_calls', 'api_characters'):
+                worse = result[metric] > old[metric]
+            label = f"{result['benchmark']:<9} {result['case']:<45} {metric:<20}"
+            print(f"{label} {old[metric]:12.4g} -> {result[metric]:12.4g} ({change:+7.1%}){'  REGRESSION' if worse else ''}")
+            if worse:
+                regressions.append(f"{result['benchmark']} {result['case']} {metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case (the median is reported)")
+    parser.add_argument('--quick', action='store_true', help="Smaller synthetic pages, one timed run")
+    parser.add_argument('--only', choices=['scrape', 'translate', 'extract'], nargs='+')
+    parser.add_argument('-o', '--output', help="Write the results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative change of timings and memory counted as a regression")
+    args = parser.parse_args()
+    repeat = 1 if args.quick else args.repeat
+    stages = args.only or ['scrape', 'translate', 'extract']
+
+    # Keep shared caches from serving earlier runs
+    os.environ['DHIVEHI_HTTP_CACHE_PATH'] = ''
+    os.environ['DHIVEHI_PAGE_CACHE_PATH'] = ''
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        pages = write_synthetic_pages(directory, args.quick)
+        server = serve_directory(directory)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            if 'scrape' in stages:
+                results += bench_scrape(base_url, directory, pages, repeat)
+            if 'translate' in stages:
+                results += bench_translate(base_url, pages, repeat)
+            if 'extract' in stages:
+                # The TXT case is the text of every HTML page, one paragraph per block
+                txt_path = os.path.join(directory, 'corpus_text.txt')
+                with open(txt_path, 'w', encoding='utf-8') as f:
+                    for page in pages:
+                        content = scrape_website(f"{base_url}/{page}", cache=False)
+                        f.write('\n\n'.join(content['paragraphs']) + '\n\n')
+                documents = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.pdf')) + glob.glob(os.path.join(CORPUS_DIR, '*.docx')))
+                results += bench_extract(documents + [txt_path], repeat)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    for result in results:
+        extra = ' '.join(f"{key}={value}" for key, value in result.items()
+                         if key not in ('benchmark', 'case', 'seconds', 'peak_kb') and isinstance(value, int))
+        print(f"{result['benchmark']:<9} {result['case']:<45} {result['seconds'] * 1000:9.1f}ms "
+              f"peak={result['peak_kb']:9.0f}KB {extra}")
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'repeat': repeat,
+        'quick': args.quick,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('quick') != args.quick:
+            print("warning: comparing a --quick run with a full run")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark writing translations back into preserved HTML.
+
+Scrapes synthetic pages with thousands of translatable elements and
+rebuilds ``translated_html`` three ways: the previous per-element
+``soup.find`` lookups, the ID index used when a page has no template, and
+the template filled in a single pass. Checks that all three give the same
+HTML.
+
+Usage:
+    python benchmarks/bench_writeback.py [--elements 1000 5000 10000] [--skip-legacy]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dhivehi_translator'))
+
+from html_utils import parse_html
+from scraper import extract_content
+from translator import SegmentResult, STATUS_TRANSLATED, assemble_translation, content_segments
+
+
+def make_page(elements):
+    """Build a page with ``elements`` translatable list items, spans and links."""
+    parts = []
+    for i in range(elements // 3):
+        parts.append(f"<li>ލިސްޓް {i}</li><p><span>ދިވެހި ބަހުގެ ޕެރެގްރާފް {i}</span> <a href='/{i}'>ލިންކް {i}</a></p>")
+    return (f"<html><head><title>ޞަފްޙާ</title></head><body><div id='mw-content-text'><ul>{''.join(parts)}</ul>"
+            f"</div></body></html>")
+
+
+def legacy_writeback(content, translations):
+    """The write-back before the ID index: one full tree search per element."""
+    soup = parse_html(content['html'])
+    for element, translated_text in zip(content['html_elements'], translations):
+        html_element = soup.find(attrs={"data-translate-id": element['id']})
+        if html_element:
+            html_element.string = translated_text
+    return str(soup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--elements', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--skip-legacy', action='store_true', help="Skip the quadratic per-element search")
+    args = parser.parse_args()
+
+    for elements in args.elements:
+        content = extract_content(parse_html(make_page(elements)), preserve_html=True)
+        segments = content_segments(content)
+        results = [SegmentResult(text, f"[en] {text}", STATUS_TRANSLATED) for text in segments]
+        translations = [result.translation for result in results[1 + len(content['paragraphs']):]]
+        nodes = len(parse_html(content['html']).find_all(True))
+
+        start = time.perf_counter()
+        templated = assemble_translation(content, results)['translated_html']
+        template_time = time.perf_counter() - start
+
+        untemplated = dict(content)
+        del untemplated['html_template']
+        start = time.perf_counter()
+        indexed = assemble_translation(untemplated, results)['translated_html']
+        index_time = time.perf_counter() - start
+
+        line = (f"elements={len(content['html_elements']):6d} nodes={nodes:6d} "
+                f"template={template_time * 1000:8.1f}ms index={index_time * 1000:8.1f}ms")
+        same = parse_html(templated).find_all(True) == parse_html(indexed).find_all(True)
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            legacy = legacy_writeback(content, translations)
+            legacy_time = time.perf_counter() - start
+            line += f" legacy={legacy_time * 1000:9.1f}ms speedup={legacy_time / index_time:6.1f}x"
+            same = same and legacy == indexed
+        print(f"{line} same_html={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Regenerate the benchmark corpus.
+
+The corpus is synthetic. The HTML pages imitate the markup of a Dhivehi
+Wikipedia article, a Dhivehi Academy page and a page built only from
+nested divs, filled with random sequences of common Dhivehi words; they
+are not copies of real pages. The documents are a multi-page text PDF and
+a long Dhivehi DOCX. Everything is generated from fixed seeds and content,
+so the checked-in files only need regenerating when the generators change.
+
+Usage:
+    python benchmarks/make_corpus.py [--pdf-pages 40] [--docx-paragraphs 2000]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import docx
+
+from bench_pdf_extraction import make_pdf
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+DHIVEHI_SENTENCES = [
+    "ދިވެހިރާއްޖެއަކީ ހިންދު ކަނޑުގައި އޮތް ޖަޒީރާ ޤައުމެކެވެ.",
+    "ދިވެހިބަހަކީ ދިވެހިރާއްޖޭގެ ރަސްމީ ބަހެވެ.",
+    "ތާނަ އަކުރުން ލިޔެވެނީ ކަނާތުން ވާތަށެވެ.",
+    "މާލެއަކީ ދިވެހިރާއްޖޭގެ ވެރިރަށެވެ.",
+    "ރާއްޖޭގައި ވަނީ 26 ގުދުރަތީ އަތޮޅެވެ.",
+]
+
+# Vocabulary of the synthetic HTML pages
+DHIVEHI_WORDS = ("ދިވެހި ރާއްޖެ ބަސް ތާރީޚު ސަރުކާރު ރަށް އަތޮޅު މާލެ ޤައުމު ދަރިވަރުން ތައުލީމު އިލްމު ފޮތް "
+                 "ލިޔުން ބަހުރުވަ ސިޔާސަތު މުޖުތަމަޢު ފަތުރުވެރިކަން ކަނޑު މަސްވެރިކަން").split()
+
+# Seed of the HTML pages; the pages are generated in order from one generator
+HTML_SEED = 42
+
+
+class TextGenerator:
+    """Random Dhivehi words, sentences and paragraphs from a seeded generator."""
+
+    def __init__(self, seed=HTML_SEED):
+        self.random = random.Random(seed)
+
+    def word(self):
+        return self.random.choice(DHIVEHI_WORDS)
+
+    def sentence(self, words=None):
+        words = words or self.random.randint(6, 16)
+        return ' '.join(self.word() for _ in range(words)) + '.'
+
+    def paragraph(self, sentences=None):
+        return ' '.join(self.sentence() for _ in range(sentences or self.random.randint(2, 5)))
+
+
+def make_wikipedia_article(text):
+    """A MediaWiki-style article: headings, paragraphs with references, tables, navigation and footer."""
+    r = text.random
+    nav = ''.join(f'<li id="n-{i}"><a href="/wiki/Page_{i}">{text.word()}</a></li>' for i in range(40))
+    body = []
+    for s in range(12):
+        body.append(f'<h2><span class="mw-headline" id="s{s}">{text.sentence(3)}</span>'
+                    f'<span class="mw-editsection"><a href="#">[ބަދަލުކުރޭ]</a></span></h2>')
+        for _ in range(r.randint(3, 6)):
+            body.append(f'<p>{text.paragraph()} <a href="/wiki/X{r.randint(0, 999)}">{text.word()}</a> '
+                        f'{text.sentence()}<sup class="reference"><a href="#cite-{r.randint(1, 40)}">'
+                        f'[{r.randint(1, 40)}]</a></sup></p>')
+        if s % 3 == 0:
+            rows = ''.join(f'<tr><th>{text.word()}</th><td>{r.randint(1900, 2024)}</td><td>{text.sentence(4)}</td></tr>'
+                           for _ in range(10))
+            body.append(f'<table class="wikitable"><tbody>{rows}</tbody></table>')
+    refs = ''.join(f'<li id="cite-{i}"><span class="reference-text">{text.sentence()} '
+                   f'<a href="https://example.mv/{i}">https://example.mv/{i}</a></span></li>' for i in range(1, 41))
+    return f'''<!DOCTYPE html>
+<html class="client-nojs" lang="dv" dir="rtl">
+<head><meta charset="UTF-8"/><title>ދިވެހިރާއްޖޭގެ ތާރީޚު - ވިކިޕީޑިއާ</title>
+<script>document.documentElement.className="client-js";</script>
+<style>.mw-body{{margin:0}}</style></head>
+<body class="mediawiki rtl skin-vector">
+<div id="mw-page-base" class="noprint"></div>
+<div id="content" class="mw-body" role="main">
+<h1 id="firstHeading" class="firstHeading">ދިވެހިރާއްޖޭގެ ތާރީޚު</h1>
+<div id="bodyContent" class="vector-body">
+<div id="siteSub" class="noprint">ވިކިޕީޑިއާ އިން</div>
+<div id="mw-content-text" class="mw-body-content" lang="dv" dir="rtl"><div class="mw-parser-output">
+{''.join(body)}
+<h2><span class="mw-headline" id="refs">މަސްދަރުތައް</span></h2>
+<div class="reflist"><ol class="references">{refs}</ol></div>
+</div></div></div></div>
+<div id="mw-navigation"><h2>ނެވިގޭޝަން</h2>
+<div id="mw-panel"><div class="portal" role="navigation"><ul>{nav}</ul></div></div></div>
+<div id="footer" role="contentinfo"><ul id="footer-info"><li id="footer-info-lastmod">{text.sentence()}</li><li id="footer-info-copyright">{text.sentence()}</li></ul></div>
+</body></html>
+'''
+
+
+def make_academy_page(text):
+    """A Dhivehi Academy style page: menu, article, card grid, sidebar and footer."""
+    menu = ''.join(f'<li class="menu-item"><a href="/section/{i}">{text.word()} {text.word()}</a></li>'
+                   for i in range(25))
+    cards = []
+    for i in range(30):
+        cards.append(f'''<div class="card"><div class="card-body"><h3 class="card-title">{text.sentence(4)}</h3>
+<p class="card-text">{text.paragraph(2)}</p><span class="date">2023-0{i % 9 + 1}-1{i % 9}</span>
+<a class="btn btn-primary" href="/thasavvaru/{i}">{text.word()}</a></div></div>''')
+    return f'''<!DOCTYPE html>
+<html lang="dv" dir="rtl"><head><meta charset="utf-8"><title>ދިވެހިބަހުގެ އެކެޑަމީ - ތަސައްވަރު</title>
+<link rel="stylesheet" href="/css/app.css"><script src="/js/app.js"></script></head>
+<body>
+<header class="site-header"><nav class="navbar"><ul class="nav">{menu}</ul></nav></header>
+<main class="container">
+<article class="page"><h1>ތަސައްވަރު</h1>
+<p>{text.paragraph(6)}</p><p>{text.paragraph(5)}</p>
+<h2>{text.sentence(3)}</h2><ul class="goals">{''.join(f"<li>{text.sentence()}</li>" for _ in range(12))}</ul>
+<div class="row">{''.join(cards)}</div>
+</article>
+<aside class="sidebar"><h3>{text.sentence(2)}</h3><ul>{''.join(f"<li><a href='#'>{text.sentence(3)}</a></li>" for _ in range(15))}</ul></aside>
+</main>
+<footer class="site-footer"><p>© 2024 ދިވެހިބަހުގެ އެކެޑަމީ. {text.sentence()}</p><p>+960 332 0000</p></footer>
+</body></html>
+'''
+
+
+def make_div_soup_page(text):
+    """A news page made only of nested divs, which exercises the fallback extraction paths."""
+    def nest(depth):
+        if depth == 0:
+            return f'<div class="txt">{text.paragraph(2)}</div>'
+        return f'<div class="wrap-{depth}">{text.sentence()}<div>{nest(depth - 1)}</div><div class="txt">{text.paragraph(1)}</div></div>'
+
+    blocks = ''.join(f'<div class="block">{nest(text.random.randint(2, 5))}</div>' for _ in range(25))
+    return f'''<!DOCTYPE html>
+<html lang="dv"><head><meta charset="utf-8"><title>ޚަބަރު</title>
+<script>var cfg = {{"page": "news", "lang": "dv"}};</script></head>
+<body><div id="app"><div class="topbar"><span>{text.sentence(3)}</span></div>
+{blocks}
+<!-- {text.sentence()} -->
+<div class="footer-links"><a href="/">{text.sentence(2)}</a></div></div>
+</body></html>
+'''
+
+
+# Generated in this order from one TextGenerator, so the output never changes
+HTML_PAGES = [
+    ('wikipedia_article.html', make_wikipedia_article),
+    ('academy_page.html', make_academy_page),
+    ('div_soup_page.html', make_div_soup_page),
+]
+
+
+def make_docx(path, paragraphs):
+    """Write a DOCX of ``paragraphs`` Dhivehi paragraphs with a heading every 20 paragraphs."""
+    document = docx.Document()
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            document.add_heading(f"ބައި {i // 20 + 1}", level=2)
+        start = i % len(DHIVEHI_SENTENCES)
+        sentences = DHIVEHI_SENTENCES[start:] + DHIVEHI_SENTENCES[:start]
+        document.add_paragraph(f"{' '.join(sentences)} ({i + 1})")
+    document.core_properties.title = "Benchmark corpus"
+    document.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pdf-pages', type=int, default=40)
+    parser.add_argument('--docx-paragraphs', type=int, default=2000)
+    args = parser.parse_args()
+
+    text = TextGenerator()
+    for filename, make_page in HTML_PAGES:
+        html_path = os.path.join(CORPUS_DIR, filename)
+        with open(html_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(make_page(text))
+        print(f"wrote {html_path}")
+
+    pdf_path = os.path.join(CORPUS_DIR, 'report.pdf')
+    make_pdf(pdf_path, args.pdf_pages)
+    print(f"wrote {pdf_path} ({args.pdf_pages} pages)")
+
+    docx_path = os.path.join(CORPUS_DIR, 'report.docx')
+    make_docx(docx_path, args.docx_paragraphs)
+    print(f"wrote {docx_path} ({args.docx_paragraphs} paragraphs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,119 @@
 import streamlit as st
 import os
 from scraper import scrape_website, get_random_wikipedia_article, is_dhivehi_text
-from translator import translate_content, translate_text
-import streamlit.components.v1 as components
-import time
-import PyPDF2
-import docx
+from crawler import crawl_website
+from page_cache import page_hash
+from translator import segment_workers, translate_content, translate_segments
+from language_id import LANGUAGE_NAMES, detect_page_language
+from documents import iter_document, segment_text, translate_stream
+from metrics import start_metrics_server, trace
+from jobs import DONE, QUEUED, RUNNING, get_job_queue, start_workers
+from export import ExportSet, TxtExporter, make_export_directory, register_export, start_export_server
+from warmup import warm_up_enabled, warm_up_in_background
 import io
-import base64
+import functools
+import hashlib
+import shutil
+import tempfile
+
+# Bounds of the result caches shared by all sessions
+CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 64
+
+class UncachedResult(Exception):
+    """Carries a result out of a cached function without it being cached (errors, partial translations)."""
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _scrape(url, timeout):
+    content = scrape_website(url, timeout=timeout)
+    if 'error' in content:
+        raise UncachedResult(content)
+    return content
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _crawl(url, max_pages, timeout):
+    pages = crawl_website(url, max_pages=max_pages, timeout=timeout)
+    if any('error' in page for page in pages):
+        raise UncachedResult(pages)
+    return pages
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _translate_page(content_hash, source_lang, target_lang, _content):
+    # _content is not hashed; content_hash identifies it
+    translated_content = translate_content(_content, source_lang, target_lang, max_workers=segment_workers(4))
+    if translated_content['failed_segments']:
+        raise UncachedResult(translated_content)
+    return translated_content
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _translate_text(text, source_lang, target_lang):
+    result = translate_segments([text], source_lang, target_lang)[0]
+    if not result.ok:
+        raise UncachedResult(result)
+    return result
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _document_language(file_hash, filename, _data):
+    # Only the first segment is extracted, in this process; None if the document has no text
+    first = next(iter(segment_text(iter_document(io.BytesIO(_data), filename))), None)
+    if first is None:
+        return None
+    return 'dv' if is_dhivehi_text(first) else 'en'
+
+def scrape_cached(url, timeout):
+    """Scrape a website, reusing results of the last hour; errors are not cached."""
+    try:
+        return _scrape(url, timeout)
+    except UncachedResult as e:
+        return e.result
+
+def crawl_cached(url, max_pages, timeout):
+    """Crawl a site from ``url``, reusing crawls of the last hour; crawls with failed pages are not cached."""
+    try:
+        return _crawl(url, max_pages, timeout)
+    except UncachedResult as e:
+        return e.result
+
+def translate_page_cached(content, source_lang, target_lang):
+    """Translate scraped content, reusing complete translations of the same page and language pair."""
+    try:
+        return _translate_page(page_hash(content), source_lang, target_lang, content)
+    except UncachedResult as e:
+        return e.result
+
+def translate_text_cached(text, source_lang, target_lang):
+    """Translate one text, reusing successful translations of the same text and language pair."""
+    try:
+        return _translate_text(text, source_lang, target_lang)
+    except UncachedResult as e:
+        return e.result
+
+def document_language_cached(uploaded_file):
+    """
+    Identify the language of an uploaded document from its first segment.
+    
+    Only this small result is cached by the file's hash; the segments
+    themselves are extracted again, lazily, for each translation.
+    
+    Returns:
+        tuple: (file hash, 'dv' or 'en', or None if the document has no text)
+    """
+    data = uploaded_file.getvalue()
+    file_hash = hashlib.sha256(data).hexdigest()
+    return file_hash, _document_language(file_hash, uploaded_file.name, data)
+
+def iter_document_segments(uploaded_file):
+    """
+    Extract and segment an uploaded document lazily, so it is never held in memory as a whole.
+    
+    Returns:
+        iterator: Segments of the document
+    """
+    return segment_text(iter_document(io.BytesIO(uploaded_file.getvalue()), uploaded_file.name,
+                                      workers=os.cpu_count()))
 
 # Custom CSS for a more professional look
 def apply_custom_css():
@@ -26,52 +132,296 @@ def apply_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from a PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page_num in range(len(pdf_reader.pages)):
-            text += pdf_reader.pages[page_num].extract_text() + "\n\n"
-        return text
-    except Exception as e:
-        return f"Error extracting text from PDF: {str(e)}"
+# Downloads offered for a translated document: (format, label, file name prefix)
+DOCUMENT_DOWNLOADS = [
+    ('txt', "Translation (TXT)", "translated_"),
+    ('docx', "Translation (DOCX)", "translated_"),
+    ('html', "Translation (HTML)", "translated_"),
+    ('jsonl', "Bilingual (JSONL)", "bilingual_"),
+    ('original', "Original Text", "original_")
+]
 
-def extract_text_from_docx(docx_file):
-    """Extract text from a DOCX file"""
-    try:
-        doc = docx.Document(docx_file)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
-    except Exception as e:
-        return f"Error extracting text from DOCX: {str(e)}"
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def export_download(label, path, filename, mime, url=None, key=None):
+    """
+    Offer an export file for download without reading it during the script run.
+    
+    Args:
+        label (str): Button label
+        path (str): Export file
+        filename (str): Name offered to the browser
+        mime (str): MIME type
+        url (str, optional): Streamed download from the export server (see ``export.register_export``)
+        key (str, optional): Widget key
+    """
+    if not os.path.exists(path):
+        # Deleted after DHIVEHI_EXPORT_TTL (see ``export.expire_exports``)
+        st.caption(f"{label}: expired, translate again to download")
+    elif url:
+        st.link_button(label, url)
+    else:
+        # Read only when the button is clicked
+        st.download_button(label, functools.partial(_read_file, path), file_name=filename, mime=mime, key=key)
+
+def _job_text(job_id):
+    # Write the stored segments of a job through the TXT exporter, a batch of rows at a time
+    queue = get_job_queue()
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    exporter = TxtExporter(file)
+    start = 0
+    while True:
+        segments = queue.segments(job_id, start, limit=1000)
+        if not segments:
+            break
+        for segment in segments:
+            exporter.write(segment['original'], segment['translated'], segment['status'])
+        start = segments[-1]['position'] + 1
+    exporter.close()
+    file.seek(0)
+    return file
+
+def page_source_language(content, source_lang):
+    """
+    Pick the language to translate a scraped page from.
+    
+    Args:
+        content (dict): Result of ``scrape_website``
+        source_lang (str): Selected source language ('auto' to detect it)
+        
+    Returns:
+        tuple: (source language, notice about the detected language or None);
+            mixed pages keep 'auto' so each segment is sent with its own language
+    """
+    if source_lang != 'auto':
+        return source_lang, None
+    main_lang, languages = detect_page_language([content['title']] + content['paragraphs'])
+    if len(languages) > 1:
+        names = ", ".join(LANGUAGE_NAMES[lang] for lang in sorted(languages))
+        return 'auto', f"Detected mixed content ({names}), translating each paragraph from its own language"
+    return main_lang, f"Detected {LANGUAGE_NAMES[main_lang]} content"
 
-def extract_text_from_txt(txt_file):
-    """Extract text from a TXT file"""
+def show_website_result(result):
+    """
+    Display a translated website kept in the session state.
+    
+    Args:
+        result (dict): ``notice`` about the detected language and ``translated_content``
+    """
+    translated_content = result['translated_content']
+    if result['notice']:
+        st.info(result['notice'])
+    st.success("Translation complete!")
+    if translated_content['failed_segments']:
+        st.warning(f"{translated_content['failed_segments']} segments could not be translated "
+                   f"and are shown in the original language.")
+    # Results of background jobs carry no usage record
+    usage = translated_content.get('usage')
+    if usage and usage['characters']:
+        st.caption(
+            f"{usage['api_characters']:,} of {usage['characters']:,} characters sent to the API "
+            f"({usage['saved_characters']:,} saved: {usage['filtered_characters']:,} untranslatable, "
+            f"{usage['duplicate_characters']:,} repeated, {usage['cached_characters']:,} cached)"
+        )
+    
+    # Display the translated content
+    st.subheader("Title")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("Original:")
+        st.write(translated_content['original_title'])
+    with col2:
+        st.write("Translated:")
+        st.write(translated_content['translated_title'])
+    
+    # Display content in expandable sections
+    with st.expander("View Translated Content", expanded=True):
+        for i, para in enumerate(translated_content['paragraphs']):
+            st.markdown(f"**Paragraph {i+1}**")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("Original:")
+                st.write(para['original'])
+            with col2:
+                st.write("Translated:")
+                st.write(para['translated'])
+            st.markdown("---")
+
+def translate_document(segments, key, filename):
+    """
+    Translate document segments, showing progress as they arrive.
+    
+    Args:
+        segments (iterable): Segments of the document, e.g. ``iter_document_segments``
+        key (tuple): (file hash, source language, target language)
+        filename (str): Name of the uploaded file
+        
+    Returns:
+        dict: Result kept in the session state, with the exports written
+            to a temporary directory; ``complete`` is False if any segment
+            failed or translation stopped early
+    """
+    _, source_lang, target_lang = key
+    
+    # Every export format is written as segments arrive, so the document is
+    # never held in memory
+    directory = make_export_directory()
+    exports = ExportSet(directory, filename.rsplit('.', 1)[0], source_lang=source_lang, target_lang=target_lang)
+    
+    status = st.empty()
+    heading = st.empty()
+    latest = st.empty()
+    heading.markdown("### Latest Translated Segment")
+    
+    segment_count = 0
+    character_count = 0
+    failed_count = 0
+    complete = False
     try:
-        text = txt_file.getvalue().decode("utf-8")
-        return text
+        for result in translate_stream(segments, source_lang, target_lang, max_workers=segment_workers(4)):
+            exports.write(result.text, result.translation, result.status)
+            segment_count += 1
+            character_count += len(result.text)
+            failed_count += not result.ok
+            
+            # Show progress and the most recent segment
+            status.text(f"Translated {segment_count} segments ({character_count:,} characters)...")
+            with latest.container():
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(result.text)
+                with col2:
+                    st.write(result.translation)
+        complete = not failed_count
     except Exception as e:
-        return f"Error extracting text from TXT: {str(e)}"
+        st.error(f"Error while translating: {str(e)}")
+    
+    exports.close()
+    status.empty()
+    heading.empty()
+    latest.empty()
+    
+    basename = filename.rsplit('.', 1)[0]
+    downloads = []
+    for fmt, label, prefix in DOCUMENT_DOWNLOADS:
+        path = exports.paths[fmt]
+        download_name = prefix + basename + os.path.splitext(path)[1]
+        url = register_export(path, download_name, exports.mimes[fmt])
+        downloads.append((label, path, download_name, exports.mimes[fmt], url))
+    return {
+        'key': key,
+        'name': filename,
+        'directory': directory,
+        'downloads': downloads,
+        'segment_count': segment_count,
+        'character_count': character_count,
+        'failed_count': failed_count,
+        'complete': complete
+    }
+
+@st.cache_resource
+def job_workers():
+    """
+    Start the background job workers once per server process (DHIVEHI_JOB_WORKERS, default 2).
+    
+    Called on the first job submitted, so servers nobody queues jobs on run no
+    workers. Queued jobs and jobs interrupted by a crash are picked up as soon
+    as the workers start.
+    """
+    return start_workers()
+
+@st.cache_resource
+def warm_start():
+    """
+    Create the translation client and HTML parser in the background once per
+    server process, when DHIVEHI_WARMUP is set.
+    """
+    return warm_up_in_background() if warm_up_enabled() else None
 
-def create_download_link(content, filename, link_text):
-    """Create a download link for text content"""
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:file/txt;base64,{b64}" download="{filename}">{link_text}</a>'
-    return href
+def submit_job(job_id):
+    """
+    Remember a submitted job in the session and in the page URL, so it can be
+    found again after a reload.
+    """
+    job_workers()
+    job_ids = st.session_state.setdefault('job_ids', [])
+    job_ids.append(job_id)
+    st.query_params['jobs'] = ','.join(job_ids)
+    st.info("Translation queued. Follow its progress in the sidebar.")
+
+@st.fragment(run_every=2)
+def show_jobs():
+    """
+    Show the progress and results of this session's background jobs, refreshed every 2 seconds.
+    """
+    job_ids = st.session_state.get('job_ids', [])
+    if not job_ids:
+        return
+    queue = get_job_queue()
+    jobs = queue.list_jobs(job_ids)
+    if not jobs:
+        return
+    
+    st.markdown("### Background Jobs")
+    for job in jobs:
+        name = job['source'] if job['kind'] == 'document' else job['source'].split('//')[-1][:40]
+        st.markdown(f"**{name}** ({job['source_lang']} → {job['target_lang']})")
+        total = job['total_segments']
+        if job['status'] in (QUEUED, RUNNING):
+            label = f"{job['done_segments']} of {total} segments" if total else job['status'].capitalize()
+            st.progress(job['progress'], text=label)
+            if st.button("Cancel", key=f"cancel_{job['id']}"):
+                queue.cancel(job['id'])
+        elif job['status'] == DONE:
+            st.caption(f"Done: {total} segments" + (f", {job['failed_segments']} failed" if job['failed_segments'] else ""))
+        else:
+            st.caption(f"{job['status'].capitalize()}" + (f": {job['error']}" if job['error'] else ""))
+        
+        if job['kind'] == 'url' and job['result'] is not None:
+            if st.button("Show translation", key=f"show_{job['id']}"):
+                st.session_state.website_result = {'notice': None, 'translated_content': job['result']}
+                st.session_state.pop('website_results', None)
+                st.rerun()
+        elif job['kind'] == 'document' and job['done_segments']:
+            # Segments are stored as they finish, so partial results can be downloaded too
+            partial = "" if job['status'] == DONE else " (partial)"
+            st.download_button(
+                f"Download Translation{partial}",
+                functools.partial(_job_text, job['id']),
+                file_name=f"translated_{job['source'].split('.')[0]}.txt",
+                mime="text/plain",
+                key=f"download_{job['id']}"
+            )
+        st.markdown("---")
 
 def main():
     st.set_page_config(page_title="Dhivehi-English Translator", page_icon="🌐", layout="wide")
     apply_custom_css()
     
+    # Expose /metrics for Prometheus when DHIVEHI_METRICS_PORT is set
+    start_metrics_server()
+    # Stream downloads from disk when DHIVEHI_EXPORT_PORT is set
+    start_export_server()
+    
     # Set Google Cloud credentials
     credentials_path = "c:\\Users\\Lenovo\\dhivehi_translator\\first-presence-450616-g0-a3ffbe9e307e.json"
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+    warm_start()
     
     st.markdown("<h1 class='main-header'>Dhivehi-English Translator</h1>", unsafe_allow_html=True)
     
+    # Long translations can run as background jobs that survive reruns and closed tabs.
+    # The workers start with the first job, at startup when DHIVEHI_JOB_WORKERS is
+    # set, or when a session comes back to its jobs (e.g. after a server restart)
+    if 'job_ids' not in st.session_state:
+        st.session_state.job_ids = [job_id for job_id in st.query_params.get('jobs', '').split(',') if job_id]
+    if os.environ.get('DHIVEHI_JOB_WORKERS') or st.session_state.job_ids:
+        job_workers()
+    with st.sidebar:
+        show_jobs()
+    
     # Create tabs for different functionalities
     tab1, tab2, tab3, tab4 = st.tabs(["Website Translation", "Direct Text", "File Translation", "Dhivehi Language"])
     
@@ -108,68 +458,78 @@ def main():
         with col3:
             timeout = st.slider("Timeout:", min_value=5, max_value=30, value=15)
         
+        col1, col2 = st.columns([3, 1])
+        with col2:
+            crawl_pages = st.number_input("Pages to crawl:", min_value=1, max_value=50, value=1,
+                                          help="More than 1 also translates pages linked from this one, "
+                                               "on the same site and up to 2 links away")
+        with col1:
+            background = st.checkbox("Run as a background job", key="website_background", disabled=crawl_pages > 1)
+        
         # Scrape and translate button
-        if st.button("Translate Website"):
-            progress_bar = st.progress(0)
-            status = st.empty()
-            
-            # Step 1: Scraping
-            status.text("Scraping website...")
-            progress_bar.progress(10)
-            content = scrape_website(url, timeout=timeout)
-            progress_bar.progress(40)
-            
-            if 'error' in content:
-                st.error(f"Error: {content['error']}")
-                progress_bar.empty()
-                status.empty()
-            else:
-                # Step 2: Language detection
-                status.text("Detecting language...")
-                progress_bar.progress(50)
+        translate_clicked = st.button("Translate Website")
+        if translate_clicked and background and crawl_pages == 1:
+            submit_job(get_job_queue().submit_url(url, source_lang, target_lang, timeout))
+        elif translate_clicked:
+            with trace('translate_website', url=url) as request_trace:
+                progress_bar = st.progress(0)
+                status = st.empty()
                 
-                if source_lang == 'auto':
-                    if (content['title'] and is_dhivehi_text(content['title'])) or \
-                       (content['paragraphs'] and is_dhivehi_text(content['paragraphs'][0])):
-                        source_lang = 'dv'
-                        st.info("Detected Dhivehi content")
-                    else:
-                        source_lang = 'en'
-                        st.info("Detected English content")
-                
-                # Step 3: Translation
-                status.text("Translating...")
-                progress_bar.progress(60)
-                translated_content = translate_content(content, source_lang, target_lang)
-                progress_bar.progress(100)
-                time.sleep(0.5)
-                progress_bar.empty()
-                status.empty()
-                
-                st.success("Translation complete!")
-                
-                # Display the translated content
-                st.subheader("Title")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write("Original:")
-                    st.write(translated_content['original_title'])
-                with col2:
-                    st.write("Translated:")
-                    st.write(translated_content['translated_title'])
+                # Step 1: Scraping (or crawling the site from the URL)
+                progress_bar.progress(10)
+                if crawl_pages > 1:
+                    status.text("Crawling website...")
+                    pages = crawl_cached(url, crawl_pages, timeout)
+                else:
+                    status.text("Scraping website...")
+                    pages = [scrape_cached(url, timeout)]
+                progress_bar.progress(40)
+                errors = [page for page in pages if 'error' in page]
+                pages = [page for page in pages if 'error' not in page]
                 
-                # Display content in expandable sections
-                with st.expander("View Translated Content", expanded=True):
-                    for i, para in enumerate(translated_content['paragraphs']):
-                        st.markdown(f"**Paragraph {i+1}**")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write("Original:")
-                            st.write(para['original'])
-                        with col2:
-                            st.write("Translated:")
-                            st.write(para['translated'])
-                        st.markdown("---")
+                if not pages:
+                    st.error(f"Error: {errors[0]['error']}")
+                    st.session_state.pop('website_result', None)
+                    st.session_state.pop('website_results', None)
+                    progress_bar.empty()
+                    status.empty()
+                else:
+                    results = []
+                    for position, content in enumerate(pages):
+                        # Step 2: Language detection, labelling every segment
+                        status.text(f"Detecting language ({position + 1} of {len(pages)})..."
+                                    if len(pages) > 1 else "Detecting language...")
+                        page_lang, notice = page_source_language(content, source_lang)
+                        
+                        # Step 3: Translation
+                        status.text(f"Translating ({position + 1} of {len(pages)})..."
+                                    if len(pages) > 1 else "Translating...")
+                        translated_content = translate_page_cached(content, page_lang, target_lang)
+                        results.append({'url': content.get('url', url), 'notice': notice,
+                                        'translated_content': translated_content})
+                        progress_bar.progress(50 + 50 * (position + 1) // len(pages))
+                    progress_bar.empty()
+                    status.empty()
+                    if errors:
+                        st.warning(f"{len(errors)} crawled pages could not be fetched")
+                    
+                    # Kept in the session so reruns show it without scraping or translating again
+                    st.session_state.website_result = results[0]
+                    st.session_state.website_results = results
+            
+            # Per-stage timings of this request (only recorded with DHIVEHI_TRACE=1)
+            if request_trace is not None:
+                with st.expander("Pipeline timings"):
+                    for span in request_trace.children:
+                        st.text(f"{span.name:<16} {span.duration * 1000:9.1f} ms")
+        
+        if 'website_result' in st.session_state:
+            results = st.session_state.get('website_results', [])
+            if len(results) > 1:
+                choice = st.selectbox("Crawled page:", range(len(results)), format_func=lambda i: results[i]['url'])
+                show_website_result(results[choice])
+            else:
+                show_website_result(st.session_state.website_result)
     
     with tab2:
         st.markdown("<h3 class='tab-subheader'>Direct Text Translation</h3>", unsafe_allow_html=True)
@@ -210,13 +570,20 @@ def main():
                         st.info("Detected English text")
                 
                 with st.spinner("Translating..."):
-                    translated_text = translate_text(input_text, direct_source_lang, direct_target_lang)
-                
+                    st.session_state.text_result = translate_text_cached(input_text, direct_source_lang, direct_target_lang)
+            else:
+                st.warning("Please enter some text to translate.")
+                st.session_state.pop('text_result', None)
+        
+        # The last result stays visible across reruns
+        result = st.session_state.get('text_result')
+        if result is not None:
+            if result.ok:
                 st.success("Translation complete!")
                 st.subheader("Translation Result:")
-                st.write(translated_text)
+                st.write(result.translation)
             else:
-                st.warning("Please enter some text to translate.")
+                st.error(f"Translation failed: {result.error}")
     
     with tab3:
         st.markdown("<h3 class='tab-subheader'>File Translation</h3>", unsafe_allow_html=True)
@@ -255,76 +622,58 @@ def main():
             for key, value in file_details.items():
                 st.write(f"- {key}: {value}")
             
+            file_background = st.checkbox("Run as a background job", key="file_background",
+                                          help="Recommended for large documents")
+            
             # Extract text based on file type
-            if st.button("Extract and Translate"):
-                with st.spinner("Processing file..."):
-                    # Extract text based on file type
-                    if uploaded_file.name.endswith('.pdf'):
-                        extracted_text = extract_text_from_pdf(uploaded_file)
-                    elif uploaded_file.name.endswith('.docx'):
-                        extracted_text = extract_text_from_docx(uploaded_file)
-                    elif uploaded_file.name.endswith('.txt'):
-                        extracted_text = extract_text_from_txt(uploaded_file)
-                    else:
-                        extracted_text = "Unsupported file format"
-                
-                if "Error" in extracted_text:
-                    st.error(extracted_text)
+            extract_clicked = st.button("Extract and Translate")
+            if extract_clicked and file_background:
+                submit_job(get_job_queue().submit_document(
+                    uploaded_file.getvalue(), uploaded_file.name, file_source_lang, file_target_lang
+                ))
+            elif extract_clicked:
+                # The detected language is cached by the file's hash; the
+                # segments are streamed from the file into the translation
+                try:
+                    file_hash, detected_lang = document_language_cached(uploaded_file)
+                except Exception as e:
+                    detected_lang = None
+                    st.error(f"Error extracting text: {str(e)}")
+                    st.session_state.pop('file_result', None)
                 else:
-                    st.success("Text extracted successfully!")
-                    
-                    # Display extracted text in an expander
-                    with st.expander("View Extracted Text", expanded=False):
-                        st.write(extracted_text)
-                    
+                    if detected_lang is None:
+                        st.warning("No text found in the file.")
+                        st.session_state.pop('file_result', None)
+                
+                if detected_lang is not None:
                     # Auto-detect language if needed
                     if file_source_lang == 'auto':
-                        if is_dhivehi_text(extracted_text):
-                            file_source_lang = 'dv'
-                            st.info("Detected Dhivehi text")
-                        else:
-                            file_source_lang = 'en'
-                            st.info("Detected English text")
-                    
-                    # Translate the extracted text
-                    with st.spinner("Translating..."):
-                        translated_text = translate_text(extracted_text, file_source_lang, file_target_lang)
-                    
-                    st.success("Translation complete!")
-                    
-                    # Display translation in columns
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.subheader("Original Text (Preview)")
-                        st.write(extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text)
-                    
-                    with col2:
-                        st.subheader("Translated Text (Preview)")
-                        st.write(translated_text[:500] + "..." if len(translated_text) > 500 else translated_text)
-                    
-                    # Full translation in expander
-                    with st.expander("View Full Translation", expanded=True):
-                        st.write(translated_text)
+                        file_source_lang = detected_lang
                     
-                    # Download options
-                    st.markdown("### Download Options")
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.download_button(
-                            "Download Original Text",
-                            extracted_text,
-                            file_name=f"original_{uploaded_file.name.split('.')[0]}.txt",
-                            mime="text/plain"
-                        )
-                    
-                    with col2:
-                        st.download_button(
-                            "Download Translation",
-                            translated_text,
-                            file_name=f"translated_{uploaded_file.name.split('.')[0]}.txt",
-                            mime="text/plain"
+                    key = (file_hash, file_source_lang, file_target_lang)
+                    previous = st.session_state.get('file_result')
+                    if previous is None or previous['key'] != key or not previous['complete']:
+                        if previous is not None:
+                            shutil.rmtree(previous['directory'], ignore_errors=True)
+                        st.session_state.file_result = translate_document(
+                            iter_document_segments(uploaded_file), key, uploaded_file.name
                         )
+            
+            # The last translation stays downloadable across reruns
+            result = st.session_state.get('file_result')
+            if result is not None and result['name'] == uploaded_file.name:
+                if file_source_lang == 'auto':
+                    st.info(f"Detected {LANGUAGE_NAMES[result['key'][1]]} text")
+                st.success(f"Translated {result['segment_count']} segments ({result['character_count']:,} characters).")
+                if result['failed_count']:
+                    st.warning(f"{result['failed_count']} segments could not be translated and were kept in the original language.")
+                
+                # Download options
+                st.markdown("### Download Options")
+                columns = st.columns(len(result['downloads']))
+                for column, (label, path, download_name, mime, url) in zip(columns, result['downloads']):
+                    with column:
+                        export_download(label, path, download_name, mime, url, key=f"export_{label}")
     
     with tab4:
         st.markdown("<h3 class='tab-subheader'>About Dhivehi Language</h3>", unsafe_allow_html=True)
@@ -0,0 +1,244 @@
+"""
+Translation backends.
+
+A backend translates one batch of segments with an async ``translate_batch``
+method and raises on failure; errors carrying an HTTP status in ``code`` or
+``response.status_code`` are retried by the translator on 429/5xx. The
+batching, caching, filtering and retry logic in ``translator`` works the
+same over every backend.
+"""
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from client_pool import get_client
+
+class BackendError(Exception):
+    """
+    Translation failure reported by a backend.
+    """
+
+    def __init__(self, message, code=None):
+        """
+        Args:
+            message (str): Error message
+            code (int, optional): HTTP status code of the failure
+        """
+        super().__init__(message)
+        self.code = code
+
+class TranslationBackend:
+    """
+    Interface of a translation backend.
+    """
+
+    name = 'backend'
+
+    async def translate_batch(self, texts, source_lang='auto', target_lang='en'):
+        """
+        Translate one batch of segments in a single request.
+
+        Args:
+            texts (list): Segments to translate
+            source_lang (str): Source language code ('auto' for auto-detection)
+            target_lang (str): Target language code
+
+        Returns:
+            list: Translated segments, one per input segment
+        """
+        raise NotImplementedError
+
+class GoogleBackend(TranslationBackend):
+    """
+    Google Cloud Translation (v2) through the shared clients of ``client_pool``.
+
+    The client library is synchronous, so calls run on a thread pool of this
+    backend while the event loop awaits them.
+    """
+
+    name = 'google'
+
+    def __init__(self, client=None, credentials_path=None, max_threads=32):
+        """
+        Args:
+            client (translate.Client, optional): Client to use instead of the shared one
+            credentials_path (str, optional): Service account JSON for the shared client
+            max_threads (int): Maximum number of requests in flight
+        """
+        self.client = client
+        self.credentials_path = credentials_path
+        self.max_threads = max_threads
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix='google-translate'
+                )
+            return self._executor
+
+    async def translate_batch(self, texts, source_lang='auto', target_lang='en'):
+        client = self.client or get_client(self.credentials_path)
+        # Plain text in and out; the default 'html' format returns HTML-escaped text
+        kwargs = {'target_language': target_lang, 'format_': 'text'}
+        if source_lang != 'auto':
+            kwargs['source_language'] = source_lang
+        texts = list(texts)
+        response = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), lambda: client.translate(texts, **kwargs)
+        )
+        return [item['translatedText'] for item in response]
+
+def tag_translation(text, source_lang, target_lang):
+    """
+    Default stub translation: the text prefixed with the target language.
+    """
+    return f"[{target_lang}] {text}"
+
+class StubBackend(TranslationBackend):
+    """
+    Offline backend for tests, benchmarks and demos.
+
+    Every call sleeps for ``latency`` seconds (varied by ``jitter``, a
+    fraction of the latency) and fails with ``error_code`` at ``error_rate``.
+    Translations are produced by ``transform`` without any network access.
+    Calls, errors and concurrency are counted on the instance.
+    """
+
+    name = 'stub'
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_code=429, transform=tag_translation, seed=None):
+        """
+        Args:
+            latency (float): Mean seconds per call
+            jitter (float): Relative variation of the latency, e.g. 0.5 for +/-50%
+            error_rate (float): Share of calls that fail
+            error_code (int): HTTP status of injected failures
+            transform (callable): ``transform(text, source_lang, target_lang)`` giving each translation
+            seed (int, optional): Seed for reproducible latencies and failures
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.transform = transform
+        self.calls = 0
+        self.errors = 0
+        self.segments = 0
+        self.characters = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    async def translate_batch(self, texts, source_lang='auto', target_lang='en'):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.error_rate
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if fail:
+                with self._lock:
+                    self.errors += 1
+                raise BackendError(f"{self.error_code} injected failure", self.error_code)
+            with self._lock:
+                self.segments += len(texts)
+                self.characters += sum(len(text) for text in texts)
+            return [self.transform(text, source_lang, target_lang) for text in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+class HttpBackend(TranslationBackend):
+    """
+    Self-hosted model server speaking the LibreTranslate JSON API.
+
+    Each batch is one ``POST`` of ``{"q": [...], "source", "target",
+    "format": "text"}``, answered with ``{"translatedText": [...]}``.
+    Requests go over a pooled ``requests`` session on a thread pool.
+    """
+
+    name = 'http'
+
+    def __init__(self, url, api_key=None, timeout=60, max_threads=32):
+        """
+        Args:
+            url (str): Translate endpoint, e.g. 'http://localhost:5000/translate'
+            api_key (str, optional): API key sent with every request
+            timeout (int): Timeout for each request in seconds
+            max_threads (int): Maximum number of requests in flight
+        """
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_threads)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='http-translate')
+
+    def _post(self, payload):
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()  # HTTPError carries the status for the retry logic
+        translations = response.json()['translatedText']
+        return [translations] if isinstance(translations, str) else translations
+
+    async def translate_batch(self, texts, source_lang='auto', target_lang='en'):
+        payload = {'q': list(texts), 'source': source_lang, 'target': target_lang, 'format': 'text'}
+        if self.api_key:
+            payload['api_key'] = self.api_key
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._post, payload)
+
+_default_backend = None
+_default_lock = threading.Lock()
+
+def get_backend():
+    """
+    Get the process-wide translation backend, creating it on first use.
+
+    DHIVEHI_TRANSLATION_BACKEND selects 'google' (default), 'stub' or
+    'http'; the HTTP backend reads its endpoint from DHIVEHI_BACKEND_URL
+    and an optional key from DHIVEHI_BACKEND_API_KEY.
+
+    Returns:
+        TranslationBackend: Shared backend
+
+    Raises:
+        ValueError: If the configured backend is unknown or incomplete
+    """
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None:
+            name = os.environ.get('DHIVEHI_TRANSLATION_BACKEND', 'google')
+            if name == 'google':
+                _default_backend = GoogleBackend()
+            elif name == 'stub':
+                _default_backend = StubBackend()
+            elif name == 'http':
+                url = os.environ.get('DHIVEHI_BACKEND_URL')
+                if not url:
+                    raise ValueError("DHIVEHI_BACKEND_URL is required for the http backend")
+                _default_backend = HttpBackend(url, os.environ.get('DHIVEHI_BACKEND_API_KEY'))
+            else:
+                raise ValueError(f"Unknown translation backend: {name}")
+        return _default_backend
+
+def set_backend(backend):
+    """
+    Replace the process-wide translation backend.
+
+    Args:
+        backend (TranslationBackend): Backend to use, or None to recreate it from the environment
+    """
+    global _default_backend
+    with _default_lock:
+        _default_backend = backend
@@ -0,0 +1,376 @@
+"""
+Headless batch translation of URL lists and document folders.
+
+Examples:
+    python cli.py urls.txt -o results.jsonl --target en --workers 8
+    python cli.py ./gazettes -o gazettes.jsonl --source dv --target en
+    python cli.py urls.txt -o results.jsonl --html-dir translated_html
+    python cli.py urls.txt -o today.jsonl --incremental
+    python cli.py urls.txt -o results.jsonl --metrics metrics.json
+    python cli.py seeds.txt -o site.jsonl --crawl --crawl-depth 2 --crawl-pages 100
+
+Each input item becomes one JSON line in the output file. Items that already
+have a successful line in the output are skipped, so an interrupted run can
+be resumed by running the same command again. With --incremental, web page
+segments unchanged since the previous run reuse that run's translations.
+With --crawl, each URL is a seed: the pages crawled from it each become a
+line, and the site counts as done once its seed page is.
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from crawler import crawl_website
+from documents import iter_document, segment_text, translate_stream
+from export import write_translated_html
+from incremental import translate_content_incremental
+from language_id import detect_page_language
+from metrics import dump_json, get_metrics
+from scraper import scrape_website
+from translator import (assemble_translation, content_segments, get_translation_stats, new_usage, segment_workers,
+                        set_rate_limiter, translate_content)
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+def collect_items(inputs):
+    """
+    Expand CLI inputs into work items.
+
+    Directories contribute every PDF/DOCX/TXT file below them; other files
+    are read as URL lists with one URL per line (blank lines and lines
+    starting with '#' are ignored).
+
+    Args:
+        inputs (list): Paths given on the command line
+
+    Returns:
+        list: (item id, kind) tuples where kind is 'url' or 'document'
+    """
+    items = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                        items.append((os.path.join(root, name), 'document'))
+        else:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        items.append((line, 'url'))
+    return items
+
+def load_checkpoint(output_path):
+    """
+    Read the ids of items already completed in an existing output file.
+
+    Args:
+        output_path (str): JSONL output file
+
+    Returns:
+        set: Ids of items with a successful result
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by an interrupted run
+            if 'error' not in record and not record.get('failed_segments'):
+                done.add(record['id'])
+    return done
+
+def detect_source_lang(texts):
+    """
+    Pick the main source language of a page or document ('en' if unknown).
+    """
+    return detect_page_language(texts)[0]
+
+def translate_page_to_html(content, source_lang, target_lang, path, max_workers=1):
+    """
+    Translate a page scraped with preserve_html, writing its translated HTML
+    to ``path`` as the element translations arrive.
+
+    Args:
+        max_workers (int): API requests in flight at once (see ``translator.translate_segments``)
+
+    Returns:
+        dict: Translated title and paragraphs with ``failed_segments`` and ``usage``
+            (see ``translator.translate_content``), without ``translated_html``
+    """
+    head = 1 + len(content['paragraphs'])
+    head_results = []
+    usage = new_usage()
+    failed = 0
+
+    def element_translations():
+        nonlocal failed
+        results = translate_stream(content_segments(content), source_lang, target_lang,
+                                   max_workers=max_workers, usage=usage)
+        for position, result in enumerate(results):
+            if position < head:
+                head_results.append(result)
+            else:
+                failed += not result.ok
+                yield result.translation
+
+    with open(path, 'wb') as f:
+        write_translated_html(content, element_translations(), f)
+
+    translated = assemble_translation({'title': content['title'], 'paragraphs': content['paragraphs']}, head_results)
+    translated['failed_segments'] += failed
+    usage['saved_characters'] = usage['characters'] - usage['api_characters']
+    translated['usage'] = usage
+    return translated
+
+def translate_url(url, args):
+    """
+    Scrape and translate one web page.
+
+    Returns:
+        dict: Output record
+    """
+    content = scrape_website(url, preserve_html=bool(args.html_dir), timeout=args.timeout)
+    if 'error' in content:
+        return {'id': url, 'type': 'url', 'error': content['error']}
+    return translate_page(url, content, args)
+
+def translate_page(url, content, args):
+    """
+    Translate one scraped web page.
+
+    Args:
+        url (str): Id of the output record
+        content (dict): Result of ``scrape_website`` or one page of ``crawl_website``
+        args (argparse.Namespace): Parsed command line
+
+    Returns:
+        dict: Output record
+    """
+    source_lang = args.source
+    if source_lang == 'auto':
+        source_lang = detect_source_lang([content['title']] + content['paragraphs'])
+
+    html_file = None
+    if args.html_dir and 'html_template' in content:
+        html_file = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+
+    if args.incremental:
+        translated = translate_content_incremental(content, source_lang, args.target,
+                                                   max_workers=args.segment_workers)
+        if html_file:
+            with open(os.path.join(args.html_dir, html_file), 'wb') as f:
+                write_translated_html(content, (e['translated'] for e in translated['translated_elements']), f)
+    elif html_file:
+        translated = translate_page_to_html(content, source_lang, args.target, os.path.join(args.html_dir, html_file),
+                                            max_workers=args.segment_workers)
+    else:
+        translated = translate_content(content, source_lang, args.target, max_workers=args.segment_workers)
+    record = {
+        'id': url,
+        'type': 'url',
+        'source_lang': source_lang,
+        'target_lang': args.target,
+        'title': translated['original_title'],
+        'translated_title': translated['translated_title'],
+        'paragraphs': translated['paragraphs'],
+        'failed_segments': translated['failed_segments'],
+        'characters': len(content['title']) + sum(len(p) for p in content['paragraphs'])
+    }
+    record['api_characters_saved'] = translated['usage']['saved_characters']
+    if 'incremental' in translated:
+        record['reused_percent'] = round(translated['incremental']['reused_percent'], 1)
+
+    if html_file:
+        record['html_file'] = html_file
+
+    return record
+
+def translate_site(seed_url, args):
+    """
+    Crawl a site from a seed URL and translate every page found.
+
+    Returns:
+        list: One output record per page; the seed page's record has the seed
+            URL as its id, so a resumed run skips the site
+    """
+    pages = crawl_website(seed_url, max_depth=args.crawl_depth, max_pages=args.crawl_pages,
+                          timeout=args.timeout, preserve_html=bool(args.html_dir))
+    records = []
+    for page in pages:
+        url = seed_url if page['depth'] == 0 else page['url']
+        if 'error' in page:
+            record = {'id': url, 'type': 'url', 'error': page['error']}
+        else:
+            try:
+                record = translate_page(url, page, args)
+            except Exception as e:
+                record = {'id': url, 'type': 'url', 'error': str(e)}
+        record['site'] = seed_url
+        record['depth'] = page['depth']
+        records.append(record)
+    return records
+
+def translate_file(path, args):
+    """
+    Extract and translate one document.
+
+    Returns:
+        dict: Output record
+    """
+    with open(path, 'rb') as f:
+        segments = segment_text(iter_document(f, path))
+        first = next(segments, None)
+        if first is None:
+            return {'id': path, 'type': 'document', 'source_lang': args.source, 'target_lang': args.target,
+                    'segments': [], 'characters': 0}
+
+        source_lang = args.source
+        if source_lang == 'auto':
+            source_lang = detect_source_lang([first])
+
+        def all_segments():
+            yield first
+            yield from segments
+
+        results = [result.to_dict() for result in translate_stream(all_segments(), source_lang, args.target,
+                                                                   max_workers=args.segment_workers)]
+
+    return {
+        'id': path,
+        'type': 'document',
+        'source_lang': source_lang,
+        'target_lang': args.target,
+        'segments': results,
+        'failed_segments': sum(1 for result in results if result['status'] == 'failed'),
+        'characters': sum(len(result['original']) for result in results)
+    }
+
+def cache_summary():
+    """
+    Describe the translation memory, HTTP cache and client reuse of this run.
+
+    Returns:
+        str: One line built from the collected gauges (see ``metrics.register_collector``)
+    """
+    gauges = {gauge['name']: gauge['value'] for gauge in get_metrics()['gauges']}
+    parts = []
+    if 'translation_memory_hit_rate' in gauges:
+        parts.append(f"translation memory {gauges['translation_memory_hit_rate']:.0%} hits, "
+                     f"{gauges['translation_memory_characters_saved']:,} characters saved")
+    if 'http_cache_hit_rate' in gauges:
+        parts.append(f"HTTP cache {gauges['http_cache_hit_rate']:.0%} revalidated, "
+                     f"{gauges['http_cache_bytes_saved']:,} bytes saved")
+    if gauges.get('client_pool_client_creations'):
+        parts.append(f"{gauges['client_pool_client_creations']} API clients, "
+                     f"{gauges['client_pool_connections_reused']:,} connection reuses")
+    return '; '.join(parts)
+
+def process_item(item, args):
+    """
+    Translate one work item, turning failures into error records.
+
+    Returns:
+        list: Output records (several for a crawled site)
+    """
+    item_id, kind = item
+    try:
+        if kind == 'url' and args.crawl:
+            return translate_site(item_id, args)
+        if kind == 'url':
+            return [translate_url(item_id, args)]
+        return [translate_file(item_id, args)]
+    except Exception as e:
+        return [{'id': item_id, 'type': kind, 'error': str(e)}]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help="URL list files and/or document directories")
+    parser.add_argument('-o', '--output', required=True, help="JSONL output file (also the resume checkpoint)")
+    parser.add_argument('--html-dir', help="Also write translated HTML of each web page to this directory")
+    parser.add_argument('--source', default='auto', help="Source language code (default: auto)")
+    parser.add_argument('--target', default='en', help="Target language code (default: en)")
+    parser.add_argument('--workers', type=int, default=4, help="Items processed concurrently (default: 4)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only translate web page segments that changed since the previous run")
+    parser.add_argument('--timeout', type=int, default=15, help="Request timeout for web pages in seconds")
+    parser.add_argument('--crawl', action='store_true',
+                        help="Treat each URL as a seed and translate the pages crawled from it")
+    parser.add_argument('--crawl-depth', type=int, default=2, help="Links followed from each seed (default: 2)")
+    parser.add_argument('--crawl-pages', type=int, default=50, help="Pages crawled per seed (default: 50)")
+    parser.add_argument('--segment-workers', type=int, default=segment_workers(1),
+                        help="API requests in flight per item (default: DHIVEHI_SEGMENT_WORKERS or 1)")
+    parser.add_argument('--chars-per-second', type=float, default=None,
+                        help="Characters sent to the API per second across all items "
+                             "(default: DHIVEHI_CHARS_PER_SECOND or no limit)")
+    parser.add_argument('--metrics', help="Write the metrics and cache statistics to this JSON file at the end")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chars_per_second is not None:
+        set_rate_limiter(args.chars_per_second)
+
+    if args.html_dir:
+        os.makedirs(args.html_dir, exist_ok=True)
+
+    items = collect_items(args.inputs)
+    done = load_checkpoint(args.output)
+    todo = [item for item in items if item[0] not in done]
+    print(f"{len(items)} items, {len(items) - len(todo)} already done, {len(todo)} to translate", file=sys.stderr)
+
+    stats_before = get_translation_stats()
+    start = time.perf_counter()
+    completed = 0
+    failed = 0
+    characters = 0
+
+    workers = max(args.workers, 1)
+    queue = iter(todo)
+    pending = set()
+    with open(args.output, 'a', encoding='utf-8') as output, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Keep a bounded window of items submitted, so memory does not grow
+            # with the size of the run; records are dropped once written
+            for item in itertools.islice(queue, 2 * workers - len(pending)):
+                pending.add(executor.submit(process_item, item, args))
+            if not pending:
+                break
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                for record in future.result():
+                    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    if 'error' in record:
+                        failed += 1
+                        print(f"failed: {record['id']}: {record['error']}", file=sys.stderr)
+                    else:
+                        completed += 1
+                        characters += record.get('characters', 0)
+                output.flush()  # Every finished item is checkpointed immediately
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    stats_after = get_translation_stats()
+    api_calls = stats_after['api_calls'] - stats_before['api_calls']
+    print(
+        f"translated {completed} items ({failed} failed) in {elapsed:.1f}s: "
+        f"{completed / elapsed:.2f} pages/s, {characters / elapsed:,.0f} characters/s, {api_calls} API calls",
+        file=sys.stderr
+    )
+    summary = cache_summary()
+    if summary:
+        print(summary, file=sys.stderr)
+    if args.metrics:
+        dump_json(args.metrics)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+import threading
+from metrics import register_collector
+
+# One client per credentials file. Each client owns an authorized HTTP session,
+# so reusing it keeps the auth token and the TLS connections alive across calls.
+_clients = {}
+_lock = threading.Lock()
+_stats = {
+    'client_creations': 0,
+    'client_reuses': 0
+}
+
+def get_client(credentials_path=None):
+    """
+    Get a shared Translation API client, creating it on first use.
+
+    Clients are cached per credentials file, so different Google Cloud projects
+    can be targeted by passing their service account key. Safe to call from
+    multiple threads.
+
+    Args:
+        credentials_path (str, optional): Service account JSON for the target project
+            (default: GOOGLE_APPLICATION_CREDENTIALS or application default credentials)
+
+    Returns:
+        google.cloud.translate_v2.Client: Shared client for the project
+    """
+    if credentials_path is None:
+        credentials_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    key = credentials_path or 'default'
+
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            _stats['client_reuses'] += 1
+            return client
+
+        # Imported on first use: the client library takes a large share of
+        # startup time and is not needed with other backends
+        from google.cloud import translate_v2 as translate
+        if credentials_path:
+            client = translate.Client.from_service_account_json(credentials_path)
+        else:
+            client = translate.Client()
+        _clients[key] = client
+        _stats['client_creations'] += 1
+        return client
+
+def get_client_stats():
+    """
+    Get counters for client creation and HTTP connection reuse.
+
+    ``connections_reused`` counts requests that went over an already open
+    connection, i.e. requests that did not pay for a new TLS handshake.
+
+    Returns:
+        dict: Client and connection counters
+    """
+    connections = 0
+    requests_sent = 0
+
+    with _lock:
+        stats = dict(_stats)
+        clients = list(_clients.values())
+
+    for client in clients:
+        # The HTTP session is created lazily by the client on its first request
+        session = getattr(client, '_http_internal', None)
+        if session is None:
+            continue
+        for adapter in session.adapters.values():
+            pool_manager = getattr(adapter, 'poolmanager', None)
+            if pool_manager is None:
+                continue
+            for pool_key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+
+    stats['connections_opened'] = connections
+    stats['http_requests'] = requests_sent
+    stats['connections_reused'] = max(requests_sent - connections, 0)
+    return stats
+
+register_collector('client_pool', get_client_stats)
+
+def reset_clients():
+    """
+    Close and forget all cached clients, e.g. after rotating credentials.
+    """
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
@@ -0,0 +1,192 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+# HTTP status codes worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for staying under API quotas.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. With
+    the Translation API the natural unit is characters, since quotas are
+    expressed in characters per minute.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float, optional): Maximum burst size (default: one second of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire_async(self, tokens=1):
+        """
+        Take ``tokens``, waiting without blocking the event loop until the quota allows them.
+
+        Requests larger than the bucket are charged in full: the bucket goes
+        into debt and the caller waits until it is paid off, so large
+        batches cannot exceed the quota.
+
+        Args:
+            tokens (float): Number of tokens to take
+        """
+        wait = self._take(float(tokens))
+        if wait:
+            await asyncio.sleep(wait)
+
+    def _take(self, tokens):
+        # Take the tokens, possibly going into debt, and return the seconds
+        # to wait until the balance is no longer negative
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for a failing backend.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. Then a single trial
+    call is let through (half-open): a success closes the circuit again, a
+    failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check whether a call may be made now.
+
+        Returns:
+            bool: False while the circuit is open or a trial call is in flight
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self):
+        """
+        Get the time left until the open circuit lets a trial call through.
+
+        Returns:
+            float: Seconds to wait, 0 if ``allow`` may succeed now
+        """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+def error_code(error):
+    """
+    Get the HTTP status code carried by an API error.
+
+    Args:
+        error (Exception): Error raised by the API client
+
+    Returns:
+        int: Status code, or None if the error has none
+    """
+    # google.api_core exceptions carry the HTTP status in ``code``,
+    # requests' HTTPError carries it on the response
+    code = getattr(error, 'code', None)
+    if code is None:
+        response = getattr(error, 'response', None)
+        code = getattr(response, 'status_code', None)
+    return code
+
+def is_retryable(error):
+    """
+    Check whether an API error is transient (HTTP 429 or 5xx).
+
+    Args:
+        error (Exception): Error raised by the API client
+
+    Returns:
+        bool: True if the call should be retried
+    """
+    return error_code(error) in RETRYABLE_STATUS_CODES
+
+async def gather_ordered(func, items, max_workers=1):
+    """
+    Await ``func`` for every item with at most ``max_workers`` in flight.
+
+    Args:
+        func (callable): Coroutine function taking a single item
+        items (list): Items to process
+        max_workers (int): Maximum number of concurrent calls
+
+    Returns:
+        list: Results in input order
+    """
+    semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+def run_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Called from a thread that is already running an event loop (e.g. a
+    crawler callback), the coroutine runs on a loop of its own in a helper
+    thread instead.
+
+    Args:
+        coroutine (coroutine): Coroutine to run
+
+    Returns:
+        object: Result of the coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
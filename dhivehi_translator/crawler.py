@@ -0,0 +1,217 @@
+import asyncio
+import concurrent.futures
+import time
+import urllib.robotparser
+from urllib.parse import urldefrag, urljoin, urlparse
+from html_utils import parse_html
+from metrics import inc, timed
+from scraper import HEADERS, extract_content, fetch_html, get_session, response_markup
+
+# Links to files that are not web pages
+SKIP_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.mp3', '.mp4', '.avi', '.css', '.js'
+)
+
+def _page_links(soup, base_url, host):
+    """
+    Collect same-host page links from a parsed page, in document order.
+    """
+    links = []
+    for anchor in soup.find_all('a', href=True):
+        url, _ = urldefrag(urljoin(base_url, anchor['href']))
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc != host:
+            continue
+        if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+            continue
+        links.append(url)
+    return links
+
+class SiteCrawler:
+    """
+    Asyncio crawler that extracts the pages of a site starting from one URL.
+
+    Pages are fetched over the shared pooled HTTP session on a thread pool,
+    with at most ``per_host_concurrency`` requests in flight per host and at
+    least ``delay`` seconds between request starts to the same host. Links
+    are followed breadth-first on the seed's host (after any redirect) up to
+    ``max_depth`` links away, and at most ``max_pages`` pages are fetched.
+    Every page goes through ``scraper.extract_content`` like a single
+    ``scrape_website`` call.
+    """
+
+    def __init__(self, max_depth=2, max_pages=50, per_host_concurrency=4, delay=1.0,
+                 timeout=10, preserve_html=False, respect_robots=True, parser=None, session=None):
+        """
+        Args:
+            max_depth (int): Maximum number of links followed from the seed URL
+            max_pages (int): Maximum number of pages fetched
+            per_host_concurrency (int): Maximum requests in flight per host
+            delay (float): Minimum seconds between requests to the same host
+            timeout (int): Timeout for each request in seconds
+            preserve_html (bool): Whether to preserve HTML structure for in-place translation
+            respect_robots (bool): Whether to obey robots.txt (including Crawl-delay)
+            parser (str, optional): HTML parser backend (default: fastest available)
+            session (requests.Session, optional): Session to use instead of the shared one
+        """
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.per_host_concurrency = per_host_concurrency
+        self.delay = delay
+        self.timeout = timeout
+        self.preserve_html = preserve_html
+        self.respect_robots = respect_robots
+        self.parser = parser
+        self.session = session or get_session()
+        self._host_slots = {}
+        self._host_locks = {}
+        self._host_last_request = {}
+        self._host_delay = {}
+        self._robots = {}
+        self._executor = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _robots_for(self, url):
+        parsed = urlparse(url)
+        host = parsed.netloc
+        if host not in self._robots:
+            robots = urllib.robotparser.RobotFileParser()
+            try:
+                response = await self._run(
+                    lambda: self.session.get(f"{parsed.scheme}://{host}/robots.txt", timeout=self.timeout)
+                )
+                if response.status_code in (401, 403):
+                    robots.disallow_all = True
+                elif response.ok:
+                    robots.parse(response.text.splitlines())
+                else:
+                    robots.allow_all = True
+            except Exception:
+                robots.allow_all = True
+            self._robots[host] = robots
+            crawl_delay = robots.crawl_delay(HEADERS['User-Agent'])
+            self._host_delay[host] = max(self.delay, float(crawl_delay or 0))
+        return self._robots[host]
+
+    async def _wait_turn(self, host):
+        # Space out request starts to the same host
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._host_delay.get(host, self.delay)
+            wait = self._host_last_request.get(host, 0) + delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_request[host] = time.monotonic()
+
+    def _process(self, url, response, depth):
+        # Runs on the thread pool: parsing and extraction are CPU work
+        inc('bytes_fetched_total', len(response.content))
+        with timed('parse'):
+            soup = parse_html(response_markup(response), self.parser)
+        links = _page_links(soup, response.url, urlparse(response.url).netloc) if depth < self.max_depth else []
+        with timed('extract'):
+            result = extract_content(soup, url, self.preserve_html)
+        inc('pages_total', outcome='crawled')
+        result['depth'] = depth
+        return result, links, response.url
+
+    async def _fetch_page(self, url, depth):
+        # Returns the result, the links to follow and the URL after redirects
+        host = urlparse(url).netloc
+        if self.respect_robots and not (await self._robots_for(url)).can_fetch(HEADERS['User-Agent'], url):
+            return {'error': "Disallowed by robots.txt", 'url': url, 'depth': depth}, [], url
+
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with slots:
+            await self._wait_turn(host)
+            try:
+                response = await self._run(fetch_html, url, self.timeout, self.session)
+            except Exception as e:
+                return {'error': str(e), 'url': url, 'depth': depth}, [], url
+
+        try:
+            return await self._run(self._process, url, response, depth)
+        except Exception as e:
+            return {'error': str(e), 'url': url, 'depth': depth}, [], url
+
+    async def crawl(self, seed_url):
+        """
+        Crawl a site starting from ``seed_url``.
+
+        Args:
+            seed_url (str): First page to fetch
+
+        Returns:
+            list: One ``extract_content`` result (or error dict) per page, in
+                discovery order, each with the page's link ``depth``
+        """
+        seed_url, _ = urldefrag(seed_url)
+        host = urlparse(seed_url).netloc
+        seen = {seed_url}
+        order = [seed_url]
+        results = {}
+        queue = asyncio.Queue()
+        queue.put_nowait((seed_url, 0))
+
+        async def worker():
+            nonlocal host
+            while True:
+                url, depth = await queue.get()
+                try:
+                    result, links, final_url = await self._fetch_page(url, depth)
+                    results[url] = result
+                    if depth == 0:
+                        # The site is where the seed ended up after redirects (e.g. to www. or https)
+                        final_url, _ = urldefrag(final_url)
+                        host = urlparse(final_url).netloc
+                        seen.add(final_url)
+                    for link in links:
+                        # Only pages queued for fetching count, not the seed's redirect target
+                        if len(order) >= self.max_pages:
+                            break
+                        if link not in seen and urlparse(link).netloc == host:
+                            seen.add(link)
+                            order.append(link)
+                            queue.put_nowait((link, depth + 1))
+                finally:
+                    queue.task_done()
+
+        workers_count = max(self.per_host_concurrency, 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+            self._executor = executor
+            workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+            try:
+                await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self._executor = None
+
+        return [results[url] for url in order if url in results]
+
+def crawl_website(seed_url, max_depth=2, max_pages=50, per_host_concurrency=4, delay=1.0, timeout=10,
+                  preserve_html=False, respect_robots=True, parser=None):
+    """
+    Crawl and extract a site from a seed URL (see ``SiteCrawler``).
+
+    Args:
+        seed_url (str): First page to fetch, e.g. a dhivehiacademy.edu.mv section
+        max_depth (int): Maximum number of links followed from the seed URL
+        max_pages (int): Maximum number of pages fetched
+        per_host_concurrency (int): Maximum requests in flight per host
+        delay (float): Minimum seconds between requests to the same host
+        timeout (int): Timeout for each request in seconds
+        preserve_html (bool): Whether to preserve HTML structure for in-place translation
+        respect_robots (bool): Whether to obey robots.txt
+        parser (str, optional): HTML parser backend (default: fastest available)
+
+    Returns:
+        list: One result dict per page, as returned by ``scrape_website``, plus ``depth``
+    """
+    crawler = SiteCrawler(max_depth, max_pages, per_host_concurrency, delay, timeout,
+                          preserve_html, respect_robots, parser)
+    return asyncio.run(crawler.crawl(seed_url))
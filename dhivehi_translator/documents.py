@@ -0,0 +1,300 @@
+import collections
+import concurrent.futures
+import io
+import itertools
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+from metrics import inc, observe, timed
+from translator import MAX_BATCH_CHARS, MAX_BATCH_SEGMENTS, translate_segments
+
+# Largest segment sent to the API. Long pages are split at sentence boundaries
+# so no single request carries a whole document.
+MAX_SEGMENT_CHARS = 5000
+
+# Pages handed to a worker process at a time when extracting PDFs in parallel
+PDF_PAGES_PER_TASK = 16
+
+# PyPDF2 and python-docx are imported by the extractors that need them, so
+# importing this module (and the app) does not load either library
+
+# Sentence ends: Latin punctuation plus the Arabic question mark used in Thaana text
+_sentence_end_pattern = re.compile(r'(?<=[.!?؟])\s+')
+
+def _extract_page_range(path, start, stop):
+    """
+    Worker process: extract pages ``start`` to ``stop - 1`` of a PDF file.
+
+    The file is memory-mapped rather than read, so all workers share the
+    operating system's single cached copy of it.
+
+    Returns:
+        list: (page number, text, seconds) for each page in the range
+    """
+    import PyPDF2
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        pdf_reader = PyPDF2.PdfReader(buffer)
+        results = []
+        for page_number in range(start, stop):
+            page_start = time.perf_counter()
+            text = pdf_reader.pages[page_number].extract_text() or ""
+            results.append((page_number, text, time.perf_counter() - page_start))
+        return results
+
+def iter_pdf_page_results(pdf_file, workers=None, pages_per_task=PDF_PAGES_PER_TASK):
+    """
+    Extract text from a PDF file page by page, optionally on several processes.
+
+    With more than one worker, page ranges of ``pages_per_task`` pages are
+    extracted by a process pool; results are still yielded in page order.
+    At most two ranges per worker are queued ahead of the consumer, and
+    ranges not started yet are cancelled when the generator is closed.
+
+    Args:
+        pdf_file (file or str): PDF file object or path
+        workers (int, optional): Number of worker processes (default: extract in this process)
+        pages_per_task (int): Pages per worker task
+
+    Yields:
+        tuple: (page number, text, extraction time in seconds) for each page
+    """
+    import PyPDF2
+    path = pdf_file if isinstance(pdf_file, str) else None
+    temp_path = None
+    try:
+        if path is None and workers and workers > 1:
+            # Workers need a file they can map; spill the upload to disk once
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp:
+                pdf_file.seek(0)
+                shutil.copyfileobj(pdf_file, temp)
+                temp_path = path = temp.name
+
+        if path is not None:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                page_count = len(PyPDF2.PdfReader(buffer).pages)
+        else:
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            page_count = len(pdf_reader.pages)
+
+        # Small documents are not worth starting processes for
+        if not workers or workers <= 1 or page_count <= pages_per_task:
+            if path is not None:
+                yield from _extract_page_range(path, 0, page_count)
+            else:
+                for page_number, page in enumerate(pdf_reader.pages):
+                    page_start = time.perf_counter()
+                    text = page.extract_text() or ""
+                    yield page_number, text, time.perf_counter() - page_start
+            return
+
+        ranges = iter([(start, min(start + pages_per_task, page_count))
+                       for start in range(0, page_count, pages_per_task)])
+        task_count = -(-page_count // pages_per_task)
+        # Spawn rather than fork: the app calls this from a multithreaded server
+        # (see jobs.start_workers)
+        context = multiprocessing.get_context('spawn')
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, task_count), mp_context=context) as executor:
+            futures = collections.deque(executor.submit(_extract_page_range, path, start, stop)
+                                        for start, stop in itertools.islice(ranges, 2 * workers))
+            try:
+                # Collect in submission order to keep pages in order
+                while futures:
+                    results = futures.popleft().result()
+                    for start, stop in itertools.islice(ranges, 1):
+                        futures.append(executor.submit(_extract_page_range, path, start, stop))
+                    yield from results
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+def iter_pdf_pages(pdf_file, workers=None):
+    """
+    Extract text from a PDF file one page at a time.
+
+    Args:
+        pdf_file (file or str): PDF file object or path
+        workers (int, optional): Number of worker processes (default: extract in this process)
+
+    Yields:
+        str: Text of each page
+    """
+    for _, text, seconds in iter_pdf_page_results(pdf_file, workers):
+        observe('stage_seconds', seconds, stage='pdf_page')
+        inc('document_pages_total', format='pdf')
+        yield text
+
+def iter_docx_paragraphs(docx_file):
+    """
+    Extract text from a DOCX file one paragraph at a time.
+
+    Args:
+        docx_file (file): DOCX file object
+
+    Yields:
+        str: Text of each paragraph
+    """
+    import docx
+    with timed('docx_load'):
+        doc = docx.Document(docx_file)
+    for para in doc.paragraphs:
+        inc('document_pages_total', format='docx')
+        yield para.text
+
+def iter_txt_paragraphs(txt_file):
+    """
+    Extract text from a UTF-8 TXT file one paragraph at a time.
+
+    Args:
+        txt_file (file): Binary file object
+
+    Yields:
+        str: Text of each blank-line separated paragraph
+    """
+    reader = io.TextIOWrapper(txt_file, encoding='utf-8')
+    try:
+        lines = []
+        for line in reader:
+            if line.strip():
+                lines.append(line)
+            elif lines:
+                inc('document_pages_total', format='txt')
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            inc('document_pages_total', format='txt')
+            yield ''.join(lines)
+    finally:
+        # Leave the caller's file open
+        reader.detach()
+
+def iter_document(file, filename, workers=None):
+    """
+    Extract text chunks lazily from a PDF, DOCX or TXT file.
+
+    Args:
+        file (file): Document file object
+        filename (str): File name, used to pick the extractor
+        workers (int, optional): Worker processes for PDF page extraction
+
+    Yields:
+        str: Page, paragraph or text chunk
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return iter_pdf_pages(file, workers)
+    if name.endswith('.docx'):
+        return iter_docx_paragraphs(file)
+    if name.endswith('.txt'):
+        return iter_txt_paragraphs(file)
+    raise ValueError(f"Unsupported file format: {filename}")
+
+def _split_long(text, max_chars):
+    # Hard split a single over-long sentence at whitespace where possible
+    while len(text) > max_chars:
+        cut = text.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield text[:cut].strip()
+        text = text[cut:].strip()
+    if text:
+        yield text
+
+def segment_text(chunks, max_chars=MAX_SEGMENT_CHARS):
+    """
+    Split text chunks into translation segments at sentence boundaries.
+
+    Sentences of the same chunk are packed together up to ``max_chars``.
+    Segments never span two chunks, so page and paragraph breaks survive.
+
+    Args:
+        chunks (iterable): Text chunks, e.g. from ``iter_document``
+        max_chars (int): Maximum segment length
+
+    Yields:
+        str: Segments of at most ``max_chars`` characters
+    """
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        if len(chunk) <= max_chars:
+            yield chunk
+            continue
+
+        current = ''
+        for sentence in _sentence_end_pattern.split(chunk):
+            for piece in _split_long(sentence, max_chars):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    yield current
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            yield current
+
+def translate_stream(segments, source_lang='auto', target_lang='en', max_workers=1, **kwargs):
+    """
+    Translate a stream of segments, yielding results as each group finishes.
+
+    Only one group of segments (enough for ``max_workers`` full API requests)
+    is held in memory at a time. Failed segments are retried within their
+    group (see ``translator.translate_segments_async``); a segment that still
+    fails is yielded with status 'failed' and its original text.
+
+    Args:
+        segments (iterable): Segments, e.g. from ``segment_text``
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        max_workers (int): Maximum number of API requests in flight (default: 1)
+        **kwargs: Further options for ``translate_segments``
+
+    Yields:
+        SegmentResult: Result of each segment, in input order
+    """
+    max_segments = MAX_BATCH_SEGMENTS * max_workers
+    max_chars = MAX_BATCH_CHARS * max_workers
+
+    group = []
+    group_chars = 0
+    for segment in segments:
+        group.append(segment)
+        group_chars += len(segment)
+        if len(group) >= max_segments or group_chars >= max_chars:
+            yield from translate_segments(group, source_lang, target_lang, max_workers=max_workers, **kwargs)
+            group = []
+            group_chars = 0
+
+    if group:
+        yield from translate_segments(group, source_lang, target_lang, max_workers=max_workers, **kwargs)
+
+def extract_text_from_pdf(pdf_file):
+    """Extract text from a PDF file"""
+    try:
+        return ''.join(page + "\n\n" for page in iter_pdf_pages(pdf_file))
+    except Exception as e:
+        return f"Error extracting text from PDF: {str(e)}"
+
+def extract_text_from_docx(docx_file):
+    """Extract text from a DOCX file"""
+    try:
+        return ''.join(para + "\n" for para in iter_docx_paragraphs(docx_file))
+    except Exception as e:
+        return f"Error extracting text from DOCX: {str(e)}"
+
+def extract_text_from_txt(txt_file):
+    """Extract text from a TXT file"""
+    try:
+        text = txt_file.getvalue().decode("utf-8")
+        return text
+    except Exception as e:
+        return f"Error extracting text from TXT: {str(e)}"
@@ -0,0 +1,445 @@
+"""
+Incremental export of translated output.
+
+Each exporter writes one format to a binary file as segments arrive, so a
+document is never held in memory as a whole:
+
+* ``txt``: the translated (or original) text, one paragraph per segment
+* ``jsonl``: one bilingual JSON record per segment
+* ``docx``: a Word document whose ``word/document.xml`` is streamed into
+  the zip archive
+* ``html``: a standalone HTML page, right-to-left for Thaana and Arabic
+  script targets
+
+``TranslatedHtmlWriter`` likewise writes a translated web page from the
+HTML template captured at scrape time, slot by slot as its elements are
+translated.
+
+Finished files can be served in fixed-size chunks by ``start_export_server``,
+so downloads do not load them into memory either. It is configured with:
+
+* DHIVEHI_EXPORT_PORT: port to listen on (the server is off without it)
+* DHIVEHI_EXPORT_HOST: host name put in download links, as browsers reach it
+* DHIVEHI_EXPORT_BIND: interface to listen on (default: DHIVEHI_EXPORT_HOST,
+  else 127.0.0.1); use 0.0.0.0 in containers
+* DHIVEHI_EXPORT_TTL: seconds after which exports in ``make_export_directory``
+  directories are deleted and their links stop working (default: one day)
+
+Example:
+    with ExportSet(directory, 'report', target_lang='dv') as exports:
+        for result in translate_stream(segments, 'en', 'dv'):
+            exports.write(result.text, result.translation, result.status)
+    exports.paths['docx']
+"""
+import html
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+# Languages written right to left
+RTL_LANGUAGES = {'dv', 'ar', 'ur', 'fa', 'he'}
+
+# Bytes read at a time when serving an export
+CHUNK_SIZE = 64 * 1024
+
+# Age in seconds at which exports are deleted
+EXPORT_TTL = float(os.environ.get('DHIVEHI_EXPORT_TTL', 24 * 3600))
+
+# Parent of the directories created by ``make_export_directory``
+EXPORT_ROOT = os.path.join(tempfile.gettempdir(), 'dhivehi_exports')
+
+# Characters XML 1.0 does not allow (other than tab, newline and carriage return)
+_XML_INVALID = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0xFFFE, 0xFFFF])
+
+class TxtExporter:
+    """
+    Plain text, one blank-line separated paragraph per segment.
+    """
+
+    extension = '.txt'
+    mime = 'text/plain'
+
+    def __init__(self, file, source_lang='auto', target_lang='en', column='translated'):
+        """
+        Args:
+            file (file): Binary file to write to
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+            column (str): 'translated' or 'original', the text to write
+        """
+        self.file = file
+        self.column = column
+
+    def write(self, original, translated, status='translated'):
+        """
+        Add one segment.
+
+        Args:
+            original (str): Source text
+            translated (str): Translation (the source text if it failed)
+            status (str): Segment status, see ``translator.SegmentResult``
+        """
+        text = translated if self.column == 'translated' else original
+        self.file.write((text + "\n\n").encode('utf-8'))
+
+    def close(self):
+        """
+        Finish the file; the file object itself is left open.
+        """
+        self.file.flush()
+
+class JsonlExporter(TxtExporter):
+    """
+    Bilingual JSON lines: ``{"original", "translated", "status"}`` per segment.
+    """
+
+    extension = '.jsonl'
+    mime = 'application/jsonl'
+
+    def __init__(self, file, source_lang='auto', target_lang='en'):
+        super().__init__(file, source_lang, target_lang)
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+
+    def write(self, original, translated, status='translated'):
+        record = {'original': original, 'translated': translated, 'status': status,
+                  'source_lang': self.source_lang, 'target_lang': self.target_lang}
+        self.file.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+
+class DocxExporter(TxtExporter):
+    """
+    Word document with one paragraph per translated segment.
+
+    The package parts are written first and ``word/document.xml`` is then
+    compressed into the archive paragraph by paragraph.
+    """
+
+    extension = '.docx'
+    mime = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+    CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    RELATIONSHIPS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+
+    def __init__(self, file, source_lang='auto', target_lang='en'):
+        super().__init__(file, source_lang, target_lang)
+        self._zip = zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED)
+        self._zip.writestr('[Content_Types].xml', self.CONTENT_TYPES)
+        self._zip.writestr('_rels/.rels', self.RELATIONSHIPS)
+        self._document = self._zip.open('word/document.xml', 'w', force_zip64=True)
+        self._document.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        )
+        if target_lang in RTL_LANGUAGES:
+            self._paragraph = '<w:p><w:pPr><w:bidi/></w:pPr><w:r><w:rPr><w:rtl/></w:rPr><w:t xml:space="preserve">{}</w:t></w:r></w:p>'
+        else:
+            self._paragraph = '<w:p><w:r><w:t xml:space="preserve">{}</w:t></w:r></w:p>'
+
+    def write(self, original, translated, status='translated'):
+        text = html.escape(translated.translate(_XML_INVALID), quote=False)
+        self._document.write(self._paragraph.format(text).encode('utf-8'))
+
+    def close(self):
+        self._document.write(b'<w:sectPr/></w:body></w:document>')
+        self._document.close()
+        self._zip.close()
+        self.file.flush()
+
+class HtmlExporter(TxtExporter):
+    """
+    Standalone HTML page with one paragraph per translated segment.
+    """
+
+    extension = '.html'
+    mime = 'text/html'
+
+    def __init__(self, file, source_lang='auto', target_lang='en'):
+        super().__init__(file, source_lang, target_lang)
+        direction = 'rtl' if target_lang in RTL_LANGUAGES else 'ltr'
+        self.file.write(
+            f'<!DOCTYPE html>\n<html lang="{html.escape(target_lang)}" dir="{direction}">\n'
+            f'<head><meta charset="utf-8"><title>Translation</title></head>\n<body>\n'.encode('utf-8')
+        )
+
+    def write(self, original, translated, status='translated'):
+        # Segments left in the original language can be styled apart
+        attributes = '' if status != 'failed' else ' class="untranslated"'
+        self.file.write(f'<p{attributes}>{html.escape(translated, quote=False)}</p>\n'.encode('utf-8'))
+
+    def close(self):
+        self.file.write(b'</body>\n</html>\n')
+        self.file.flush()
+
+EXPORTERS = {
+    'txt': TxtExporter,
+    'jsonl': JsonlExporter,
+    'docx': DocxExporter,
+    'html': HtmlExporter
+}
+
+class TranslatedHtmlWriter:
+    """
+    The translated page of content scraped with ``preserve_html``, written
+    from its ``html_template`` as element translations arrive.
+
+    Each slot of the template is written as soon as it and every slot
+    before it are known, followed by the literal HTML up to the next slot,
+    so the page is never assembled in memory.
+    """
+
+    def __init__(self, file, content):
+        """
+        Args:
+            file (file): Binary file to write to
+            content (dict): Result of ``scraper.scrape_website`` with ``preserve_html``
+        """
+        self.file = file
+        self._template = content['html_template']
+        self._elements = content['html_elements']
+        self._next = 0      # next slot to write
+        self._pending = {}  # slot -> text that arrived ahead of an earlier slot
+        self.file.write(self._template[0].encode('utf-8'))
+
+    def write(self, index, translated):
+        """
+        Fill the slot of one element.
+
+        Nested elements sharing a text share a slot; the first translation
+        of a slot is kept.
+
+        Args:
+            index (int): Position of the element in ``content['html_elements']``
+            translated (str): Its translation
+        """
+        slot = self._elements[index]['slot']
+        if slot >= self._next:
+            self._pending.setdefault(slot, translated)
+        while self._next in self._pending:
+            # Same escaping as BeautifulSoup's default "minimal" formatter
+            text = html.escape(self._pending.pop(self._next), quote=False)
+            self.file.write((text + self._template[self._next + 1]).encode('utf-8'))
+            self._next += 1
+
+    def close(self):
+        """
+        Write the rest of the page; slots never filled keep their original text.
+        """
+        for index, element in enumerate(self._elements):
+            if element['slot'] >= self._next and element['slot'] not in self._pending:
+                self.write(index, element['text'])
+        self.file.flush()
+
+def write_translated_html(content, translations, file):
+    """
+    Write the translated page of content scraped with ``preserve_html`` to a binary file.
+
+    Args:
+        content (dict): Result of ``scraper.scrape_website`` with ``preserve_html``
+        translations (iterable): Translation of each of ``content['html_elements']``,
+            in order; a generator is consumed as it yields
+        file (file): Binary file to write to
+    """
+    writer = TranslatedHtmlWriter(file, content)
+    for index, translated in enumerate(translations):
+        writer.write(index, translated)
+    writer.close()
+
+class ExportSet:
+    """
+    Several exports of the same translation, written side by side to files
+    in a directory as segments arrive.
+
+    Usable as a context manager that closes every exporter on exit.
+    """
+
+    def __init__(self, directory, basename, formats=('txt', 'jsonl', 'docx', 'html'), source_lang='auto',
+                 target_lang='en', original=True):
+        """
+        Args:
+            directory (str): Directory for the files
+            basename (str): File name without extension
+            formats (tuple): Keys of ``EXPORTERS`` to write
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+            original (bool): Also write the source text as ``original`` TXT
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.paths = {}
+        self.mimes = {}
+        self._files = []
+        self._exporters = []
+        names = [(fmt, EXPORTERS[fmt], {}) for fmt in formats]
+        if original:
+            names.append(('original', TxtExporter, {'column': 'original'}))
+        for fmt, exporter, options in names:
+            suffix = '_original' if fmt == 'original' else ''
+            path = os.path.join(directory, f"{basename}{suffix}{exporter.extension}")
+            file = open(path, 'w+b')
+            self._files.append(file)
+            self._exporters.append(exporter(file, source_lang, target_lang, **options))
+            self.paths[fmt] = path
+            self.mimes[fmt] = exporter.mime
+        self.segments = 0
+
+    def write(self, original, translated, status='translated'):
+        """
+        Add one segment to every export.
+        """
+        for exporter in self._exporters:
+            exporter.write(original, translated, status)
+        self.segments += 1
+
+    def close(self):
+        """
+        Finish and close every export file.
+        """
+        for exporter, file in zip(self._exporters, self._files):
+            if not file.closed:
+                exporter.close()
+                file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_exports = {}  # token -> (path, filename, mime, registration time)
+_exports_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+def make_export_directory():
+    """
+    Create a directory for one set of exports, deleting expired ones first.
+
+    Returns:
+        str: Path of a new directory under ``EXPORT_ROOT``
+    """
+    expire_exports()
+    os.makedirs(EXPORT_ROOT, exist_ok=True)
+    return tempfile.mkdtemp(dir=EXPORT_ROOT)
+
+def expire_exports(max_age=None):
+    """
+    Delete export directories not written to for ``max_age`` seconds and
+    forget download links older than that or whose file is gone.
+
+    Args:
+        max_age (float, optional): Age limit (default: ``EXPORT_TTL``)
+
+    Returns:
+        int: Number of directories deleted
+    """
+    cutoff = time.time() - (EXPORT_TTL if max_age is None else max_age)
+    removed = 0
+    try:
+        names = os.listdir(EXPORT_ROOT)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        path = os.path.join(EXPORT_ROOT, name)
+        try:
+            expired = os.path.getmtime(path) < cutoff
+        except OSError:
+            continue
+        if expired:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    with _exports_lock:
+        for token, (path, _, _, registered) in list(_exports.items()):
+            if registered < cutoff or not os.path.exists(path):
+                del _exports[token]
+    return removed
+
+def register_export(path, filename, mime='application/octet-stream'):
+    """
+    Make a finished export downloadable from the export server.
+
+    Args:
+        path (str): Export file
+        filename (str): Name offered to the browser
+        mime (str): MIME type
+
+    Returns:
+        str: URL of the download, or None if the export server is not running
+    """
+    if _server is None:
+        return None
+    token = uuid.uuid4().hex
+    with _exports_lock:
+        _exports[token] = (path, filename, mime, time.time())
+    host, port = _server.server_address[:2]
+    return f"http://{os.environ.get('DHIVEHI_EXPORT_HOST', host)}:{port}/exports/{token}/{quote(filename)}"
+
+def start_export_server(port=None, host=None):
+    """
+    Serve registered exports over HTTP from a background thread (once per process).
+
+    Files are streamed in ``CHUNK_SIZE`` pieces, so memory use does not grow
+    with their size.
+
+    Args:
+        port (int, optional): Port to listen on (default: DHIVEHI_EXPORT_PORT)
+        host (str, optional): Interface to listen on (default: DHIVEHI_EXPORT_BIND,
+            else DHIVEHI_EXPORT_HOST, else 127.0.0.1)
+
+    Returns:
+        ThreadingHTTPServer: The server, or None if no port is configured
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        if port is None:
+            port = os.environ.get('DHIVEHI_EXPORT_PORT')
+            if not port:
+                return None
+        if host is None:
+            host = os.environ.get('DHIVEHI_EXPORT_BIND') or os.environ.get('DHIVEHI_EXPORT_HOST') or '127.0.0.1'
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.split('/')
+                with _exports_lock:
+                    export = _exports.get(parts[2]) if len(parts) > 2 and parts[1] == 'exports' else None
+                if export is None or not os.path.exists(export[0]):
+                    self.send_error(404)
+                    return
+                path, filename, mime, _ = export
+                self.send_response(200)
+                self.send_header('Content-Type', mime)
+                self.send_header('Content-Length', str(os.path.getsize(path)))
+                self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(filename)}")
+                self.end_headers()
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True, name='export-server').start()
+        return _server
@@ -0,0 +1,110 @@
+import html
+import os
+import re
+
+# bs4 (and with it the parser backends) is imported on the first parse, so
+# modules that only need the template helpers start without it
+
+# Parser backends in order of preference. lxml is a C parser and several times
+# faster than the pure-Python html.parser, which is always available.
+PARSER_BACKENDS = ['lxml', 'html.parser']
+
+# Placeholders written into the tree before serializing it once. Private-use
+# code points do not appear in ordinary page text.
+SLOT_START = '\ue000'
+SLOT_END = '\ue001'
+_slot_pattern = re.compile(f'{SLOT_START}(\\d+){SLOT_END}')
+
+def available_parsers():
+    """
+    List the parser backends that can be used in this environment.
+
+    Returns:
+        list: Backend names in order of preference
+    """
+    from bs4 import BeautifulSoup, FeatureNotFound
+    available = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+            available.append(backend)
+        except FeatureNotFound:
+            continue
+    return available
+
+def parse_html(markup, parser=None):
+    """
+    Parse HTML with the fastest available parser backend.
+
+    Args:
+        markup (str): HTML to parse
+        parser (str, optional): Backend to use (default: DHIVEHI_HTML_PARSER or
+            the first available of PARSER_BACKENDS)
+
+    Returns:
+        BeautifulSoup: Parsed document
+    """
+    from bs4 import BeautifulSoup, FeatureNotFound
+    preferred = parser or os.environ.get('DHIVEHI_HTML_PARSER')
+    candidates = [preferred] if preferred else []
+    candidates += [backend for backend in PARSER_BACKENDS if backend not in candidates]
+
+    for backend in candidates:
+        try:
+            return BeautifulSoup(markup, backend)
+        except FeatureNotFound:
+            continue  # Fall back to the next backend
+    return BeautifulSoup(markup, 'html.parser')
+
+def index_by_attribute(soup, attribute):
+    """
+    Map the values of an attribute to their elements in one traversal.
+
+    Args:
+        soup (BeautifulSoup): Parsed document
+        attribute (str): Attribute name, e.g. 'data-translate-id'
+
+    Returns:
+        dict: Attribute value -> first element in document order carrying it
+    """
+    index = {}
+    for element in soup.find_all(attrs={attribute: True}):
+        index.setdefault(element[attribute], element)
+    return index
+
+def make_slot(index):
+    """
+    Build the placeholder marking template slot ``index``.
+    """
+    return f'{SLOT_START}{index}{SLOT_END}'
+
+def split_template(markup):
+    """
+    Split serialized HTML containing slot placeholders into literal chunks.
+
+    Args:
+        markup (str): Serialized HTML with placeholders in slot order
+
+    Returns:
+        list: Literal chunks; slot ``i`` goes between chunk ``i`` and ``i + 1``
+    """
+    # re.split keeps the captured slot numbers at the odd positions
+    return _slot_pattern.split(markup)[::2]
+
+def render_template(template, texts):
+    """
+    Fill a template from ``split_template`` with text.
+
+    Args:
+        template (list): Literal HTML chunks
+        texts (list): Plain text for each slot, HTML-escaped here
+
+    Returns:
+        str: HTML document
+    """
+    parts = [template[0]]
+    for chunk, text in zip(template[1:], texts):
+        # Same escaping as BeautifulSoup's default "minimal" formatter
+        parts.append(html.escape(text, quote=False))
+        parts.append(chunk)
+    return ''.join(parts)
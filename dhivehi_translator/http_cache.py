@@ -0,0 +1,248 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from metrics import register_collector
+
+# Default location of the cache. Set DHIVEHI_HTTP_CACHE_PATH to an empty string
+# to disable HTTP caching in scrape_website.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dhivehi_translator', 'http_cache.sqlite3')
+
+# Upper bound for the stored response bodies
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+_charset_pattern = re.compile(r'charset=([\w.:-]+)', re.I)
+
+class CachedPage:
+    """
+    Body of a fetched page, either fresh from the network or revalidated from the cache.
+    """
+
+    def __init__(self, url, body, content_type, not_modified):
+        self.url = url
+        self.body = body
+        self.content_type = content_type or ''
+        self.not_modified = not_modified
+
+    @property
+    def markup(self):
+        """
+        Markup for the parser: text when the server declared a charset, otherwise
+        bytes so the parser can detect the encoding from <meta charset>.
+        """
+        match = _charset_pattern.search(self.content_type)
+        if match:
+            try:
+                return self.body.decode(match.group(1), errors='replace')
+            except LookupError:
+                pass
+        return self.body
+
+class HttpCache:
+    """
+    On-disk HTTP cache with conditional revalidation.
+
+    Responses carrying an ETag or Last-Modified header are stored with their
+    body. Refetching the same URL sends If-None-Match/If-Modified-Since, and a
+    304 response is served from the stored body. The extraction result of a
+    stored page can be cached next to it, so an unchanged page is not parsed
+    again either. Bodies are evicted least recently used first once they
+    exceed ``max_bytes`` in total.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path (str): SQLite file holding the cache
+            max_bytes (int): Maximum total size of stored bodies
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'extraction_hits': 0,
+            'bytes_fetched': 0,
+            'bytes_saved': 0,
+            'evictions': 0
+        }
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT, "
+            "body BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "url TEXT NOT NULL, variant TEXT NOT NULL, result TEXT NOT NULL, PRIMARY KEY (url, variant))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self._db.commit()
+
+    def fetch(self, url, session, timeout=10):
+        """
+        Fetch a page, revalidating a stored copy if there is one.
+
+        Args:
+            url (str): URL to fetch
+            session (requests.Session): Session to fetch with
+            timeout (int): Timeout for the request in seconds
+
+        Returns:
+            CachedPage: The page body and whether it came from the cache
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, content_type, body, size FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+        headers = {}
+        if row:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and row:
+            with self._lock:
+                self._stats['requests'] += 1
+                self._stats['revalidated'] += 1
+                self._stats['bytes_saved'] += row[4]
+                self._db.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+                self._db.commit()
+            return CachedPage(url, row[3], row[2], True)
+
+        response.raise_for_status()  # Raise an exception for HTTP errors
+
+        body = response.content
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        content_type = response.headers.get('Content-Type')
+
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['misses'] += 1
+            self._stats['bytes_fetched'] += len(body)
+            # A changed page invalidates the extraction results of the old one
+            self._db.execute("DELETE FROM extractions WHERE url = ?", (url,))
+            if etag or last_modified:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_type, body, size, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, content_type, body, len(body), time.time())
+                )
+                self._evict()
+            else:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._db.commit()
+
+        return CachedPage(url, body, content_type, False)
+
+    def _evict(self):
+        # Caller holds the lock
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute("SELECT url, size FROM pages ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._db.execute("DELETE FROM extractions WHERE url = ?", (url,))
+            total -= size
+            self._stats['evictions'] += 1
+
+    def get_extraction(self, url, variant):
+        """
+        Get the cached extraction result of a stored page.
+
+        Args:
+            url (str): Page URL
+            variant (str): Extraction options the result was produced with
+
+        Returns:
+            dict: Extraction result, or None if there is none
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM extractions WHERE url = ? AND variant = ?", (url, variant)
+            ).fetchone()
+            if row:
+                self._stats['extraction_hits'] += 1
+        return json.loads(row[0]) if row else None
+
+    def put_extraction(self, url, variant, result):
+        """
+        Cache the extraction result of a stored page. Pages that were not
+        stored (no validators) are skipped, since they are never revalidated.
+
+        Args:
+            url (str): Page URL
+            variant (str): Extraction options the result was produced with
+            result (dict): Extraction result
+        """
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO extractions (url, variant, result) VALUES (?, ?, ?)",
+                    (url, variant, json.dumps(result, ensure_ascii=False))
+                )
+                self._db.commit()
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Request counts, hit rate, bytes fetched and bytes saved by 304 responses
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['stored_pages'], stats['stored_bytes'] = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        stats['hit_rate'] = stats['revalidated'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Remove every stored page and extraction result.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM extractions")
+            self._db.commit()
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_http_cache():
+    """
+    Get the process-wide HTTP cache, creating it on first use.
+
+    Returns:
+        HttpCache: Shared cache, or None if disabled via DHIVEHI_HTTP_CACHE_PATH
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            path = os.environ.get('DHIVEHI_HTTP_CACHE_PATH', DEFAULT_CACHE_PATH)
+            if not path:
+                return None
+            _default_cache = HttpCache(path)
+        return _default_cache
+
+def _shared_cache_stats():
+    # Report the shared cache only once something has created it
+    cache = _default_cache
+    return cache.stats() if cache is not None else None
+
+register_collector('http_cache', _shared_cache_stats)
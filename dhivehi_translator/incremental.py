@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from translation_memory import segment_key
+from translator import (STATUS_CACHED, SegmentResult, assemble_translation, content_segments, new_usage,
+                        translate_segments)
+
+# Default location of the snapshot store. Set DHIVEHI_SNAPSHOT_PATH to an empty
+# string to keep snapshots in-process only.
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dhivehi_translator', 'snapshots.sqlite3')
+
+class SnapshotStore:
+    """
+    Per-URL record of the segments translated in the previous run.
+
+    Each snapshot maps the fingerprint of every segment of a page (see
+    ``translation_memory.segment_key``) to its translation, for one language
+    pair. Saving a page replaces its previous snapshot, so segments that
+    disappeared from the page are dropped with it.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Args:
+            path (str, optional): SQLite file holding the snapshots (None for memory only)
+        """
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "url TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "segments TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (url, source_lang, target_lang))"
+        )
+        self._db.commit()
+
+    def load(self, url, source_lang, target_lang):
+        """
+        Get the snapshot of a page.
+
+        Args:
+            url (str): Page URL
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+
+        Returns:
+            dict: Fingerprint -> translation (empty if the page was never saved)
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segments FROM snapshots WHERE url = ? AND source_lang = ? AND target_lang = ?",
+                (url, source_lang, target_lang)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save(self, url, source_lang, target_lang, segments):
+        """
+        Replace the snapshot of a page.
+
+        Args:
+            url (str): Page URL
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+            segments (dict): Fingerprint -> translation
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots (url, source_lang, target_lang, segments, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, source_lang, target_lang, json.dumps(segments, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+
+    def clear(self):
+        """
+        Remove every snapshot.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM snapshots")
+            self._db.commit()
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_snapshot_store():
+    """
+    Get the process-wide snapshot store, creating it on first use.
+
+    Returns:
+        SnapshotStore: Shared store
+    """
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = SnapshotStore(os.environ.get('DHIVEHI_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH) or None)
+        return _default_store
+
+def translate_content_incremental(content, source_lang='auto', target_lang='en', store=None, **kwargs):
+    """
+    Translate scraped content, reusing the previous run's translations of unchanged segments.
+
+    Every segment of the page is fingerprinted and compared with the
+    snapshot saved for the same URL and language pair. Only new or changed
+    segments are sent to the API; the rest are stitched back in from the
+    snapshot. The new snapshot is saved afterwards, leaving out segments
+    whose translation failed so they are retried next time.
+
+    Args:
+        content (dict): Result of ``scrape_website``
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        store (SnapshotStore, optional): Store to use instead of the shared one
+        **kwargs: Further options for ``translate_segments``
+
+    Returns:
+        dict: Same as ``translate_content``, plus an ``incremental`` dict with
+            segment and character counts and the percentage of characters reused
+    """
+    if 'error' in content:
+        return content
+
+    store = store or get_snapshot_store()
+    url = content.get('url', '')
+    previous = store.load(url, source_lang, target_lang)
+
+    segments = content_segments(content)
+    fingerprints = [segment_key(text, source_lang, target_lang) for text in segments]
+
+    results = [
+        SegmentResult(text, previous[fingerprint], STATUS_CACHED) if fingerprint in previous else None
+        for text, fingerprint in zip(segments, fingerprints)
+    ]
+    changed = [i for i, result in enumerate(results) if result is None]
+    usage = new_usage()
+    if changed:
+        changed_results = translate_segments([segments[i] for i in changed], source_lang, target_lang,
+                                             usage=usage, **kwargs)
+        for i, result in zip(changed, changed_results):
+            results[i] = result
+
+    store.save(url, source_lang, target_lang, {
+        fingerprint: result.translation
+        for fingerprint, result in zip(fingerprints, results)
+        if result.ok
+    })
+
+    characters = sum(len(text) for text in segments)
+    changed_characters = sum(len(segments[i]) for i in changed)
+    reused_characters = characters - changed_characters
+
+    translated_content = assemble_translation(content, results)
+    usage['saved_characters'] = characters - usage['api_characters']
+    translated_content['usage'] = usage
+    translated_content['incremental'] = {
+        'segments': len(segments),
+        'reused_segments': len(segments) - len(changed),
+        'characters': characters,
+        'reused_characters': reused_characters,
+        'reused_percent': 100.0 * reused_characters / characters if characters else 100.0
+    }
+    return translated_content
@@ -0,0 +1,522 @@
+"""
+Persistent background jobs for long translations.
+
+Jobs are stored in a SQLite file shared by the app and a pool of worker
+processes. A worker claims a queued job, scrapes the page or extracts the
+document, and translates its segments in chunks, storing each chunk as it
+finishes so the UI can show progress and partial results. Running jobs
+send a heartbeat; a job whose worker died (no heartbeat for
+``STALE_AFTER`` seconds) is claimed again and resumes after the last
+stored chunk.
+
+Example:
+    queue = get_job_queue()
+    start_workers()
+    job_id = queue.submit_url('https://dv.wikipedia.org/wiki/...', 'dv', 'en')
+    queue.get(job_id)['progress']
+
+Workers can also run on their own:
+    python jobs.py --workers 4
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from documents import iter_document, segment_text
+from language_id import detect_page_language
+from scraper import scrape_website
+from translator import (SegmentResult, assemble_translation, content_segments, get_rate_limiter, segment_workers,
+                        set_rate_limiter, translate_segments)
+from warmup import warm_up
+
+# Default location of the job database. DHIVEHI_JOBS_PATH overrides it; the
+# file is shared between processes, so it cannot be memory-only.
+DEFAULT_JOBS_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dhivehi_translator', 'jobs.sqlite3')
+
+# Segments translated and stored per chunk
+CHUNK_SEGMENTS = 50
+
+# Seconds between heartbeats of a running job, and without one before the job is reclaimed
+HEARTBEAT_INTERVAL = 5
+STALE_AFTER = 60
+
+# Claims of a job before it is failed, so a job that crashes its worker is not retried forever
+MAX_ATTEMPTS = 3
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+class JobCancelled(Exception):
+    """
+    Raised in a worker when its job was cancelled.
+    """
+
+class JobQueue:
+    """
+    SQLite-backed queue of translation jobs and their per-segment results.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH):
+        """
+        Args:
+            path (str): SQLite file holding the jobs
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # WAL lets the UI read progress while a worker writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, source TEXT NOT NULL, data BLOB, "
+            "source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, options TEXT NOT NULL, "
+            "status TEXT NOT NULL, worker TEXT, heartbeat REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "content TEXT, total_segments INTEGER, done_segments INTEGER NOT NULL DEFAULT 0, "
+            "failed_segments INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_segments ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, original TEXT NOT NULL, "
+            "translated TEXT NOT NULL, status TEXT NOT NULL, error TEXT, PRIMARY KEY (job_id, position))"
+        )
+        self._db.commit()
+
+    def _submit(self, kind, source, data, source_lang, target_lang, options):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, source, data, source_lang, target_lang, options, status, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, source, data, source_lang, target_lang, json.dumps(options), QUEUED, now, now)
+            )
+            self._db.commit()
+        return job_id
+
+    def submit_url(self, url, source_lang='auto', target_lang='en', timeout=15):
+        """
+        Queue a web page for scraping and translation.
+
+        Args:
+            url (str): Page URL
+            source_lang (str): Source language code ('auto' to detect it)
+            target_lang (str): Target language code
+            timeout (int): Request timeout in seconds
+
+        Returns:
+            str: Job id
+        """
+        return self._submit('url', url, None, source_lang, target_lang, {'timeout': timeout})
+
+    def submit_document(self, data, filename, source_lang='auto', target_lang='en'):
+        """
+        Queue a document for extraction and translation.
+
+        Args:
+            data (bytes): Content of the PDF, DOCX or TXT file
+            filename (str): File name, used to pick the extractor
+            source_lang (str): Source language code ('auto' to detect it)
+            target_lang (str): Target language code
+
+        Returns:
+            str: Job id
+        """
+        return self._submit('document', filename, data, source_lang, target_lang, {})
+
+    def get(self, job_id):
+        """
+        Get the state of a job.
+
+        Args:
+            job_id (str): Job id
+
+        Returns:
+            dict: ``id``, ``kind``, ``source``, ``source_lang``, ``target_lang``,
+                ``status``, ``total_segments``, ``done_segments``,
+                ``failed_segments``, ``progress`` (0 to 1), ``error`` and
+                ``result`` (translated page of finished URL jobs), or None
+                for an unknown job
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, source, source_lang, target_lang, status, total_segments, done_segments, "
+                "failed_segments, error, result, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        total = job['total_segments']
+        job['progress'] = 1.0 if job['status'] == DONE else (job['done_segments'] / total if total else 0.0)
+        return job
+
+    def list_jobs(self, job_ids=None):
+        """
+        Get the state of several jobs, newest first.
+
+        Args:
+            job_ids (list, optional): Jobs to include (default: all)
+
+        Returns:
+            list: Job states (see ``get``)
+        """
+        with self._lock:
+            if job_ids is None:
+                ids = [row[0] for row in self._db.execute("SELECT id FROM jobs ORDER BY created_at DESC")]
+            else:
+                ids = list(job_ids)
+        jobs = [self.get(job_id) for job_id in ids]
+        return sorted((job for job in jobs if job), key=lambda job: job['created_at'], reverse=True)
+
+    def segments(self, job_id, start=0, limit=None):
+        """
+        Get the translated segments of a job stored so far.
+
+        Args:
+            job_id (str): Job id
+            start (int): First position to return
+            limit (int, optional): Maximum number of segments to return
+
+        Returns:
+            list: Dicts with ``position``, ``original``, ``translated``,
+                ``status`` and ``error``, in document order
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT position, original, translated, status, error FROM job_segments "
+                "WHERE job_id = ? AND position >= ? ORDER BY position LIMIT ?",
+                (job_id, start, -1 if limit is None else limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job; a running job stops after its current chunk.
+
+        Args:
+            job_id (str): Job id
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            )
+            self._db.commit()
+
+    def delete(self, job_id):
+        """
+        Remove a job and its segments.
+
+        Args:
+            job_id (str): Job id
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._db.commit()
+
+    def claim(self, worker):
+        """
+        Take the oldest queued job, or a running job whose worker stopped sending heartbeats.
+
+        Args:
+            worker (str): Id of the claiming worker
+
+        Returns:
+            dict: The job's row including ``data``, ``options`` and stored
+                ``content``, or None if there is nothing to do
+        """
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock, so two workers cannot claim the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                    "WHERE status = ? AND heartbeat < ? AND attempts >= ?",
+                    (FAILED, f"Worker stopped {MAX_ATTEMPTS} times while running this job", now,
+                     RUNNING, now - STALE_AFTER, MAX_ATTEMPTS)
+                )
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = ? OR (status = ? AND heartbeat < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - STALE_AFTER)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, heartbeat = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE id = ?",
+                        (RUNNING, worker, now, now, row['id'])
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        job['content'] = json.loads(job['content']) if job['content'] else None
+        return job
+
+    def _update(self, job_id, worker, assignments, values):
+        # Only the worker holding the job may update it; returns False if it lost the job
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET {assignments}, heartbeat = ?, updated_at = ? "
+                f"WHERE id = ? AND worker = ? AND status = ?",
+                (*values, time.time(), time.time(), job_id, worker, RUNNING)
+            )
+            self._db.commit()
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker):
+        """
+        Record that a worker is still running a job.
+
+        Returns:
+            bool: False if the job was cancelled or taken over
+        """
+        return self._update(job_id, worker, "worker = worker", ())
+
+    def start(self, job_id, worker, source_lang, segments, content=None):
+        """
+        Record the segments a job will translate.
+
+        Args:
+            job_id (str): Job id
+            worker (str): Worker running the job
+            source_lang (str): Detected or given source language
+            segments (int): Number of segments
+            content (dict, optional): Scraped page, kept so a resumed job does not scrape again
+
+        Returns:
+            bool: False if the job was cancelled or taken over
+        """
+        return self._update(
+            job_id, worker, "source_lang = ?, total_segments = ?, content = ?",
+            (source_lang, segments, json.dumps(content, ensure_ascii=False) if content is not None else None)
+        )
+
+    def save_segments(self, job_id, worker, start, results):
+        """
+        Store a chunk of translated segments.
+
+        Args:
+            job_id (str): Job id
+            worker (str): Worker running the job
+            start (int): Position of the first result
+            results (list): SegmentResult of each segment of the chunk
+
+        Raises:
+            JobCancelled: If the job was cancelled or taken over
+        """
+        rows = [(job_id, start + i, result.text, result.translation, result.status, result.error)
+                for i, result in enumerate(results)]
+        failed = sum(1 for result in results if not result.ok)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET done_segments = done_segments + ?, failed_segments = failed_segments + ?, "
+                    "heartbeat = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                    (len(rows), failed, time.time(), time.time(), job_id, worker, RUNNING)
+                )
+                if cursor.rowcount == 1:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO job_segments (job_id, position, original, translated, status, error) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if cursor.rowcount != 1:
+            raise JobCancelled(job_id)
+
+    def finish(self, job_id, worker, result=None):
+        """
+        Mark a job as done.
+
+        Args:
+            job_id (str): Job id
+            worker (str): Worker running the job
+            result (dict, optional): Translated page of a URL job
+        """
+        self._update(job_id, worker, "status = ?, result = ?",
+                     (DONE, json.dumps(result, ensure_ascii=False) if result is not None else None))
+
+    def fail(self, job_id, worker, error):
+        """
+        Mark a job as failed.
+
+        Args:
+            job_id (str): Job id
+            worker (str): Worker running the job
+            error (str): Error message
+        """
+        self._update(job_id, worker, "status = ?, error = ?", (FAILED, error))
+
+_default_queue = None
+_default_lock = threading.Lock()
+
+def get_job_queue():
+    """
+    Get the process-wide job queue, creating it on first use.
+
+    Returns:
+        JobQueue: Shared queue (stored at DHIVEHI_JOBS_PATH or the default path)
+    """
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(os.environ.get('DHIVEHI_JOBS_PATH') or DEFAULT_JOBS_PATH)
+        return _default_queue
+
+def _keep_alive(queue, job_id, worker, stop):
+    # Heartbeats continue through long single steps such as a 300-page PDF extraction
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        if not queue.heartbeat(job_id, worker):
+            return
+
+def _translate_chunks(queue, job, worker, texts, source_lang):
+    # Translate the segments not stored yet, one chunk at a time
+    stored = {segment['position']: segment for segment in queue.segments(job['id'])}
+    start = 0
+    while start < len(texts):
+        if start in stored:
+            start += 1
+            continue
+        end = start
+        while end < len(texts) and end - start < CHUNK_SEGMENTS and end not in stored:
+            end += 1
+        results = translate_segments(texts[start:end], source_lang, job['target_lang'], max_workers=segment_workers(1))
+        queue.save_segments(job['id'], worker, start, results)
+        start = end
+    return [SegmentResult(s['original'], s['translated'], s['status'], s['error'])
+            for s in queue.segments(job['id'])]
+
+def run_job(queue, job, worker):
+    """
+    Run one claimed job to completion, resuming after its stored segments.
+
+    Args:
+        queue (JobQueue): Queue the job was claimed from
+        job (dict): Result of ``JobQueue.claim``
+        worker (str): Id of this worker
+    """
+    stop = threading.Event()
+    threading.Thread(target=_keep_alive, args=(queue, job['id'], worker, stop), daemon=True).start()
+    try:
+        source_lang = job['source_lang']
+        if job['kind'] == 'url':
+            content = job['content']
+            if content is None:
+                content = scrape_website(job['source'], timeout=job['options'].get('timeout', 15))
+                if 'error' in content:
+                    queue.fail(job['id'], worker, content['error'])
+                    return
+            if source_lang == 'auto':
+                source_lang = detect_page_language([content['title']] + content['paragraphs'])[0]
+            texts = content_segments(content)
+            if not queue.start(job['id'], worker, source_lang, len(texts), content):
+                return
+            results = _translate_chunks(queue, job, worker, texts, source_lang)
+            queue.finish(job['id'], worker, assemble_translation(content, results))
+        else:
+            texts = list(segment_text(iter_document(io.BytesIO(job['data']), job['source'])))
+            if source_lang == 'auto':
+                source_lang = detect_page_language(texts[:20])[0]
+            if not queue.start(job['id'], worker, source_lang, len(texts)):
+                return
+            _translate_chunks(queue, job, worker, texts, source_lang)
+            queue.finish(job['id'], worker)
+    except JobCancelled:
+        pass
+    except Exception as e:
+        queue.fail(job['id'], worker, str(e))
+    finally:
+        stop.set()
+
+def worker_loop(path=None, poll_interval=1.0, parent_pid=None, chars_per_second=None):
+    """
+    Claim and run jobs until the parent process exits.
+
+    Args:
+        path (str, optional): Job database (default: see ``get_job_queue``)
+        poll_interval (float): Seconds to wait when the queue is empty
+        parent_pid (int, optional): Process whose exit stops the loop
+        chars_per_second (float, optional): This worker's character quota
+            (default: see ``translator.get_rate_limiter``)
+    """
+    if chars_per_second is not None:
+        set_rate_limiter(chars_per_second)
+    queue = JobQueue(path) if path else get_job_queue()
+    worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    # Load the client, parser and extractors before the first job rather than during it
+    warm_up(extractors=True)
+    while parent_pid is None or os.getppid() == parent_pid:
+        job = queue.claim(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(queue, job, worker)
+
+def start_workers(count=None, path=None):
+    """
+    Start worker processes for the job queue.
+
+    Args:
+        count (int, optional): Number of workers (default: DHIVEHI_JOB_WORKERS or 2)
+        path (str, optional): Job database (default: see ``get_job_queue``)
+
+    Returns:
+        list: The started processes; they exit with this process
+    """
+    if count is None:
+        count = int(os.environ.get('DHIVEHI_JOB_WORKERS', 2))
+    # Each worker gets an equal share of the character quota, so together they stay within it
+    limiter = get_rate_limiter()
+    chars_per_second = limiter.rate / count if limiter and count else None
+    # Spawned rather than forked: the app process runs many threads
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for _ in range(count):
+        process = context.Process(target=worker_loop, args=(path, 1.0, os.getpid(), chars_per_second),
+                                  daemon=True, name='job-worker')
+        process.start()
+        processes.append(process)
+    return processes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: DHIVEHI_JOB_WORKERS or 2)")
+    parser.add_argument('--path', help="Job database (default: DHIVEHI_JOBS_PATH or ~/.cache/dhivehi_translator/jobs.sqlite3)")
+    args = parser.parse_args(argv)
+
+    processes = start_workers(args.workers, args.path)
+    print(f"Started {len(processes)} job workers")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Script-based language identification for Dhivehi/English pages.
+
+Every character of a segment is mapped to its script by a single
+``str.translate`` call over a precompiled table, and the scripts are then
+counted with ``str.count``; both run in C, so large texts are labelled
+without a Python-level loop over characters.
+"""
+
+# Unicode blocks of each script
+SCRIPT_RANGES = {
+    'thaana': [(0x0780, 0x07BF)],
+    'arabic': [(0x0600, 0x06FF), (0x0750, 0x077F), (0x08A0, 0x08FF), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)],
+    'latin': [(0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x024F)],
+    'devanagari': [(0x0900, 0x097F)]
+}
+
+# Language assumed for a segment written in each script. Latin is taken to be
+# English since the app translates between English and Dhivehi.
+SCRIPT_LANGUAGES = {
+    'thaana': 'dv',
+    'arabic': 'ar',
+    'latin': 'en',
+    'devanagari': 'hi'
+}
+
+# Script of each language code the filters need to know about: the languages
+# above plus other common source languages written in the same scripts
+LANGUAGE_SCRIPTS = {language: script for script, language in SCRIPT_LANGUAGES.items()}
+LANGUAGE_SCRIPTS.update(dict.fromkeys(
+    ['fr', 'de', 'es', 'it', 'pt', 'nl', 'sv', 'da', 'no', 'fi', 'pl', 'cs', 'ro', 'hu', 'tr',
+     'id', 'ms', 'tl', 'sw', 'vi', 'so'], 'latin'
+))
+LANGUAGE_SCRIPTS.update(dict.fromkeys(['ur', 'fa', 'ps'], 'arabic'))
+LANGUAGE_SCRIPTS.update(dict.fromkeys(['mr', 'ne', 'sa'], 'devanagari'))
+
+LANGUAGE_NAMES = {
+    'dv': 'Dhivehi',
+    'ar': 'Arabic',
+    'en': 'English',
+    'hi': 'Hindi'
+}
+
+# Share of a segment's letters its main script needs for the segment to be labelled
+MIN_SCRIPT_RATIO = 0.8
+
+# Each script's characters are translated to one marker character; markers
+# already present in the text are deleted first so they cannot be miscounted.
+_MARKERS = {script: chr(1 + i) for i, script in enumerate(SCRIPT_RANGES)}
+_SCRIPT_TABLE = {ord(marker): None for marker in _MARKERS.values()}
+for _script, _ranges in SCRIPT_RANGES.items():
+    for _start, _end in _ranges:
+        _SCRIPT_TABLE.update(dict.fromkeys(range(_start, _end + 1), _MARKERS[_script]))
+
+def script_counts(text):
+    """
+    Count the letters of each script in a text.
+
+    Args:
+        text (str): Text to analyse
+
+    Returns:
+        dict: Script name -> number of characters
+    """
+    marked = text.translate(_SCRIPT_TABLE)
+    return {script: marked.count(marker) for script, marker in _MARKERS.items()}
+
+def script_ratios(text):
+    """
+    Get the share of each script among the letters of a text.
+
+    Args:
+        text (str): Text to analyse
+
+    Returns:
+        dict: Script name -> ratio (all zero if the text has no letters)
+    """
+    counts = script_counts(text)
+    total = sum(counts.values())
+    return {script: count / total if total else 0.0 for script, count in counts.items()}
+
+def detect_language(text, min_ratio=MIN_SCRIPT_RATIO):
+    """
+    Identify the language of a segment from its script.
+
+    Args:
+        text (str): Segment to label
+        min_ratio (float): Share of letters the main script needs
+
+    Returns:
+        str: Language code ('dv', 'ar', 'en' or 'hi'), or None for segments
+            without letters or without a dominant script
+    """
+    counts = script_counts(text)
+    total = sum(counts.values())
+    if not total:
+        return None
+    script = max(counts, key=counts.get)
+    if counts[script] < min_ratio * total:
+        return None
+    return SCRIPT_LANGUAGES[script]
+
+def label_segments(texts, min_ratio=MIN_SCRIPT_RATIO):
+    """
+    Identify the language of each segment individually.
+
+    Args:
+        texts (iterable): Segments to label
+        min_ratio (float): Share of letters the main script needs
+
+    Returns:
+        list: Language code or None per segment (see ``detect_language``)
+    """
+    return [detect_language(text, min_ratio) if text else None for text in texts]
+
+def detect_page_language(texts, default='en'):
+    """
+    Identify the main language of a page or document.
+
+    Segments are labelled individually and weighted by their length, so a
+    Dhivehi page with an English title is still detected as Dhivehi.
+
+    Args:
+        texts (iterable): Segments of the page
+        default (str): Language returned when no segment can be labelled
+
+    Returns:
+        tuple: (main language code, set of all language codes found)
+    """
+    weights = {}
+    for text in texts:
+        language = detect_language(text) if text else None
+        if language:
+            weights[language] = weights.get(language, 0) + len(text)
+    if not weights:
+        return default, set()
+    return max(weights, key=weights.get), set(weights)
@@ -0,0 +1,435 @@
+"""
+Timing and metrics for the scrape -> detect -> translate pipeline.
+
+Counters and histograms are kept in process, next to gauges read from the
+stats of the shared client pool and caches (``register_collector``). All of
+them can be read as a JSON snapshot or in the Prometheus text exposition
+format, optionally served
+over HTTP (``start_metrics_server``). Every ``timed`` stage also becomes a
+span of the current trace when tracing is enabled (DHIVEHI_TRACE=1 or
+``enable_tracing``), so a single request can be broken down stage by stage.
+
+Examples:
+    with timed('fetch'):
+        response = fetch_html(url)
+    inc('bytes_fetched_total', len(response.content))
+
+    with trace('translate_website', url=url) as root:
+        ...
+    print(root.to_dict())
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram buckets for stage latencies, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Histogram buckets for sizes (DOM nodes, segments per request)
+SIZE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+HELP = {
+    'stage_seconds': "Latency of each pipeline stage",
+    'page_dom_nodes': "DOM nodes per extracted page",
+    'batch_segments': "Segments per translation backend request",
+    'bytes_fetched_total': "Response bytes downloaded",
+    'pages_total': "Pages scraped, by outcome",
+    'segments_total': "Segments translated, by status",
+    'characters_billed_total': "Characters sent to the translation backend",
+    'cache_hits_total': "Cache hits, by cache",
+    'cache_misses_total': "Cache misses, by cache",
+    'api_calls_total': "Translation backend calls, including retries",
+    'document_pages_total': "Document pages or paragraphs extracted, by format",
+    'translation_memory_hit_rate': "Share of segment lookups answered by the translation memory",
+    'translation_memory_characters_saved': "Source characters answered by the translation memory",
+    'http_cache_hit_rate': "Share of page fetches answered with 304 Not Modified",
+    'http_cache_bytes_saved': "Response bytes not downloaded thanks to 304 responses",
+    'client_pool_client_creations': "Translation API clients created",
+    'client_pool_connections_reused': "Translation API requests sent over an already open connection"
+}
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters and histograms, plus gauges
+    collected from stats functions when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._collectors = {}  # prefix -> stats function
+
+    def register_collector(self, prefix, collect):
+        """
+        Publish the numbers returned by a stats function as gauges.
+
+        ``collect`` is called on every snapshot; each numeric value of the dict
+        it returns becomes the gauge ``<prefix>_<key>``. It may return None
+        when there is nothing to report yet.
+
+        Args:
+            prefix (str): Gauge name prefix, e.g. 'http_cache'
+            collect (callable): Function returning a dict of stats, or None
+        """
+        with self._lock:
+            self._collectors[prefix] = collect
+
+    def _collect(self):
+        with self._lock:
+            collectors = sorted(self._collectors.items())
+        gauges = []
+        for prefix, collect in collectors:
+            try:
+                stats = collect()
+            except Exception:
+                # A broken stats source must not take the rest of the metrics down
+                continue
+            for key, value in sorted((stats or {}).items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges.append({'name': f"{prefix}_{key}", 'labels': {}, 'value': value})
+        return gauges
+
+    def inc(self, name, value=1, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Metric name, e.g. 'api_calls_total'
+            value (float): Amount to add
+            **labels: Label values, e.g. cache='http'
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Metric name, e.g. 'stage_seconds'
+            value (float): Observed value
+            buckets (tuple): Upper bounds of the buckets, used when the histogram is created
+            **labels: Label values, e.g. stage='fetch'
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        """
+        Get every metric as plain data.
+
+        Returns:
+            dict: ``counters``, ``gauges`` and ``histograms``, each a list of
+                dicts with ``name`` and ``labels``; histograms carry cumulative
+                ``buckets``, ``sum`` and ``count``
+        """
+        gauges = self._collect()
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                buckets['+Inf'] = histogram.count
+                histograms.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'buckets': buckets,
+                    'sum': histogram.sum,
+                    'count': histogram.count
+                })
+        return {'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def prometheus_text(self, prefix='dhivehi_translator_'):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix for the metric names
+
+        Returns:
+            str: Exposition text
+        """
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {prefix}{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {prefix}{name} {kind}")
+
+        for counter in snapshot['counters']:
+            declare(counter['name'], 'counter')
+            lines.append(f"{prefix}{counter['name']}{_labels(counter['labels'])} {counter['value']}")
+        for gauge in snapshot['gauges']:
+            declare(gauge['name'], 'gauge')
+            lines.append(f"{prefix}{gauge['name']}{_labels(gauge['labels'])} {gauge['value']}")
+        for histogram in snapshot['histograms']:
+            name = histogram['name']
+            declare(name, 'histogram')
+            for bound, count in histogram['buckets'].items():
+                labels = dict(histogram['labels'], le=bound)
+                lines.append(f"{prefix}{name}_bucket{_labels(labels)} {count}")
+            lines.append(f"{prefix}{name}_sum{_labels(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{prefix}{name}_count{_labels(histogram['labels'])} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """
+        Remove every counter and histogram (collectors stay registered).
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+registry = MetricsRegistry()
+
+def inc(name, value=1, **labels):
+    """Add to a counter of the process-wide registry (see ``MetricsRegistry.inc``)."""
+    registry.inc(name, value, **labels)
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record a histogram value in the process-wide registry (see ``MetricsRegistry.observe``)."""
+    registry.observe(name, value, buckets, **labels)
+
+def register_collector(prefix, collect):
+    """Publish a stats function as gauges of the process-wide registry (see ``MetricsRegistry.register_collector``)."""
+    registry.register_collector(prefix, collect)
+
+def get_metrics():
+    """
+    Get a JSON-serializable snapshot of the process-wide metrics.
+
+    Returns:
+        dict: See ``MetricsRegistry.snapshot``
+    """
+    return registry.snapshot()
+
+def prometheus_text():
+    """
+    Get the process-wide metrics in the Prometheus text format.
+
+    Returns:
+        str: Exposition text
+    """
+    return registry.prometheus_text()
+
+def dump_json(path):
+    """
+    Write the process-wide metrics and recent traces to a JSON file.
+
+    Args:
+        path (str): Output file
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'metrics': get_metrics(), 'traces': get_traces()}, f, ensure_ascii=False, indent=2)
+
+class Span:
+    """
+    One timed stage of a trace.
+    """
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.duration = None
+        self.children = []
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The span and its child spans as plain data
+        """
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'children': [child.to_dict() for child in self.children]
+        }
+
+_current_span = contextvars.ContextVar('dhivehi_translator_span', default=None)
+_tracing = os.environ.get('DHIVEHI_TRACE', '') not in ('', '0')
+_traces = deque(maxlen=100)
+_traces_lock = threading.Lock()
+
+def enable_tracing(enabled=True):
+    """
+    Turn recording of trace spans on or off for the process.
+
+    Args:
+        enabled (bool): Whether ``trace`` records spans
+    """
+    global _tracing
+    _tracing = enabled
+
+def get_traces():
+    """
+    Get the most recent finished traces.
+
+    Returns:
+        list: Root spans as dicts, oldest first
+    """
+    with _traces_lock:
+        return [span.to_dict() for span in _traces]
+
+@contextmanager
+def _span(name, attributes, root):
+    parent = _current_span.get()
+    if parent is None and not (root and _tracing):
+        yield None
+        return
+    span = Span(name, parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None, attributes)
+    if parent is not None:
+        parent.children.append(span)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        if parent is None:
+            with _traces_lock:
+                _traces.append(span)
+
+@contextmanager
+def trace(name, **attributes):
+    """
+    Start a trace for one request; stages timed inside it become its spans.
+
+    Does nothing unless tracing is enabled.
+
+    Args:
+        name (str): Name of the request, e.g. 'translate_website'
+        **attributes: Attributes recorded on the root span
+
+    Yields:
+        Span: Root span, or None when tracing is disabled
+    """
+    with _span(name, attributes, root=True) as span:
+        yield span
+
+@contextmanager
+def timed(stage, **attributes):
+    """
+    Time a pipeline stage into the ``stage_seconds`` histogram.
+
+    Inside a trace the stage is also recorded as a span.
+
+    Args:
+        stage (str): Stage name, e.g. 'fetch', 'parse', 'translate'
+        **attributes: Attributes recorded on the span
+
+    Yields:
+        Span: The stage's span, or None outside a trace
+    """
+    start = time.perf_counter()
+    try:
+        with _span(stage, attributes, root=False) as span:
+            yield span
+    finally:
+        observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=None, host='127.0.0.1'):
+    """
+    Serve the metrics over HTTP from a background thread (once per process).
+
+    ``/metrics`` returns the Prometheus text format and ``/metrics.json``
+    the JSON snapshot with recent traces.
+
+    Args:
+        port (int, optional): Port to listen on (default: DHIVEHI_METRICS_PORT)
+        host (str): Interface to listen on
+
+    Returns:
+        ThreadingHTTPServer: The server, or None if no port is configured
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        if port is None:
+            port = os.environ.get('DHIVEHI_METRICS_PORT')
+            if not port:
+                return None
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    body = json.dumps({'metrics': get_metrics(), 'traces': get_traces()}).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True, name='metrics-server').start()
+        return _server
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Default location of the on-disk cache. Set DHIVEHI_PAGE_CACHE_PATH to an
+# empty string to keep translated pages in-process only.
+DEFAULT_PAGE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dhivehi_translator', 'page_cache.sqlite3')
+
+def page_hash(content):
+    """
+    Hash the extracted content of a page.
+
+    Translate IDs are derived from the DOM and the text, so the same page
+    scraped twice hashes to the same value.
+
+    Args:
+        content (dict): Result of ``scrape_website``
+
+    Returns:
+        str: Hex digest of the title, paragraphs and HTML
+    """
+    digest = hashlib.sha256()
+    for part in [content['title'], *content['paragraphs'], content.get('html', '')]:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+class TranslatedPageCache:
+    """
+    Cache of fully translated pages keyed by (page hash, language pair).
+
+    A small in-process LRU sits in front of an optional SQLite file. Both
+    hold whole ``translate_content`` results, including ``translated_html``,
+    and evict the least recently used pages first.
+    """
+
+    def __init__(self, path=DEFAULT_PAGE_CACHE_PATH, max_memory_entries=64, max_disk_entries=5000):
+        """
+        Args:
+            path (str, optional): SQLite file for the disk tier (None for memory only)
+            max_memory_entries (int): Pages kept in process
+            max_disk_entries (int): Pages kept on disk
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0}
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+            self._db.commit()
+
+    @staticmethod
+    def _key(content_hash, source_lang, target_lang):
+        return f"{content_hash}:{source_lang}:{target_lang}"
+
+    def _remember(self, key, result):
+        # Caller holds the lock
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, content_hash, source_lang, target_lang):
+        """
+        Get a translated page.
+
+        Args:
+            content_hash (str): ``page_hash`` of the scraped content
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+
+        Returns:
+            dict: ``translate_content`` result, or None on a miss
+        """
+        key = self._key(content_hash, source_lang, target_lang)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT result FROM pages WHERE key = ?", (key,)).fetchone()
+                if row:
+                    result = json.loads(row[0])
+                    self._db.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, result)
+            self._stats['hits' if result is not None else 'misses'] += 1
+        # Callers get their own copy to modify
+        return json.loads(json.dumps(result)) if result is not None else None
+
+    def put(self, content_hash, source_lang, target_lang, result):
+        """
+        Store a translated page.
+
+        Args:
+            content_hash (str): ``page_hash`` of the scraped content
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+            result (dict): ``translate_content`` result
+        """
+        key = self._key(content_hash, source_lang, target_lang)
+        serialized = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, json.loads(serialized))
+            self._stats['writes'] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (key, result, last_used) VALUES (?, ?, ?)",
+                    (key, serialized, time.time())
+                )
+                count = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+                if count > self.max_disk_entries:
+                    self._db.execute(
+                        "DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY last_used LIMIT ?)",
+                        (count - self.max_disk_entries,)
+                    )
+                self._db.commit()
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hits, misses, writes and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Remove every cached page.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM pages")
+                self._db.commit()
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_page_cache():
+    """
+    Get the process-wide translated page cache, creating it on first use.
+
+    Returns:
+        TranslatedPageCache: Shared cache
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TranslatedPageCache(os.environ.get('DHIVEHI_PAGE_CACHE_PATH', DEFAULT_PAGE_CACHE_PATH) or None)
+        return _default_cache
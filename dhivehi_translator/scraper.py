@@ -1,11 +1,342 @@
 import requests
-from bs4 import BeautifulSoup
 import re
-import uuid
+import bisect
+import hashlib
 import concurrent.futures
 import time
+import threading
+from requests.adapters import HTTPAdapter
+from html_utils import make_slot, parse_html, render_template, split_template
+from http_cache import get_http_cache
+from metrics import SIZE_BUCKETS, inc, observe, timed
 
-def scrape_website(url, preserve_html=False, timeout=10, content_type=None):
+# Content containers in order of preference (see _container_rank)
+CONTENT_CLASS_PATTERN = re.compile('content|main|article|body', re.I)
+POST_CLASS_PATTERN = re.compile('post|entry|text|blog', re.I)
+
+PARAGRAPH_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+TRANSLATABLE_TAGS = PARAGRAPH_TAGS | {'span', 'div', 'a', 'button', 'li'}
+SKIP_PARENT_TAGS = {'nav', 'footer', 'header', 'aside'}
+SKIP_CLASSES = ['nav', 'menu', 'footer', 'header', 'sidebar']
+NON_TEXT_TAGS = {'script', 'style', 'meta', 'link', 'noscript'}
+
+# Dhivehi Unicode range (approximate)
+DHIVEHI_PATTERN = re.compile(r'[\u0780-\u07BF]')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Connections kept open per host by the shared session
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Get the shared HTTP session, so repeated fetches reuse kept-alive connections.
+    
+    Returns:
+        requests.Session: Session with a pooled adapter for http and https
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+def fetch_html(url, timeout=10, session=None):
+    """
+    Fetch a page over the shared session.
+    
+    Args:
+        url (str): URL to fetch
+        timeout (int): Timeout for the request in seconds
+        session (requests.Session, optional): Session to use instead of the shared one
+        
+    Returns:
+        requests.Response: Successful response
+    """
+    response = (session or get_session()).get(url, timeout=timeout)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    return response
+
+def response_markup(response):
+    """
+    Get the markup of a response for parsing.
+    
+    Without a charset in the Content-Type header requests assumes ISO-8859-1,
+    which garbles Thaana; the raw bytes are returned instead so the parser can
+    detect the encoding from the page's <meta charset>.
+    """
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.text
+    return response.content
+
+def _container_rank(element):
+    """
+    Rank an element as a main content container (lower is better).
+    
+    Args:
+        element (Tag): Element to classify
+        
+    Returns:
+        int: Rank of the container, or None if the element is not one
+    """
+    name = element.name
+    if name == 'main':
+        return 1
+    if name == 'article':
+        return 2
+    if name == 'body':
+        return 6
+    if name != 'div':
+        return None
+    
+    element_id = element.get('id')
+    if element_id == 'mw-content-text':  # Wikipedia specific
+        return 0
+    if element_id == 'content':
+        return 3
+    
+    classes = element.get('class')
+    if classes:
+        class_string = ' '.join(classes)
+        if CONTENT_CLASS_PATTERN.search(class_string):
+            return 4
+        if POST_CLASS_PATTERN.search(class_string):
+            return 5
+    return None
+
+def _is_boilerplate(element):
+    """
+    Check whether an element is likely navigation, footer, etc.
+    """
+    if element.parent and element.parent.name in SKIP_PARENT_TAGS:
+        return True
+    classes = element.get('class')
+    return bool(classes) and any(c in str(classes).lower() for c in SKIP_CLASSES)
+
+class _DuplicateIndex:
+    """
+    De-duplication index for paragraphs collected by the fallback paths.
+    
+    A candidate is a duplicate when the same normalized text was already
+    collected, or when an already collected node lies inside the candidate's
+    subtree (so its text is contained in the candidate's text). Both checks
+    are sub-linear, where scanning every collected paragraph for substrings
+    made the fallback quadratic.
+    """
+    
+    def __init__(self):
+        self.texts = set()
+        self.positions = []  # sorted preorder positions of collected nodes
+    
+    def add(self, text, position):
+        self.texts.add(' '.join(text.split()))
+        bisect.insort(self.positions, position)
+    
+    def contains(self, text, start, end):
+        if ' '.join(text.split()) in self.texts:
+            return True
+        i = bisect.bisect_right(self.positions, start)
+        return i < len(self.positions) and self.positions[i] <= end
+
+def translate_id(path, text):
+    """
+    Build the stable translate ID of an element.
+    
+    The ID is derived from the element's position in the DOM and its text, so
+    scraping an unchanged page again yields the same IDs and the same HTML.
+    
+    Args:
+        path (str): DOM path of the element, e.g. 'html[0]/body[1]/p[3]'
+        text (str): Text of the element
+        
+    Returns:
+        str: ID for the data-translate-id attribute
+    """
+    digest = hashlib.sha1(f"{path}\x1f{text}".encode('utf-8')).hexdigest()
+    return f"translate-{digest[:20]}"
+
+def extract_content(soup, url=None, preserve_html=False):
+    """
+    Extract the title, paragraphs and translatable elements from a parsed page.
+    
+    The document is traversed once. During the traversal every node is
+    classified (content container candidate, paragraph, fallback div, text
+    node, translatable element) and translate IDs are assigned; the content
+    container is then picked and the collected nodes are filtered by their
+    position in the tree.
+    
+    Args:
+        soup (BeautifulSoup): Parsed page
+        url (str, optional): URL of the page
+        preserve_html (bool): Whether to tag elements for in-place translation
+        
+    Returns:
+        dict: Dictionary containing title, paragraphs, and HTML content if requested
+    """
+    # bs4 is already loaded by the parser at this point (see html_utils.parse_html)
+    from bs4 import CData, NavigableString
+    title = None
+    containers = [None] * 7   # best (start, end) span per container rank
+    open_spans = {}           # id(element) -> rank, for containers still being walked
+    paragraph_nodes = []      # (position, element)
+    div_nodes = []            # [position, subtree end, element]
+    open_divs = {}            # id(element) -> div_nodes entry, for divs still being walked
+    text_nodes = []           # (position, string)
+    html_elements = []
+    slot_strings = []         # text node behind each template slot
+    slots = {}                # id(text node) -> slot number
+    
+    position = 0
+    stack = [iter(soup.contents)]
+    parents = [soup]
+    path = ['']               # DOM path step of each element in parents
+    child_counts = [0]        # elements seen so far below each element in parents
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            # Finished a subtree; close its container span if it has one
+            stack.pop()
+            finished = parents.pop()
+            path.pop()
+            child_counts.pop()
+            rank = open_spans.pop(id(finished), None)
+            if rank is not None:
+                containers[rank] = (containers[rank][0], position)
+            entry = open_divs.pop(id(finished), None)
+            if entry is not None:
+                entry[1] = position
+            continue
+        
+        position += 1
+        
+        if isinstance(node, NavigableString):
+            if type(node) in (NavigableString, CData) and node.parent.name not in NON_TEXT_TAGS:
+                text_nodes.append((position, node))
+            continue
+        
+        name = node.name
+        step = f"{name}[{child_counts[-1]}]"
+        child_counts[-1] += 1
+        if name == 'title' and title is None:
+            title = node
+        
+        rank = _container_rank(node)
+        if rank is not None and containers[rank] is None:
+            containers[rank] = (position, None)
+            open_spans[id(node)] = rank
+        
+        if name in PARAGRAPH_TAGS:
+            paragraph_nodes.append((position, node))
+        elif name == 'div':
+            entry = [position, None, node]
+            div_nodes.append(entry)
+            open_divs[id(node)] = entry
+        
+        # Add stable IDs to all text elements for later translation
+        if preserve_html and name in TRANSLATABLE_TAGS:
+            string = node.string
+            if type(string) in (NavigableString, CData) and string.strip():
+                text = string.strip()
+                element_id = translate_id('/'.join(path[1:] + [step]), text)
+                node['data-translate-id'] = element_id
+                # Nested single-child elements share one text node and one slot
+                slot = slots.get(id(string))
+                if slot is None:
+                    slot = slots[id(string)] = len(slot_strings)
+                    slot_strings.append(string)
+                html_elements.append({
+                    'id': element_id,
+                    'text': text,
+                    'tag': name,
+                    'slot': slot
+                })
+        
+        stack.append(iter(node.contents))
+        parents.append(node)
+        path.append(step)
+        child_counts.append(0)
+    
+    observe('page_dom_nodes', position, SIZE_BUCKETS)
+    
+    # Extract the title
+    title = title.text.strip() if title else "No title found"
+    
+    # Use the first valid container, or the whole document without a body
+    start, end = next((span for span in containers if span), (0, position))
+    
+    # Get all paragraphs and headings with text content
+    paragraphs = []
+    index = _DuplicateIndex()
+    for pos, element in paragraph_nodes:
+        if not start < pos <= end:
+            continue
+        # Skip elements that are likely navigation, footer, etc.
+        if _is_boilerplate(element):
+            continue
+        
+        text = element.get_text().strip()
+        if text and len(text) > 10:  # Only include non-empty paragraphs with reasonable length
+            paragraphs.append(text)
+            index.add(text, pos)
+    
+    # If no paragraphs found or too few, try a more aggressive approach
+    if len(paragraphs) <= 1:
+        # Look for text in div elements
+        for pos, div_end, div in div_nodes:
+            if not start < pos <= end or _is_boilerplate(div):
+                continue
+            
+            text = div.get_text().strip()
+            if text and len(text) > 20 and not index.contains(text, pos, div_end):
+                paragraphs.append(text)
+                index.add(text, pos)
+    
+    # If still no paragraphs, get all text nodes
+    if len(paragraphs) <= 1:
+        for pos, element in text_nodes:
+            if not start < pos <= end:
+                continue
+            text = element.strip()
+            if text and len(text) > 20 and not index.contains(text, pos, pos):
+                paragraphs.append(text)
+                index.add(text, pos)
+    
+    result = {
+        'title': title,
+        'paragraphs': paragraphs,
+        'url': url
+    }
+    
+    # If HTML preservation is requested, add HTML content
+    if preserve_html:
+        # Serialize the document once with a placeholder in place of every
+        # translatable text, so translations can be written back into the
+        # template without parsing the HTML again
+        texts = []
+        for slot, string in enumerate(slot_strings):
+            text = string.strip()
+            start = string.index(text)
+            string.replace_with(string[:start] + make_slot(slot) + string[start + len(text):])
+            texts.append(text)
+        
+        template = split_template(str(soup))
+        result['html'] = render_template(template, texts)
+        result['html_template'] = template
+        result['html_elements'] = html_elements
+    
+    return result
+
+def scrape_website(url, preserve_html=False, timeout=10, content_type=None, parser=None, cache=None):
     """
     Scrape text content from any website, with special handling for Dhivehi content.
     
@@ -14,109 +345,57 @@ def scrape_website(url, preserve_html=False, timeout=10, content_type=None):
         preserve_html (bool): Whether to preserve HTML structure for in-place translation
         timeout (int): Timeout for the request in seconds
         content_type (str, optional): Type of content to scrape (e.g., 'academic')
+        parser (str, optional): HTML parser backend (default: fastest available)
+        cache (HttpCache, optional): HTTP cache to use instead of the shared one
+            (False to always fetch in full)
         
     Returns:
         dict: Dictionary containing title, paragraphs, and HTML content if requested
     """
     try:
-        # Send a GET request to the website with timeout
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract the title
-        title = soup.title.text.strip() if soup.title else "No title found"
-        
-        # Extract the main content based on common content containers
-        content_containers = [
-            # Wikipedia specific
-            soup.find('div', {'id': 'mw-content-text'}),
-            # Common content containers
-            soup.find('main'),
-            soup.find('article'),
-            soup.find('div', {'id': 'content'}),
-            soup.find('div', {'class': re.compile('content|main|article|body', re.I)}),
-            # Try to find content by common class names
-            soup.find('div', {'class': re.compile('post|entry|text|blog', re.I)}),
-            # Fallback to body if no specific container is found
-            soup.body
-        ]
-        
-        # Use the first valid container
-        content_div = next((container for container in content_containers if container), soup.body)
-        
-        # Get all paragraphs and headings with text content
-        paragraphs = []
-        for element in content_div.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div.paragraph']):
-            # Skip elements that are likely navigation, footer, etc.
-            if element.parent and element.parent.name in ['nav', 'footer', 'header', 'aside']:
-                continue
-                
-            # Skip elements with certain classes
-            if element.get('class') and any(c in str(element.get('class')).lower() for c in ['nav', 'menu', 'footer', 'header', 'sidebar']):
-                continue
-                
-            text = element.get_text().strip()
-            if text and len(text) > 10:  # Only include non-empty paragraphs with reasonable length
-                paragraphs.append(text)
+        if cache is None:
+            cache = get_http_cache()
         
-        # If no paragraphs found or too few, try a more aggressive approach
-        if len(paragraphs) <= 1:
-            # Look for text in div elements
-            for div in content_div.find_all('div'):
-                # Skip elements that are likely navigation, footer, etc.
-                if div.parent and div.parent.name in ['nav', 'footer', 'header', 'aside']:
-                    continue
-                    
-                # Skip elements with certain classes
-                if div.get('class') and any(c in str(div.get('class')).lower() for c in ['nav', 'menu', 'footer', 'header', 'sidebar']):
-                    continue
-                
-                # Get direct text content (not from child elements)
-                text = div.get_text().strip()
-                if text and len(text) > 20 and not any(p in text for p in paragraphs):
-                    paragraphs.append(text)
-        
-        # If still no paragraphs, get all text nodes
-        if len(paragraphs) <= 1:
-            for element in content_div.find_all(text=True):
-                if element.parent.name not in ['script', 'style', 'meta', 'link', 'noscript']:
-                    text = element.strip()
-                    if text and len(text) > 20 and not any(p in text for p in paragraphs):
-                        paragraphs.append(text)
-        
-        result = {
-            'title': title,
-            'paragraphs': paragraphs,
-            'url': url
-        }
-        
-        # If HTML preservation is requested, add HTML content
-        if preserve_html:
-            # Add unique IDs to all text elements for later translation
-            html_elements = []
+        if not cache:
+            # Send a GET request to the website with timeout
+            with timed('fetch'):
+                response = fetch_html(url, timeout)
+            inc('bytes_fetched_total', len(response.content))
             
-            for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'div', 'a', 'button', 'li']):
-                if element.string and element.string.strip():
-                    element_id = f"translate-{uuid.uuid4()}"
-                    element['data-translate-id'] = element_id
-                    html_elements.append({
-                        'id': element_id,
-                        'text': element.string.strip(),
-                        'tag': element.name
-                    })
+            # Parse the HTML content
+            with timed('parse'):
+                soup = parse_html(response_markup(response), parser)
             
-            result['html'] = str(soup)
-            result['html_elements'] = html_elements
+            with timed('extract'):
+                result = extract_content(soup, url, preserve_html)
+            inc('pages_total', outcome='fetched')
+            return result
+        
+        # Revalidate a cached copy; an unchanged page reuses its extraction result
+        with timed('fetch'):
+            page = cache.fetch(url, get_session(), timeout)
+        variant = f"preserve_html={preserve_html};parser={parser}"
+        if page.not_modified:
+            inc('cache_hits_total', cache='http')
+            result = cache.get_extraction(url, variant)
+            if result is not None:
+                inc('cache_hits_total', cache='extraction')
+                inc('pages_total', outcome='cached')
+                return result
+        else:
+            inc('cache_misses_total', cache='http')
+            inc('bytes_fetched_total', len(page.body))
         
+        with timed('parse'):
+            soup = parse_html(page.markup, parser)
+        with timed('extract'):
+            result = extract_content(soup, url, preserve_html)
+        cache.put_extraction(url, variant, result)
+        inc('pages_total', outcome='fetched')
         return result
     
     except Exception as e:
+        inc('pages_total', outcome='error')
         return {
             'error': str(e),
             'url': url
@@ -147,6 +426,4 @@ def is_dhivehi_text(text):
     Returns:
         bool: True if text contains Dhivehi characters, False otherwise
     """
-    # Dhivehi Unicode range (approximate)
-    dhivehi_pattern = re.compile(r'[\u0780-\u07BF]')
-    return bool(dhivehi_pattern.search(text))
\ No newline at end of file
+    return bool(DHIVEHI_PATTERN.search(text))
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Pre-translation filter rules.
+
+A rule is a function ``rule(text, source_lang, target_lang)`` returning True
+when a segment does not need translating; such segments are returned by
+``translator.translate_batch`` exactly as they are and never billed. Rules
+can be added to ``DEFAULT_RULES`` or passed per call as ``filters``.
+"""
+import re
+from language_id import LANGUAGE_SCRIPTS, detect_language
+
+_number_pattern = re.compile(r'[-+±]?[$€£¥₹]?\s*\d[\d\s.,:/%\'’()\-–—+×]*[$€£¥₹%]?')
+_date_pattern = re.compile(
+    r'\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?'
+    r'|\d{1,2}[./-]\d{1,2}[./-]\d{2,4}'
+    r'|\d{1,2}:\d{2}(:\d{2})?\s*([AaPp]\.?[Mm]\.?)?'
+)
+_url_pattern = re.compile(r'(https?://|ftp://|www\.)\S+|[\w.+-]+@[\w-]+(\.[\w-]+)+', re.I)
+_punctuation_pattern = re.compile(r'[\W_]+')
+
+def is_number(text, source_lang, target_lang):
+    """Numbers, amounts, percentages, phone numbers and numeric ranges."""
+    return bool(_number_pattern.fullmatch(text))
+
+def is_date(text, source_lang, target_lang):
+    """Numeric dates and times such as 2024-05-01, 01/05/2024 or 10:30 AM."""
+    return bool(_date_pattern.fullmatch(text))
+
+def is_url(text, source_lang, target_lang):
+    """URLs and email addresses."""
+    return bool(_url_pattern.fullmatch(text))
+
+def is_punctuation(text, source_lang, target_lang):
+    """Runs of punctuation, symbols and emoji without letters or digits."""
+    return bool(_punctuation_pattern.fullmatch(text))
+
+def is_target_script(text, source_lang, target_lang):
+    """
+    Text already written in the target language's script (see ``language_id``).
+
+    Only applies when the source language is detected or written in another
+    script: French text is in the script of English, but still needs
+    translating into English.
+    """
+    if source_lang != 'auto':
+        source_script = LANGUAGE_SCRIPTS.get(source_lang)
+        if source_script is None or source_script == LANGUAGE_SCRIPTS.get(target_lang):
+            return False
+    return detect_language(text) == target_lang
+
+DEFAULT_RULES = [is_punctuation, is_number, is_date, is_url, is_target_script]
+
+def untranslatable(text, source_lang, target_lang, rules=None):
+    """
+    Check a segment against the filter rules.
+
+    Args:
+        text (str): Segment to check
+        source_lang (str): Source language code
+        target_lang (str): Target language code
+        rules (list, optional): Rules to apply instead of ``DEFAULT_RULES``
+
+    Returns:
+        callable: The first rule that matched, or None if the segment needs translating
+    """
+    text = text.strip()
+    for rule in DEFAULT_RULES if rules is None else rules:
+        if rule(text, source_lang, target_lang):
+            return rule
+    return None
@@ -0,0 +1,85 @@
+"""
+Local stand-in for a self-hosted translation server.
+
+Serves the LibreTranslate-style endpoint expected by ``backends.HttpBackend``
+with translations from a ``StubBackend``, so the HTTP path can be exercised
+without a model. Latency and failures can be injected.
+
+Example:
+    python stub_server.py --port 5000 --latency 0.05 --error-rate 0.05
+    DHIVEHI_TRANSLATION_BACKEND=http DHIVEHI_BACKEND_URL=http://localhost:5000/translate streamlit run app.py
+"""
+import argparse
+import asyncio
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from backends import BackendError, StubBackend
+
+def make_server(host='127.0.0.1', port=5000, backend=None):
+    """
+    Create the stand-in server (call ``serve_forever`` to run it).
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 for any free port)
+        backend (StubBackend, optional): Backend producing the translations
+
+    Returns:
+        ThreadingHTTPServer: Server answering POST /translate
+    """
+    backend = backend or StubBackend()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/translate':
+                self._reply(404, {'error': "Not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                texts = payload['q']
+            except (ValueError, KeyError):
+                self._reply(400, {'error': "Expected a JSON body with 'q'"})
+                return
+
+            single = isinstance(texts, str)
+            try:
+                translations = asyncio.run(backend.translate_batch(
+                    [texts] if single else texts, payload.get('source', 'auto'), payload.get('target', 'en')
+                ))
+            except BackendError as e:
+                self._reply(e.code or 500, {'error': str(e)})
+                return
+            self._reply(200, {'translatedText': translations[0] if single else translations})
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests failing with 429")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, StubBackend(latency=args.latency, error_rate=args.error_rate))
+    print(f"Serving stub translations on http://{args.host}:{server.server_port}/translate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from metrics import register_collector
+
+# Default location of the on-disk tier. Set DHIVEHI_TM_PATH to an empty string
+# to keep the translation memory in-process only.
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'dhivehi_translator', 'translation_memory.sqlite3')
+
+# SQLite limits the number of host parameters in a single statement
+_SQL_CHUNK = 500
+
+_whitespace_pattern = re.compile(r'\s+')
+
+def normalize_segment(text):
+    """
+    Normalize a segment so trivially different copies share a cache entry.
+
+    Args:
+        text (str): Segment text
+
+    Returns:
+        str: NFC-normalized text with collapsed whitespace
+    """
+    return _whitespace_pattern.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+def segment_key(text, source_lang, target_lang):
+    """
+    Build the cache key for a segment and language pair.
+
+    Args:
+        text (str): Segment text
+        source_lang (str): Source language code
+        target_lang (str): Target language code
+
+    Returns:
+        str: Hex digest identifying the segment and language pair
+    """
+    raw = f"{source_lang}\x1f{target_lang}\x1f{normalize_segment(text)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class TranslationMemory:
+    """
+    Two-tier translation cache: an in-process LRU in front of a SQLite file.
+
+    Entries older than ``ttl`` seconds are treated as misses. Both tiers are
+    bounded by entry count and evict the least recently used entries first.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_memory_entries=10000, max_disk_entries=500000,
+                 ttl=30 * 24 * 3600):
+        """
+        Args:
+            path (str, optional): SQLite file for the disk tier (None for memory only)
+            max_memory_entries (int): Capacity of the in-process LRU tier
+            max_disk_entries (int): Capacity of the disk tier
+            ttl (float, optional): Entry lifetime in seconds (None for no expiry)
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'characters_saved': 0
+        }
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used)")
+            self._db.commit()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key, translation, created_at):
+        # Caller holds the lock
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get_many(self, texts, source_lang, target_lang):
+        """
+        Look up several segments at once.
+
+        Args:
+            texts (list): Segment texts
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+
+        Returns:
+            dict: Mapping of input index to cached translation, for hits only
+        """
+        now = time.time()
+        found = {}
+        missing = {}
+
+        with self._lock:
+            for index, text in enumerate(texts):
+                key = segment_key(text, source_lang, target_lang)
+                entry = self._memory.get(key)
+                if entry and not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    found[index] = entry[0]
+                    self._stats['memory_hits'] += 1
+                    self._stats['characters_saved'] += len(text)
+                else:
+                    if entry:
+                        del self._memory[key]
+                    missing.setdefault(key, []).append(index)
+
+            if self._db is not None and missing:
+                keys = list(missing)
+                hits = []
+                expired = []
+                for start in range(0, len(keys), _SQL_CHUNK):
+                    chunk = keys[start:start + _SQL_CHUNK]
+                    rows = self._db.execute(
+                        f"SELECT key, translation, created_at FROM segments WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, translation, created_at in rows:
+                        if self._expired(created_at, now):
+                            expired.append((key,))
+                            continue
+                        hits.append((now, key))
+                        self._remember(key, translation, created_at)
+                        for index in missing.pop(key):
+                            found[index] = translation
+                            self._stats['disk_hits'] += 1
+                            self._stats['characters_saved'] += len(texts[index])
+
+                if hits:
+                    self._db.executemany("UPDATE segments SET last_used = ? WHERE key = ?", hits)
+                if expired:
+                    self._db.executemany("DELETE FROM segments WHERE key = ?", expired)
+                if hits or expired:
+                    self._db.commit()
+
+            self._stats['misses'] += sum(len(indices) for indices in missing.values())
+
+        return found
+
+    def get(self, text, source_lang, target_lang):
+        """
+        Look up a single segment.
+
+        Returns:
+            str: Cached translation, or None on a miss
+        """
+        return self.get_many([text], source_lang, target_lang).get(0)
+
+    def put_many(self, items, source_lang, target_lang):
+        """
+        Store translations for several segments.
+
+        Args:
+            items (list): (original text, translated text) pairs
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+        """
+        now = time.time()
+        rows = []
+
+        with self._lock:
+            for text, translation in items:
+                key = segment_key(text, source_lang, target_lang)
+                self._remember(key, translation, now)
+                rows.append((key, translation, now, now))
+            self._stats['writes'] += len(rows)
+
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO segments (key, translation, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._db.commit()
+                self._writes_since_eviction += len(rows)
+                # Counting rows is a full scan, so only check the size now and then
+                if self._writes_since_eviction >= 1000:
+                    self._writes_since_eviction = 0
+                    self._evict_disk()
+
+    def put(self, text, source_lang, target_lang, translation):
+        """
+        Store the translation of a single segment.
+        """
+        self.put_many([(text, translation)], source_lang, target_lang)
+
+    def _evict_disk(self):
+        # Caller holds the lock
+        count = self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM segments WHERE key IN (SELECT key FROM segments ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._db.commit()
+            self._stats['evictions'] += excess
+
+    def stats(self):
+        """
+        Get hit/miss counters for both tiers.
+
+        Returns:
+            dict: Counters plus the overall hit rate and current tier sizes;
+                ``characters_saved`` counts the source characters of all hits
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            if self._db is not None:
+                stats['disk_entries'] = self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Remove every entry from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM segments")
+                self._db.commit()
+
+    def close(self):
+        """
+        Close the disk tier.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_default_memory = None
+_default_lock = threading.Lock()
+
+def get_translation_memory():
+    """
+    Get the process-wide translation memory, creating it on first use.
+
+    Returns:
+        TranslationMemory: Shared translation memory
+    """
+    global _default_memory
+    with _default_lock:
+        if _default_memory is None:
+            path = os.environ.get('DHIVEHI_TM_PATH', DEFAULT_DB_PATH)
+            _default_memory = TranslationMemory(path or None)
+        return _default_memory
+
+def _shared_memory_stats():
+    # Report the shared memory only once something has created it
+    memory = _default_memory
+    return memory.stats() if memory is not None else None
+
+register_collector('translation_memory', _shared_memory_stats)
+
+def set_translation_memory(memory):
+    """
+    Replace the process-wide translation memory (e.g. with a memory-only one in tests).
+
+    Args:
+        memory (TranslationMemory): Translation memory to use by default
+    """
+    global _default_memory
+    with _default_lock:
+        _default_memory = memory
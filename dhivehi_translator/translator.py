@@ -1,96 +1,677 @@
-from google.cloud import translate_v2 as translate
+import asyncio
 import os
-from bs4 import BeautifulSoup
+import random
+import threading
+import weakref
+from backends import GoogleBackend, get_backend
+from concurrency import CircuitBreaker, TokenBucket, error_code, gather_ordered, is_retryable, run_sync
+from html_utils import index_by_attribute, parse_html, render_template
+from language_id import label_segments
+from metrics import SIZE_BUCKETS, inc, observe, timed
+from page_cache import get_page_cache, page_hash
+from segment_filter import untranslatable
+from translation_memory import get_translation_memory
 
-def translate_text(text, source_lang='auto', target_lang='en'):
+# Google Cloud Translation (v2) accepts at most 128 segments per request and
+# rejects very large payloads, so batches are capped on both counts.
+MAX_BATCH_SEGMENTS = 128
+MAX_BATCH_CHARS = 30000
+
+# Process-wide API usage counters (see get_translation_stats)
+_stats = {
+    'api_calls': 0,
+    'segments_translated': 0,
+    'characters_translated': 0,
+    'characters_filtered': 0,
+    'characters_deduplicated': 0,
+    'segments_retried': 0,
+    'segments_failed': 0
+}
+_stats_lock = threading.Lock()
+
+def get_translation_stats():
     """
-    Translate text between languages using Google Cloud Translation API.
+    Get process-wide counters of Translation API usage.
+    
+    Returns:
+        dict: API calls made (including retries), segments and characters
+            successfully translated through the API, characters kept from the
+            API by filter rules and de-duplication, and segments sent to the
+            retry queue or given up on
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+def make_batches(texts, max_segments=MAX_BATCH_SEGMENTS, max_chars=MAX_BATCH_CHARS):
+    """
+    Group segments into batches that respect the per-request API limits.
     
     Args:
-        text (str): Text to translate
+        texts (list): Segments to translate
+        max_segments (int): Maximum number of segments per request
+        max_chars (int): Maximum total characters per request
+        
+    Returns:
+        list: List of batches, each a list of indices into ``texts``
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    
+    for index, text in enumerate(texts):
+        length = len(text)
+        # Start a new batch when adding this segment would break a limit.
+        # A single oversized segment still gets a batch of its own.
+        if current and (len(current) >= max_segments or current_chars + length > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(index)
+        current_chars += length
+    
+    if current:
+        batches.append(current)
+    
+    return batches
+
+# Segment outcomes (see SegmentResult)
+STATUS_TRANSLATED = 'translated'  # translated by the backend
+STATUS_CACHED = 'cached'          # served from the translation memory
+STATUS_SKIPPED = 'skipped'        # blank, filtered or already in the target language
+STATUS_FAILED = 'failed'          # every attempt failed; the translation is the original text
+
+# Client errors that may be caused by a single segment: the batch is split in
+# halves until the offending segment is isolated
+SPLIT_STATUS_CODES = {400, 413}
+
+# Backoff between retry rounds of the retry queue
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+class SegmentResult:
+    """
+    Outcome of translating one segment.
+    
+    ``translation`` always holds displayable text: the original segment when
+    it was skipped or failed. Failures carry the error message and, if the
+    backend reported one, its HTTP status code.
+    """
+    
+    __slots__ = ('text', 'translation', 'status', 'error', 'code')
+    
+    def __init__(self, text, translation, status, error=None, code=None):
+        self.text = text
+        self.translation = translation
+        self.status = status
+        self.error = error
+        self.code = code
+    
+    @property
+    def ok(self):
+        """bool: Whether the segment has a usable translation"""
+        return self.status != STATUS_FAILED
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: The result as a JSON-serializable dictionary
+        """
+        result = {'original': self.text, 'translated': self.translation, 'status': self.status}
+        if self.status == STATUS_FAILED:
+            result['error'] = self.error
+            result['code'] = self.code
+        return result
+    
+    def __repr__(self):
+        return f"SegmentResult({self.text!r}, {self.translation!r}, {self.status!r})"
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a backend whose circuit breaker is open.
+    """
+
+_breakers = weakref.WeakKeyDictionary()
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(backend):
+    """
+    Get the circuit breaker shared by every translation through ``backend``.
+    
+    Args:
+        backend (TranslationBackend): Backend to guard
+        
+    Returns:
+        CircuitBreaker: Breaker of the backend
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(backend)
+        if breaker is None:
+            breaker = _breakers[backend] = CircuitBreaker()
+        return breaker
+
+_rate_limiter = None
+_rate_limiter_configured = False
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Get the character quota shared by every translation in this process.
+    
+    It is created on first use from DHIVEHI_CHARS_PER_SECOND; unset or 0
+    means no limit. The quota applies per process (see ``jobs.start_workers``).
+    
+    Returns:
+        TokenBucket: Shared limiter, or None without a limit
+    """
+    global _rate_limiter, _rate_limiter_configured
+    with _rate_limiter_lock:
+        if not _rate_limiter_configured:
+            rate = float(os.environ.get('DHIVEHI_CHARS_PER_SECOND') or 0)
+            _rate_limiter = TokenBucket(rate) if rate > 0 else None
+            _rate_limiter_configured = True
+        return _rate_limiter
+
+def set_rate_limiter(chars_per_second):
+    """
+    Replace the shared character quota, e.g. from a command line option.
+    
+    Args:
+        chars_per_second (float): Characters per second, 0 or None for no limit
+    """
+    global _rate_limiter, _rate_limiter_configured
+    with _rate_limiter_lock:
+        _rate_limiter = TokenBucket(chars_per_second) if chars_per_second else None
+        _rate_limiter_configured = True
+
+def segment_workers(default=1):
+    """
+    Get the number of API requests one translation may have in flight.
+    
+    Args:
+        default (int): Value used when DHIVEHI_SEGMENT_WORKERS is not set
+        
+    Returns:
+        int: DHIVEHI_SEGMENT_WORKERS, else ``default``
+    """
+    return max(int(os.environ.get('DHIVEHI_SEGMENT_WORKERS') or default), 1)
+
+async def translate_segments_async(texts, source_lang='auto', target_lang='en', backend=None, memory=None,
+                                   max_workers=1, rate_limiter=None, retries=4, route_by_script=True,
+                                   filters=None, usage=None, client=None, breaker=None):
+    """
+    Translate a list of texts using as few backend round-trips as possible.
+    
+    Segments matching a filter rule (numbers, dates, URLs, punctuation, text
+    already in the target script; see ``segment_filter``) are returned as
+    they are, and repeated segments are translated once. Segments found in
+    the translation memory are served from it. The rest are packed into
+    batches (see ``make_batches``) and each batch is sent as a single
+    ``backend.translate_batch`` call, with up to ``max_workers`` batches in
+    flight.
+    
+    Failed batches go to a retry queue: transient failures (HTTP 429/5xx)
+    are retried in rounds with jittered exponential backoff, and batches
+    rejected with HTTP 400/413 are split until the offending segment is
+    isolated, so one bad segment or a quota blip does not fail the rest.
+    While the backend's circuit breaker is open, batches wait in the queue
+    for its trial call instead of being sent; they fail only once the
+    retries are used up with the circuit still open.
+    
+    With ``route_by_script`` and ``source_lang='auto'``, each segment is sent
+    with the language identified from its script (see ``language_id``), so
+    mixed pages are routed per segment.
+    
+    Args:
+        texts (list): Texts to translate
         source_lang (str): Source language code (default: 'auto' for auto-detection)
         target_lang (str): Target language code (default: 'en' for English)
+        backend (TranslationBackend, optional): Backend to use instead of the shared one
+        memory (TranslationMemory, optional): Cache to use instead of the shared one
+        max_workers (int): Maximum number of requests in flight (default: 1)
+        rate_limiter (TokenBucket, optional): Character quota to respect (default: the
+            shared one, see ``get_rate_limiter``; False for none)
+        retries (int): Retry rounds for segments failing with HTTP 429/5xx
+        route_by_script (bool): Whether to label segments by script before sending them
+        filters (list, optional): Filter rules to use instead of ``segment_filter.DEFAULT_RULES``
+            (an empty list disables filtering)
+        usage (dict, optional): Character counts of this call are added to it
+            (see ``new_usage``)
+        client (translate.Client, optional): Google client to use through a ``GoogleBackend``
+        breaker (CircuitBreaker, optional): Breaker to use instead of the backend's shared one
         
     Returns:
-        str: Translated text
-    """
-    try:
-        # Check if source and target languages are the same
-        if source_lang == target_lang and source_lang != 'auto':
-            return text  # Return the original text without translation
-        
-        # Create a client
-        translate_client = translate.Client()
-        
-        # The source language can be explicitly specified or auto-detected
-        if source_lang == 'auto':
-            # Perform the translation
-            result = translate_client.translate(
-                text,
-                target_language=target_lang
-            )
+        list: One SegmentResult per input text, in input order
+    """
+    texts = list(texts)
+    results = [SegmentResult(text, text, STATUS_SKIPPED) for text in texts]
+    counts = new_usage()
+    
+    # Check if source and target languages are the same
+    if source_lang == target_lang and source_lang != 'auto':
+        return results  # Return the original texts without translation
+    
+    # Blank segments are returned as they are
+    pending = [i for i, text in enumerate(texts) if text and text.strip()]
+    counts['characters'] = sum(len(texts[i]) for i in pending)
+    
+    # Drop segments that need no translation and translate repeats only once
+    first_seen = {}
+    duplicates = {}  # index -> index of the first identical segment
+    unique = []
+    for i in pending:
+        first = first_seen.setdefault(texts[i], i)
+        if first != i:
+            duplicates[i] = first
+            counts['duplicate_characters'] += len(texts[i])
+        elif untranslatable(texts[i], source_lang, target_lang, filters):
+            counts['filtered_characters'] += len(texts[i])
         else:
-            # Perform the translation with specified source language
-            result = translate_client.translate(
-                text,
-                target_language=target_lang,
-                source_language=source_lang
-            )
+            unique.append(i)
+    
+    if backend is None:
+        backend = GoogleBackend(client) if client is not None else get_backend()
+    if rate_limiter is None:
+        rate_limiter = get_rate_limiter()
+    with timed('translate', segments=len(unique), backend=backend.name):
+        await _translate_pending(texts, results, unique, source_lang, target_lang, backend, memory,
+                                 max_workers, rate_limiter, retries, route_by_script, counts,
+                                 breaker or get_circuit_breaker(backend))
+    
+    for i, first in duplicates.items():
+        original = results[first]
+        results[i] = SegmentResult(texts[i], original.translation, original.status, original.error, original.code)
+    
+    statuses = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    for status, count in statuses.items():
+        inc('segments_total', count, status=status)
+    inc('characters_billed_total', counts['api_characters'])
+    
+    with _stats_lock:
+        _stats['characters_filtered'] += counts['filtered_characters']
+        _stats['characters_deduplicated'] += counts['duplicate_characters']
+    if usage is not None:
+        for key, value in counts.items():
+            usage[key] = usage.get(key, 0) + value
+    
+    return results
+
+def translate_segments(texts, source_lang='auto', target_lang='en', **kwargs):
+    """
+    Translate a list of texts; blocking wrapper around ``translate_segments_async``.
+    
+    Args:
+        texts (list): Texts to translate
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        **kwargs: Further options for ``translate_segments_async``
         
-        return result['translatedText']
-    except Exception as e:
-        return f"Translation error: {str(e)}"
+    Returns:
+        list: One SegmentResult per input text, in input order
+    """
+    return run_sync(translate_segments_async(texts, source_lang, target_lang, **kwargs))
 
-def translate_content(content, source_lang='auto', target_lang='en'):
+async def translate_batch_async(texts, source_lang='auto', target_lang='en', **kwargs):
     """
-    Translate a dictionary of content (title and paragraphs).
+    Translate a list of texts (see ``translate_segments_async``).
     
     Args:
-        content (dict): Dictionary containing title and paragraphs
+        texts (list): Texts to translate
         source_lang (str): Source language code (default: 'auto' for auto-detection)
         target_lang (str): Target language code (default: 'en' for English)
+        **kwargs: Further options for ``translate_segments_async``
         
     Returns:
-        dict: Dictionary with translated title and paragraphs
+        list: Translated texts, one per input text; segments that could not
+            be translated are returned unchanged
     """
-    if 'error' in content:
-        return content
+    return [result.translation for result in await translate_segments_async(texts, source_lang, target_lang, **kwargs)]
+
+def translate_batch(texts, source_lang='auto', target_lang='en', **kwargs):
+    """
+    Translate a list of texts; blocking wrapper around ``translate_batch_async``.
+    
+    Args:
+        texts (list): Texts to translate
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        **kwargs: Further options for ``translate_segments_async``
+        
+    Returns:
+        list: Translated texts, one per input text; segments that could not
+            be translated are returned unchanged
+    """
+    return run_sync(translate_batch_async(texts, source_lang, target_lang, **kwargs))
+
+def new_usage():
+    """
+    Create an empty record of where the characters of a translation went.
+    
+    Returns:
+        dict: ``characters`` (non-blank input), ``filtered_characters``
+            (skipped by filter rules), ``duplicate_characters`` (repeats),
+            ``cached_characters`` (translation memory hits) and
+            ``api_characters`` (sent to the backend)
+    """
+    return {
+        'characters': 0,
+        'filtered_characters': 0,
+        'duplicate_characters': 0,
+        'cached_characters': 0,
+        'api_characters': 0
+    }
+
+async def _translate_pending(texts, results, pending, source_lang, target_lang, backend, memory,
+                             max_workers, rate_limiter, retries, route_by_script, counts, breaker):
+    # Fill results[i] for each index in pending, through the memory and the backend
+    if not pending:
+        return
+    
+    # Serve repeated segments from the translation memory
+    if memory is None:
+        memory = get_translation_memory()
+    with timed('memory_lookup'):
+        cached = memory.get_many([texts[i] for i in pending], source_lang, target_lang)
+    inc('cache_hits_total', len(cached), cache='memory')
+    inc('cache_misses_total', len(pending) - len(cached), cache='memory')
+    for position, translation in cached.items():
+        i = pending[position]
+        results[i] = SegmentResult(texts[i], translation, STATUS_CACHED)
+        counts['cached_characters'] += len(texts[i])
+    pending = [i for position, i in enumerate(pending) if position not in cached]
+    if not pending:
+        return
+    
+    sources = {}  # index -> detected source language
+    if route_by_script and source_lang == 'auto':
+        with timed('detect'):
+            languages = label_segments([texts[i] for i in pending])
+        for i, language in zip(pending, languages):
+            if language and language != target_lang:
+                sources[i] = language
+    
+    async def send(batch):
+        batch_source, indices, _ = batch
+        batch_texts = [texts[i] for i in indices]
+        if not breaker.allow():
+            return None, CircuitOpenError("Translation backend unavailable (circuit breaker open)")
+        
+        try:
+            if rate_limiter:
+                await rate_limiter.acquire_async(sum(len(text) for text in batch_texts))
+            with _stats_lock:
+                _stats['api_calls'] += 1
+            inc('api_calls_total', backend=backend.name)
+            observe('batch_segments', len(batch_texts), SIZE_BUCKETS)
+            with timed('api_call', segments=len(batch_texts)):
+                translations = await backend.translate_batch(batch_texts, batch_source, target_lang)
+        except Exception as e:
+            # Quota errors and errors caused by the content of a batch come from
+            # a backend that is up, so they do not count towards opening the circuit
+            if error_code(e) in SPLIT_STATUS_CODES or error_code(e) == 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            return None, e
+        except BaseException:
+            # A call cancelled mid-flight must not leave a trial call unrecorded,
+            # or the circuit would stay half-open and refuse every call for good
+            breaker.record_failure()
+            raise
+        
+        breaker.record_success()
+        with _stats_lock:
+            _stats['segments_translated'] += len(batch_texts)
+            _stats['characters_translated'] += sum(len(text) for text in batch_texts)
+        return translations, None
+    
+    # Batch the segments of each source language separately
+    groups = {}
+    for i in pending:
+        groups.setdefault(sources.get(i, source_lang), []).append(i)
+    queue = [
+        (batch_source, [indices[i] for i in batch], 0)
+        for batch_source, indices in groups.items()
+        for batch in make_batches([texts[i] for i in indices])
+    ]
+    
+    def fail(indices, error):
+        for i in indices:
+            results[i] = SegmentResult(texts[i], texts[i], STATUS_FAILED, str(error), error_code(error))
+        with _stats_lock:
+            _stats['segments_failed'] += len(indices)
+    
+    translated = []
+    open_rounds = 0  # consecutive rounds that ended with the circuit open
+    while queue:
+        split = []
+        retry = []
+        deferred = []
+        for (batch_source, indices, attempts), (translations, error) in zip(queue, await gather_ordered(send, queue, max_workers)):
+            if error is None:
+                counts['api_characters'] += sum(len(texts[i]) for i in indices)
+                for i, translation in zip(indices, translations):
+                    results[i] = SegmentResult(texts[i], translation, STATUS_TRANSLATED)
+                    translated.append((texts[i], translation))
+            elif isinstance(error, CircuitOpenError):
+                # Not sent at all: wait for the circuit to close
+                deferred.append((batch_source, indices, attempts, error))
+            elif error_code(error) in SPLIT_STATUS_CODES and len(indices) > 1:
+                # Isolate the segment the backend rejects
+                half = len(indices) // 2
+                split.extend([(batch_source, indices[:half], attempts), (batch_source, indices[half:], attempts)])
+            elif is_retryable(error) and attempts < retries:
+                retry.append((batch_source, indices, attempts + 1))
+            else:
+                fail(indices, error)
+        
+        delay = 0.0
+        if retry:
+            # Only the failed segments go round again, after a jittered backoff
+            with _stats_lock:
+                _stats['segments_retried'] += sum(len(indices) for _, indices, _ in retry)
+            attempt = max(attempts for _, _, attempts in retry) - 1
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if deferred:
+            # A backend that stays down (or a trial call that does not settle)
+            # through ``retries`` rounds fails the batches held back
+            open_rounds = open_rounds + 1 if breaker.state != breaker.CLOSED else 0
+            if open_rounds > retries:
+                for _, indices, _, error in deferred:
+                    fail(indices, error)
+                deferred = []
+            elif open_rounds:
+                # Wait until the breaker lets its trial call through; while
+                # another caller's trial is in flight, back off until it settles
+                backoff = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (open_rounds - 1))
+                delay = max(delay, breaker.retry_after(), backoff)
+        if delay:
+            await asyncio.sleep(delay)
+        queue = split + retry + [batch[:3] for batch in deferred]
+    
+    # Only successful translations are remembered
+    if translated:
+        memory.put_many(translated, source_lang, target_lang)
+
+def translate_text(text, source_lang='auto', target_lang='en', backend=None):
+    """
+    Translate text between languages.
+    
+    Args:
+        text (str): Text to translate
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        backend (TranslationBackend, optional): Backend to use instead of the shared one
+        
+    Returns:
+        str: Translated text (the original text if it could not be translated)
+    """
+    return translate_batch([text], source_lang, target_lang, backend=backend)[0]
+
+def content_segments(content):
+    """
+    List every translatable segment of scraped content, in a fixed order:
+    the title, the paragraphs, then the text of each HTML element.
+    
+    Args:
+        content (dict): Dictionary containing title and paragraphs
+        
+    Returns:
+        list: Segment texts
+    """
+    segments = [content['title']] + list(content['paragraphs'])
+    segments.extend(element['text'] for element in content.get('html_elements', []))
+    return segments
+
+def assemble_translation(content, results):
+    """
+    Build the translated content dictionary from per-segment results.
+    
+    Segments that failed keep their original text, so the translated HTML
+    never contains error messages.
     
+    Args:
+        content (dict): Dictionary containing title and paragraphs
+        results (list): SegmentResult of each segment of ``content_segments(content)``
+        
+    Returns:
+        dict: Dictionary with translated title and paragraphs, each paragraph
+            and element with its ``status``, and ``failed_segments``, the
+            number of segments left untranslated
+    """
+    translations = [result.translation for result in results]
     translated_content = {
         'original_title': content['title'],
-        'translated_title': translate_text(content['title'], source_lang, target_lang),
-        'paragraphs': []
+        'translated_title': translations[0],
+        'title_status': results[0].status,
+        'paragraphs': [],
+        'failed_segments': sum(1 for result in results if not result.ok)
     }
     
-    for paragraph in content['paragraphs']:
+    paragraph_count = len(content['paragraphs'])
+    for paragraph, result in zip(content['paragraphs'], results[1:1 + paragraph_count]):
         translated_content['paragraphs'].append({
             'original': paragraph,
-            'translated': translate_text(paragraph, source_lang, target_lang)
+            'translated': result.translation,
+            'status': result.status
         })
     
     # If HTML content is present, translate HTML elements
     if 'html_elements' in content:
-        translated_html = content['html']
-        soup = BeautifulSoup(translated_html, 'html.parser')
+        html_elements = content['html_elements']
+        element_translations = translations[1 + paragraph_count:]
         
-        # Translate each HTML element
         translated_elements = []
-        for element in content['html_elements']:
-            translated_text = translate_text(element['text'], source_lang, target_lang)
-            
-            # Find the element in the soup by its ID
-            html_element = soup.find(attrs={"data-translate-id": element['id']})
-            if html_element:
-                html_element.string = translated_text
-            
+        for element, result in zip(html_elements, results[1 + paragraph_count:]):
             translated_elements.append({
                 'id': element['id'],
                 'original': element['text'],
-                'translated': translated_text,
-                'tag': element['tag']
+                'translated': result.translation,
+                'tag': element['tag'],
+                'status': result.status
             })
         
-        translated_content['translated_html'] = str(soup)
+        if 'html_template' in content:
+            # Fill the template serialized at scrape time; no re-parsing needed
+            template = content['html_template']
+            slot_texts = [None] * (len(template) - 1)
+            for element, translated_text in zip(html_elements, element_translations):
+                slot_texts[element['slot']] = translated_text
+            translated_content['translated_html'] = render_template(template, slot_texts)
+        else:
+            soup = parse_html(content['html'])
+            
+            # Index the elements by ID in one traversal rather than searching
+            # the whole tree for each element, then serialize once
+            nodes = index_by_attribute(soup, 'data-translate-id')
+            for element, translated_text in zip(html_elements, element_translations):
+                html_element = nodes.get(element['id'])
+                if html_element is not None:
+                    html_element.string = translated_text
+            
+            translated_content['translated_html'] = str(soup)
+        
         translated_content['translated_elements'] = translated_elements
     
-    return translated_content
\ No newline at end of file
+    return translated_content
+
+async def translate_content_async(content, source_lang='auto', target_lang='en', backend=None, memory=None,
+                                  max_workers=1, rate_limiter=None, page_cache=None, client=None):
+    """
+    Translate a dictionary of content (title and paragraphs).
+    
+    Args:
+        content (dict): Dictionary containing title and paragraphs
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        backend (TranslationBackend, optional): Backend to use instead of the shared one
+        memory (TranslationMemory, optional): Cache to use instead of the shared one
+        max_workers (int): Maximum number of requests in flight (default: 1)
+        rate_limiter (TokenBucket, optional): Character quota to respect (default: the
+            shared one, see ``get_rate_limiter``; False for none)
+        page_cache (TranslatedPageCache, optional): Cache of translated HTML pages to use
+            instead of the shared one (False to disable)
+        client (translate.Client, optional): Google client to use through a ``GoogleBackend``
+        
+    Returns:
+        dict: Dictionary with translated title and paragraphs (see
+            ``assemble_translation``), plus ``usage``: character counts (see
+            ``new_usage``) and ``saved_characters``, the characters that were
+            not sent to the backend
+    """
+    if 'error' in content:
+        return content
+    
+    # Pages scraped with preserve_html have stable IDs, so a repeat view of an
+    # unchanged page is served from the translated page cache
+    if page_cache is None and 'html' in content:
+        page_cache = get_page_cache()
+    content_hash = page_hash(content) if page_cache else None
+    if content_hash:
+        cached = page_cache.get(content_hash, source_lang, target_lang)
+        inc('cache_hits_total' if cached is not None else 'cache_misses_total', cache='page')
+        if cached is not None:
+            characters = sum(len(text) for text in content_segments(content) if text and text.strip())
+            cached['usage'] = dict(new_usage(), characters=characters, saved_characters=characters)
+            return cached
+    
+    # Collect every segment of the page so they can be translated in batches
+    usage = new_usage()
+    results = await translate_segments_async(
+        content_segments(content), source_lang, target_lang, backend=backend, memory=memory,
+        max_workers=max_workers, rate_limiter=rate_limiter, usage=usage, client=client
+    )
+    
+    translated_content = assemble_translation(content, results)
+    # Pages with failed segments are translated again on the next view
+    if content_hash and not translated_content['failed_segments']:
+        page_cache.put(content_hash, source_lang, target_lang, translated_content)
+    usage['saved_characters'] = usage['characters'] - usage['api_characters']
+    translated_content['usage'] = usage
+    return translated_content
+
+def translate_content(content, source_lang='auto', target_lang='en', backend=None, memory=None,
+                      max_workers=1, rate_limiter=None, page_cache=None, client=None):
+    """
+    Translate a dictionary of content; blocking wrapper around ``translate_content_async``.
+    
+    Args:
+        content (dict): Dictionary containing title and paragraphs
+        source_lang (str): Source language code (default: 'auto' for auto-detection)
+        target_lang (str): Target language code (default: 'en' for English)
+        backend (TranslationBackend, optional): Backend to use instead of the shared one
+        memory (TranslationMemory, optional): Cache to use instead of the shared one
+        max_workers (int): Maximum number of requests in flight (default: 1)
+        rate_limiter (TokenBucket, optional): Character quota to respect (default: the
+            shared one, see ``get_rate_limiter``; False for none)
+        page_cache (TranslatedPageCache, optional): Cache of translated HTML pages (False to disable)
+        client (translate.Client, optional): Google client to use through a ``GoogleBackend``
+        
+    Returns:
+        dict: Dictionary with translated title and paragraphs, plus ``usage``
+    """
+    return run_sync(translate_content_async(
+        content, source_lang, target_lang, backend=backend, memory=memory, max_workers=max_workers,
+        rate_limiter=rate_limiter, page_cache=page_cache, client=client
+    ))
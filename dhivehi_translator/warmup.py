@@ -0,0 +1,77 @@
+"""
+Warm-start hook for the app and the job workers.
+
+The translation client library, the HTML parser and the document extractors
+are imported on first use (see ``client_pool``, ``html_utils`` and
+``documents``), which keeps startup fast but moves their cost onto the first
+request. ``warm_up`` pays it ahead of time: it creates the shared translation
+client and parser so the first translation does not wait for them.
+
+Enable it in the app with DHIVEHI_WARMUP=1; job workers always warm up
+before claiming their first job.
+"""
+import importlib
+import os
+import threading
+import time
+from backends import GoogleBackend, get_backend
+from client_pool import get_client
+from html_utils import parse_html
+
+def warm_up_enabled():
+    """
+    Check whether the app should warm up at startup (DHIVEHI_WARMUP).
+    """
+    return os.environ.get('DHIVEHI_WARMUP', '') not in ('', '0')
+
+def warm_up(backend=True, parser=True, extractors=False):
+    """
+    Load the lazily imported parts of the pipeline now.
+
+    Failures (e.g. missing credentials) are reported rather than raised, so
+    warming up never prevents startup; the error is raised again by the
+    first real request.
+
+    Args:
+        backend (bool): Create the shared translation backend and its client
+        parser (bool): Import the HTML parser and its backend
+        extractors (bool): Import the PDF and DOCX libraries
+
+    Returns:
+        dict: Seconds taken by each step, and ``errors``, a dict of step -> message
+    """
+    timings = {'errors': {}}
+
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            timings['errors'][name] = str(e)
+        timings[name] = time.perf_counter() - start
+
+    if backend:
+        def create_backend():
+            shared = get_backend()
+            if isinstance(shared, GoogleBackend) and shared.client is None:
+                get_client(shared.credentials_path)
+        step('backend', create_backend)
+    if parser:
+        step('parser', lambda: parse_html("<html><body><p>warm-up</p></body></html>"))
+    if extractors:
+        step('extractors', lambda: [importlib.import_module(name) for name in ('PyPDF2', 'docx')])
+    return timings
+
+def warm_up_in_background(**kwargs):
+    """
+    Run ``warm_up`` on a daemon thread, so startup does not wait for it.
+
+    Args:
+        **kwargs: Options for ``warm_up``
+
+    Returns:
+        threading.Thread: The started thread
+    """
+    thread = threading.Thread(target=warm_up, kwargs=kwargs, daemon=True, name='warm-up')
+    thread.start()
+    return thread
@@ -0,0 +1,124 @@
+"""
+Tests for the site crawler against a local HTTP server.
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from crawler import SiteCrawler
+
+
+def page(title, *links):
+    anchors = ''.join(f'<a href="{link}">{link}</a> ' for link in links)
+    return (f"<html><head><title>{title}</title></head><body><main>"
+            f"<p>Paragraph of the {title} page.</p><p>{anchors}</p></main></body></html>")
+
+
+SITE = {
+    '/': page('home', '/a', '/b', '/b#section', '/private', '/report.pdf', 'http://other.example/x'),
+    '/a': page('a', '/a1', '/'),
+    '/b': page('b', '#top'),
+    '/a1': page('a1', '/a2'),
+    '/a2': page('a2'),
+    '/private': page('private'),
+    '/robots.txt': "User-agent: *\nDisallow: /private\n",
+}
+
+
+@pytest.fixture(scope='module')
+def server():
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            if self.path == '/moved':
+                # Redirect to the same server under another host name
+                self.send_response(301)
+                self.send_header('Location', f"http://localhost:{self.server.server_address[1]}/")
+                self.end_headers()
+                return
+            body = SITE.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            content_type = 'text/plain' if self.path.endswith('.txt') else 'text/html; charset=utf-8'
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.requested = requested
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def crawl(server, path='/', **options):
+    options.setdefault('delay', 0)
+    crawler = SiteCrawler(session=requests.Session(), **options)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    server.requested.clear()
+    return base, asyncio.run(crawler.crawl(base + path))
+
+
+def paths(base, results):
+    return [result['url'][len(base):] if 'error' not in result else ('error', result['url'][len(base):])
+            for result in results]
+
+
+def test_depth_limit(server):
+    base, results = crawl(server, max_depth=1)
+    assert paths(base, results) == ['/', '/a', '/b', ('error', '/private')]
+    assert [result['depth'] for result in results] == [0, 1, 1, 1]
+
+    base, results = crawl(server, max_depth=3)
+    assert paths(base, results) == ['/', '/a', '/b', ('error', '/private'), '/a1', '/a2']
+
+
+def test_page_budget(server):
+    base, results = crawl(server, max_depth=3, max_pages=3)
+    assert paths(base, results) == ['/', '/a', '/b']
+    assert '/a1' not in server.requested
+
+
+def test_robots_disallow(server):
+    base, results = crawl(server, max_depth=1)
+    assert results[-1]['error'] == "Disallowed by robots.txt"
+    assert '/private' not in server.requested
+
+    base, results = crawl(server, max_depth=1, respect_robots=False)
+    assert paths(base, results) == ['/', '/a', '/b', '/private']
+
+
+def test_same_host_and_fragments(server):
+    base, results = crawl(server, max_depth=2)
+    crawled = [result['url'] for result in results]
+    # Each page once, despite links with fragments and links back to the seed
+    assert len(crawled) == len(set(crawled))
+    assert all(url.startswith(base) for url in crawled)
+    assert not any('#' in url or url.endswith('.pdf') for url in crawled)
+    assert server.requested.count('/b') == 1
+
+
+def test_seed_redirect_to_other_host(server):
+    base, results = crawl(server, '/moved', max_depth=1)
+    # Links are followed on the host the seed redirected to
+    host = f"http://localhost:{server.server_address[1]}"
+    assert [result['url'] for result in results[1:] if 'error' not in result] == [host + '/a', host + '/b']
+
+def test_seed_redirect_does_not_use_page_budget(server):
+    base, results = crawl(server, '/moved', max_depth=1, max_pages=3)
+    assert len(results) == 3
+    assert server.requested.count('/') == 1
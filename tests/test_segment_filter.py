@@ -0,0 +1,38 @@
+"""
+Tests for the pre-translation filter rules.
+"""
+from backends import StubBackend
+from segment_filter import is_target_script, untranslatable
+from translation_memory import TranslationMemory
+from translator import STATUS_SKIPPED, STATUS_TRANSLATED, translate_segments
+
+
+def translate(texts, source_lang, target_lang):
+    return translate_segments(texts, source_lang, target_lang, backend=StubBackend(),
+                              memory=TranslationMemory(None))
+
+
+def test_target_script_skipped_for_other_script_source():
+    assert is_target_script("Already in English", 'dv', 'en')
+    assert is_target_script("Already in English", 'auto', 'en')
+    assert not is_target_script("ދިވެހި ބަސް", 'dv', 'en')
+
+
+def test_target_script_kept_for_same_script_source():
+    # French and English share the Latin script, so French is not "already English"
+    assert not is_target_script("Bonjour tout le monde", 'fr', 'en')
+    assert untranslatable("Bonjour tout le monde", 'fr', 'en') is None
+    # Unknown source languages are not assumed to be written in another script
+    assert not is_target_script("Hello", 'xx', 'en')
+
+
+def test_latin_source_into_english_is_translated():
+    results = translate(["Bonjour tout le monde", "Merci beaucoup", "2024-05-01"], 'fr', 'en')
+    assert [result.status for result in results] == [STATUS_TRANSLATED, STATUS_TRANSLATED, STATUS_SKIPPED]
+    assert results[0].translation == "[en] Bonjour tout le monde"
+
+
+def test_target_script_segments_skipped_from_dhivehi():
+    results = translate(["ދިވެހި ބަސް", "Google Translate"], 'dv', 'en')
+    assert [result.status for result in results] == [STATUS_TRANSLATED, STATUS_SKIPPED]
+    assert results[1].translation == "Google Translate"
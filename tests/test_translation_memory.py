@@ -0,0 +1,104 @@
+"""
+Tests for the two-tier translation memory.
+"""
+import pytest
+
+import translation_memory
+from backends import StubBackend
+from translation_memory import TranslationMemory
+from translator import STATUS_CACHED, STATUS_TRANSLATED, translate_segments
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(translation_memory.time, 'time', lambda: now[0])
+    return now
+
+
+def test_hit_and_miss():
+    memory = TranslationMemory(None)
+    memory.put("ދިވެހި", 'dv', 'en', "Dhivehi")
+
+    assert memory.get("ދިވެހި", 'dv', 'en') == "Dhivehi"
+    # Whitespace differences map to the same entry
+    assert memory.get("  ދިވެހި ", 'dv', 'en') == "Dhivehi"
+    assert memory.get("ދިވެހި", 'dv', 'fr') is None
+    assert memory.get("ބަސް", 'dv', 'en') is None
+
+    stats = memory.stats()
+    assert (stats['memory_hits'], stats['misses']) == (2, 2)
+    assert stats['hit_rate'] == 0.5
+    assert stats['characters_saved'] == len("ދިވެހި") + len("  ދިވެހި ")
+
+
+def test_repeated_segments_served_from_memory():
+    memory = TranslationMemory(None)
+    backend = StubBackend()
+    texts = ["ދިވެހި ބަސް", "ރާއްޖެ"]
+
+    first = translate_segments(texts, 'dv', 'en', backend=backend, memory=memory)
+    second = translate_segments(texts, 'dv', 'en', backend=backend, memory=memory)
+
+    assert [result.status for result in first] == [STATUS_TRANSLATED, STATUS_TRANSLATED]
+    assert [result.status for result in second] == [STATUS_CACHED, STATUS_CACHED]
+    assert [result.translation for result in second] == [result.translation for result in first]
+    assert backend.calls == 1
+
+
+def test_ttl_expiry(clock, tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'), ttl=60)
+    memory.put("ދިވެހި", 'dv', 'en', "Dhivehi")
+
+    clock[0] += 30
+    assert memory.get("ދިވެހި", 'dv', 'en') == "Dhivehi"
+
+    clock[0] += 60
+    assert memory.get("ދިވެހި", 'dv', 'en') is None
+    # The expired row is removed from the disk tier as well
+    assert memory.stats()['disk_entries'] == 0
+
+
+def test_memory_tier_evicts_least_recently_used():
+    memory = TranslationMemory(None, max_memory_entries=2)
+    memory.put("a", 'dv', 'en', "A")
+    memory.put("b", 'dv', 'en', "B")
+    assert memory.get("a", 'dv', 'en') == "A"
+    memory.put("c", 'dv', 'en', "C")
+
+    assert memory.get("b", 'dv', 'en') is None
+    assert memory.get("a", 'dv', 'en') == "A"
+    assert memory.get("c", 'dv', 'en') == "C"
+    assert memory.stats()['evictions'] == 1
+
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'tm.sqlite3')
+    memory = TranslationMemory(path)
+    memory.put_many([("ދިވެހި", "Dhivehi"), ("ރާއްޖެ", "Maldives")], 'dv', 'en')
+    memory.close()
+
+    reopened = TranslationMemory(path)
+    assert reopened.get_many(["ރާއްޖެ", "ބަސް", "ދިވެހި"], 'dv', 'en') == {0: "Maldives", 2: "Dhivehi"}
+    # Disk hits are promoted into the in-process tier
+    assert reopened.get("ދިވެހި", 'dv', 'en') == "Dhivehi"
+
+    stats = reopened.stats()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (2, 1, 1)
+    assert stats['disk_entries'] == 2
+    reopened.close()
+
+
+def test_disk_tier_evicts_least_recently_used(clock, tmp_path):
+    path = str(tmp_path / 'tm.sqlite3')
+    memory = TranslationMemory(path, max_memory_entries=10, max_disk_entries=10)
+    memory.put_many([(f"old {i}", f"OLD {i}") for i in range(995)], 'dv', 'en')
+    clock[0] += 1
+    # The 1000th write triggers the size check of the disk tier
+    memory.put_many([(f"new {i}", f"NEW {i}") for i in range(5)], 'dv', 'en')
+    assert memory.stats()['disk_entries'] == 10
+    memory.close()
+
+    reopened = TranslationMemory(path)
+    assert reopened.get_many([f"new {i}" for i in range(5)], 'dv', 'en') == {i: f"NEW {i}" for i in range(5)}
+    reopened.close()